@@ -0,0 +1,269 @@
+import json
+import math
+import time
+import timeit
+from pathlib import Path
+from typing import Callable
+
+import click
+
+from battle_python.BoardState import (
+    BoardState,
+    get_all_snake_bodies_array,
+    get_all_snake_moves_array,
+    get_score,
+)
+from battle_python.GameSession import GameSession
+from battle_python.GameState import GameState
+from battle_python.geometry import get_neighbor_table
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+SNAKE_COUNTS = (2, 4, 8)
+BOARD_SIZES = (7, 11, 19, 25)
+# The search benchmark's node budget, so that it does the same work on every machine
+SEARCH_NODE_BUDGET = 300
+REPEATS = 3
+
+
+def get_position(snake_count: int, board_size: int) -> dict:
+    """
+    A /move payload with the snakes in two rows facing each other: half with their heads on the
+    top edge, half with their heads on the third row from the bottom.
+    """
+    columns = math.ceil(snake_count / 2)
+    snakes = []
+    for i in range(snake_count):
+        x = min(round((i // 2 + 0.5) * board_size / columns), board_size - 1)
+        if i % 2 == 0:
+            body = [{"x": x, "y": board_size - 1 - j} for j in range(3)]
+        else:
+            body = [{"x": x, "y": 2 - j} for j in range(3)]
+        snakes.append(
+            {
+                "id": f"snake-{i}",
+                "name": f"snake-{i}",
+                "health": 90,
+                "body": body,
+                "latency": "0",
+                "head": body[0],
+                "length": 3,
+                "shout": "",
+                "customizations": {
+                    "color": "#888888",
+                    "head": "default",
+                    "tail": "default",
+                },
+            }
+        )
+    center = board_size // 2
+    return {
+        "game": {
+            "id": f"benchmark-{snake_count}-{board_size}",
+            "ruleset": {
+                "name": "standard",
+                "version": "v1.1.15",
+                "settings": {
+                    "foodSpawnChance": 15,
+                    "minimumFood": 1,
+                    "hazardDamagePerTurn": 14,
+                },
+            },
+            "map": "standard",
+            "source": "custom",
+            "timeout": 500,
+        },
+        "turn": 10,
+        "board": {
+            "height": board_size,
+            "width": board_size,
+            "food": [
+                {"x": center, "y": center},
+                {"x": 0, "y": center},
+                {"x": board_size - 1, "y": center},
+            ],
+            "hazards": [],
+            "snakes": snakes,
+        },
+        "you": snakes[0],
+    }
+
+
+def get_game_state(payload: dict, node_budget: int | None = None) -> GameState:
+    return GameState.from_payload(
+        payload,
+        game_session=GameSession(game_id=payload["game"]["id"]),
+        node_budget=node_budget,
+    )
+
+
+def get_call_us(func: Callable[[], object]) -> float:
+    # The fastest of several runs, since noise only ever adds time
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEATS, number=number)) / number * 1_000_000
+
+
+def run_position(snake_count: int, board_size: int) -> dict[str, dict]:
+    payload = get_position(snake_count=snake_count, board_size=board_size)
+    board = get_game_state(payload=payload).current_board
+    snakes = (board.my_snake, *board.other_snakes)
+    all_snake_bodies_array = get_all_snake_bodies_array(
+        board_array=board.board_array, snakes=snakes
+    )
+    neighbor_table = get_neighbor_table(board_width=board_size, board_height=board_size)
+
+    def populate_next_boards() -> None:
+        board.next_boards = []
+        board.populate_next_boards()
+
+    board.populate_next_boards()
+    next_boards = list(board.next_boards)
+
+    gs = get_game_state(payload=payload)
+
+    def handle() -> None:
+        # Cleared, so that every call handles new boards rather than transpositions of the last
+        # call's. Clearing is cheap next to handling every child board
+        gs.explored_states.clear()
+        gs.best_my_snake_board.clear()
+        for next_board in next_boards:
+            gs.handle(next_board)
+
+    results = {
+        "get_all_snake_bodies_array": get_call_us(
+            lambda: get_all_snake_bodies_array(
+                board_array=board.board_array, snakes=snakes
+            )
+        ),
+        "get_all_snake_moves_array": get_call_us(
+            lambda: get_all_snake_moves_array(
+                all_snake_bodies_array=all_snake_bodies_array,
+                neighbor_table=neighbor_table,
+            )
+        ),
+        "get_score": get_call_us(
+            lambda: get_score(
+                my_snake=board.my_snake,
+                food_array=board.food_array,
+                center_weight_array=board.center_weight_array,
+                all_snake_moves_array=board.all_snake_moves_array,
+            )
+        ),
+        "BoardState.factory": get_call_us(
+            lambda: BoardState.factory(
+                turn=board.turn,
+                board_width=board.board_width,
+                board_height=board.board_height,
+                food_coords=board.food_coords,
+                hazard_coords=board.hazard_coords,
+                hazard_schedule=board.hazard_schedule,
+                other_snakes=board.other_snakes,
+                my_snake=board.my_snake,
+                hazard_damage_rate=board.hazard_damage_rate,
+            )
+        ),
+        "populate_next_boards": get_call_us(populate_next_boards),
+        "GameState.handle": get_call_us(handle) / len(next_boards),
+    }
+    metrics = {name: {"us": round(us, 1)} for name, us in results.items()}
+
+    search_us = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        gs = get_game_state(payload=payload, node_budget=SEARCH_NODE_BUDGET)
+        move = gs.get_next_move(request_time=time.time_ns() // 1_000_000)
+        search_us.append((time.perf_counter() - start) * 1_000_000)
+    metrics["get_next_move"] = {
+        "us": round(min(search_us), 1),
+        "nodes": gs.telemetry.nodes,
+        "move": move,
+    }
+    return metrics
+
+
+def run_benchmarks(
+    snake_counts: tuple[int, ...] = SNAKE_COUNTS,
+    board_sizes: tuple[int, ...] = BOARD_SIZES,
+) -> dict[str, dict]:
+    results = {}
+    for snake_count in snake_counts:
+        for board_size in board_sizes:
+            position = f"{snake_count}-snakes-{board_size}x{board_size}"
+            for name, metrics in run_position(
+                snake_count=snake_count, board_size=board_size
+            ).items():
+                results[f"{position}/{name}"] = metrics
+                click.echo(f"{position}/{name}: {metrics['us']:.1f}us")
+    return results
+
+
+def get_regressions(
+    results: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> list[str]:
+    """
+    Benchmarks more than threshold slower than the baseline, and searches that no longer generate
+    the same number of nodes or pick the same move, which means the search itself changed
+    """
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        ratio = metrics["us"] / baseline[name]["us"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {ratio:.2f}x the baseline time")
+        if metrics.get("move") != baseline[name].get("move"):
+            regressions.append(
+                f"{name}: moved {metrics.get('move')}, baseline {baseline[name].get('move')}"
+            )
+        if metrics.get("nodes") != baseline[name].get("nodes"):
+            regressions.append(
+                f"{name}: {metrics.get('nodes')} nodes, baseline {baseline[name].get('nodes')}"
+            )
+    return regressions
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command(name="run")
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path),
+    default=BASELINE_PATH,
+    help="Where to write the results. Defaults to the stored baseline",
+)
+def run(output: Path):
+    results = run_benchmarks()
+    output.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+@cli.command(name="compare")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, path_type=Path),
+    default=BASELINE_PATH,
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=0.2,
+    help="The fraction slower than the baseline that counts as a regression",
+)
+def compare(baseline: Path, threshold: float):
+    results = run_benchmarks()
+    regressions = get_regressions(
+        results=results,
+        baseline=json.loads(baseline.read_text()),
+        threshold=threshold,
+    )
+    for regression in regressions:
+        click.echo(f"REGRESSION {regression}")
+    if len(regressions) > 0:
+        raise SystemExit(1)
+    click.echo("No regressions")
+
+
+if __name__ == "__main__":
+    cli()
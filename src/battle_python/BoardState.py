@@ -1,31 +1,59 @@
 from __future__ import annotations
 
+import math
+import random
+import threading
+import time
 from collections import defaultdict
 from itertools import product
 from typing import Literal, Any
 
 import numpy as np
 import numpy.typing as npt
-import numpy.ma as ma
 from aws_lambda_powertools.utilities.parser import BaseModel
 from aws_lambda_powertools import Logger
 
 from pydantic import NonNegativeInt, Field, ConfigDict
 
+from battle_python.HazardSchedule import HazardSchedule
+from battle_python.OpponentModel import OpponentModel, default_opponent_model
 from battle_python.SnakeState import SnakeState, Elimination
-from battle_python.api_types import Coord, Game, SnakeDef
+from battle_python.api_types import Coord, Game, SnakeDef, RulesetName, Shared
 from battle_python.constants import (
     FOOD_WEIGHT,
     CENTER_CONTROL_WEIGHT,
     AREA_MULTIPLIER,
     DEATH_COORD,
     FOOD_SCORE,
+    JOINT_MOVE_SAMPLES,
+    JOINT_MOVE_SAMPLE_SEED,
+    JOINT_MOVE_SAMPLE_THRESHOLD,
+    LOCALITY_MAX_RADIUS,
+    OPPONENT_PRUNE_DISTANCE,
+    OPPONENT_PRUNE_PROBABILITY,
+    QUIESCENCE_DISTANCE,
+    QUIESCENCE_PLIES,
+    QUIESCENCE_RADIUS,
     MURDER_SCORE,
     WIN_SCORE,
     UNEXPLORED_VALUE,
     BORDER_VALUE,
     SNAKE_BODY_VALUE,
 )
+from battle_python.constrictor import (
+    get_constrictor_snake_bodies_array,
+    get_next_occupancy_array,
+    get_occupancy_array,
+    is_constrictor_ruleset,
+)
+from battle_python.geometry import (
+    get_coord_neighbor_table,
+    get_neighbor_table,
+    get_distance,
+    get_straight_coord,
+    is_wrapped_ruleset,
+)
+from battle_python.profiler import profiled
 
 logger = Logger()
 
@@ -146,19 +174,15 @@ def get_all_snake_bodies_array(
     snake_body_array = np.array(board_array, copy=True)
     snake_body_array[1:-1, 1:-1] = UNEXPLORED_VALUE
 
+    # Slices are only allocated for living snakes, so index them accordingly
+    snakes = tuple(snake for snake in snakes if snake.elimination is None)
+
     all_snake_bodies_array = np.array(
-        [
-            np.copy(snake_body_array, subok=True)
-            for snake in snakes
-            if snake.elimination is None
-        ]
+        [np.copy(snake_body_array, subok=True) for snake in snakes]
     )
 
     # Set snake bodies as SNAKE_BODY_VALUE on every slice
     for i, snake in enumerate(snakes):
-        if snake.elimination is not None:
-            continue
-
         # Rows (y-axis) are the first element. Indexing is top to bottom
         rows = [(row_count - 2 - coord.y) for coord in snake.body[:-1]]
 
@@ -178,8 +202,6 @@ def get_all_snake_bodies_array(
     # Subtract 2 to account for board buffer rows on top and bottom
     # Add 1 to x to account for left-most board buffer
     for i, snake in enumerate(snakes):
-        if snake.elimination is not None:
-            continue
         all_snake_bodies_array[
             i,
             # Rows (y-axis) are the first element. Indexing is top to bottom
@@ -191,45 +213,46 @@ def get_all_snake_bodies_array(
     return all_snake_bodies_array
 
 
+@profiled("get_all_snake_moves_array")
 def get_all_snake_moves_array(
     all_snake_bodies_array: npt.NDArray[np.int_],
+    neighbor_table: npt.NDArray[np.int_] | None = None,
 ) -> npt.NDArray[np.int_]:
+    """
+    Breadth-first flood fill from every snake's head, on every slice at once. Each frontier is
+    expanded by looking up its neighbors in a precomputed table, so the same code handles walled and
+    wrapped boards without any per-call bounds checks or modulo arithmetic.
+    """
     all_snake_moves_array = np.copy(all_snake_bodies_array, subok=True)
-    move = 0
-    while True:
-        masked_all_snakes = ma.masked_where(
-            np.logical_and(
-                all_snake_moves_array != UNEXPLORED_VALUE,
-                all_snake_moves_array != move,
-            ),
-            all_snake_moves_array,
-            copy=False,
-        )
-        masked_all_snakes.harden_mask()
-
-        # Get indices of all Von Neumann Neighbors of elements where element == current move
-        neighbors = [
-            ind + shift
-            for shift in [(0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
-            for ind in np.argwhere(masked_all_snakes == move)
-        ]
-
-        if len(neighbors) == 0:
-            break
+    if all_snake_moves_array.size == 0:
+        return all_snake_moves_array
 
-        masked_all_snakes[
-            [ind[0] for ind in neighbors],
-            [ind[1] for ind in neighbors],
-            [ind[2] for ind in neighbors],
-        ] = (
-            move + 1
+    _, rows, columns = all_snake_moves_array.shape
+    if neighbor_table is None:
+        neighbor_table = get_neighbor_table(
+            board_width=columns - 2, board_height=rows - 2
         )
+    slice_size = rows * columns
+
+    # A flat view, so that writes land in all_snake_moves_array
+    flat_moves = all_snake_moves_array.reshape(-1)
 
+    # Heads are the only zeros before the fill
+    frontier = np.flatnonzero(flat_moves == 0)
+    move = 0
+    while frontier.size > 0:
+        slice_offsets = frontier - frontier % slice_size
+        neighbors = (
+            neighbor_table[frontier % slice_size] + slice_offsets[:, None]
+        ).reshape(-1)
+        neighbors = np.unique(neighbors[flat_moves[neighbors] == UNEXPLORED_VALUE])
         move += 1
+        flat_moves[neighbors] = move
+        frontier = neighbors
 
-        # for i, snake in enumerate(masked_all_snakes):
-        #     print(f"snake {i}")
-        #     print(get_aligned_masked_array(snake))
+    # for i, snake in enumerate(all_snake_moves_array):
+    #     print(f"snake {i}")
+    #     print(get_aligned_masked_array(snake))
 
     # Address inaccessible areas
     np.putmask(
@@ -244,6 +267,84 @@ def get_all_snake_moves_array(
     return all_snake_moves_array
 
 
+def get_snake_reachability_array(
+    all_snake_moves_array: npt.NDArray[np.int_],
+    horizon: int | None = None,
+) -> npt.NDArray[np.bool_]:
+    """
+    Returns a boolean array of the coordinates each snake can reach, optionally limited to the
+    coordinates it can reach within `horizon` moves. Heads, bodies, borders and inaccessible
+    areas are never reachable.
+    """
+    reachability_array = np.logical_and(
+        all_snake_moves_array > 0,
+        all_snake_moves_array < UNEXPLORED_VALUE,
+    )
+    if horizon is not None:
+        reachability_array &= all_snake_moves_array <= horizon
+
+    return reachability_array
+
+
+def get_snake_regions(
+    all_snake_moves_array: npt.NDArray[np.int_],
+    horizon: int | None = None,
+) -> list[tuple[int, ...]]:
+    """
+    Partitions the snakes into independent regions. Two snakes share a region if any coordinate is
+    reachable by both of them. Snakes that don't share a region can't interact within the horizon,
+    so their moves don't need to be multiplied together.
+
+    The values in each region are indices into the first axis of `all_snake_moves_array`.
+    """
+    if all_snake_moves_array.size == 0:
+        return []
+
+    reachability_array = get_snake_reachability_array(
+        all_snake_moves_array=all_snake_moves_array, horizon=horizon
+    )
+    snake_count = reachability_array.shape[0]
+    flat_reachability = reachability_array.reshape(snake_count, -1).astype(np.int32)
+
+    # Element (i, j) is the number of coordinates reachable by both snake i and snake j
+    shared_coords = flat_reachability @ flat_reachability.T
+
+    regions: list[tuple[int, ...]] = []
+    unassigned = set(range(snake_count))
+    while len(unassigned) > 0:
+        seed = min(unassigned)
+        region = {seed}
+        unexplored = [seed]
+        while len(unexplored) > 0:
+            index = unexplored.pop()
+            for other_index in np.flatnonzero(shared_coords[index]):
+                if other_index not in region:
+                    region.add(int(other_index))
+                    unexplored.append(int(other_index))
+        unassigned -= region
+        regions.append(tuple(sorted(region)))
+
+    return regions
+
+
+def get_meeting_distances(
+    all_snake_moves_array: npt.NDArray[np.int_],
+) -> npt.NDArray[np.int_]:
+    """
+    Returns, for every snake, the fewest moves before my snake and that snake could both occupy the
+    same coordinate: the minimum over shared coordinates of the larger of the two distances. Snakes
+    that can't reach any coordinate my snake can reach get UNEXPLORED_VALUE.
+    """
+    snakes, _, _ = all_snake_moves_array.shape
+    distances = np.where(
+        get_snake_reachability_array(all_snake_moves_array=all_snake_moves_array),
+        all_snake_moves_array,
+        UNEXPLORED_VALUE,
+    )
+    return np.maximum(distances[0], distances).reshape(snakes, -1).min(axis=1)
+
+
+@profiled("get_my_snake_area_of_control")
 def get_my_snake_area_of_control(
     all_snake_moves_array: npt.NDArray[np.int_],
 ) -> npt.NDArray[np.int_]:
@@ -296,6 +397,7 @@ def get_my_snake_area_of_control(
     return my_snake_area_of_control
 
 
+@profiled("get_score")
 def get_score(
     my_snake: SnakeState,
     food_array: npt.NDArray[np.int_],
@@ -338,10 +440,16 @@ class BoardState(BaseModel):
     board_width: NonNegativeInt
     board_height: NonNegativeInt
     food_coords: tuple[Coord, ...]
+    # A frozenset of the food coordinates, shared with sibling boards and only rebuilt when food is
+    # eaten
+    food_set: Shared
     hazard_coords: tuple[Coord, ...]
     other_snakes: tuple[SnakeState, ...]
     my_snake: SnakeState
     hazard_damage_rate: int
+    ruleset_name: RulesetName = "standard"
+    hazard_schedule: HazardSchedule = Field(exclude=True)
+    opponent_model: OpponentModel = Field(default=default_opponent_model, exclude=True)
     prev_state: BoardState | None = Field(default=None, exclude=True)
     next_boards: list[BoardState] = Field(default_factory=list, exclude=True)
     is_terminal: bool = False
@@ -349,10 +457,14 @@ class BoardState(BaseModel):
     board_array: npt.NDArray[np.int_] = Field(exclude=True)
     food_array: npt.NDArray[np.int_] = Field(exclude=True)
     all_snake_moves_array: npt.NDArray[np.int_] = Field(exclude=True)
+    occupancy_array: npt.NDArray[np.bool_] | None = Field(default=None, exclude=True)
     center_weight_array: npt.NDArray[np.int_] = Field(exclude=True)
     score: float = 0
+    # Importance weight of a sampled joint move, relative to the uniform mean over every joint move
+    sample_weight: float = Field(default=1, exclude=True)
 
     @classmethod
+    @profiled("BoardState.factory")
     def factory(cls, **kwargs) -> BoardState:
         my_snake = kwargs["my_snake"]
         other_snakes = kwargs["other_snakes"]
@@ -360,6 +472,14 @@ class BoardState(BaseModel):
         board_width = kwargs["board_width"]
         prev_state = kwargs.get("prev_state")
 
+        if kwargs.get("hazard_schedule") is None:
+            kwargs["hazard_schedule"] = HazardSchedule.factory(
+                turn=kwargs["turn"],
+                board_width=board_width,
+                board_height=board_height,
+                hazard_coords=kwargs["hazard_coords"],
+            )
+
         if prev_state is None:
             board_array = get_board_array(
                 board_width=board_width, board_height=board_height
@@ -372,13 +492,22 @@ class BoardState(BaseModel):
         snake_heads_at_coord = get_snake_heads_at_coord(
             snakes=(my_snake, *other_snakes)
         )
+        food_coords = kwargs["food_coords"]
+        food_set = kwargs.get("food_set")
+        if food_set is None:
+            food_set = frozenset(food_coords)
         for coord, snake_heads_at_coord in snake_heads_at_coord.items():
             resolve_head_collision(snake_heads_at_coord=snake_heads_at_coord)
-            kwargs["food_coords"] = resolve_food_consumption(
-                coord=coord,
-                snake_heads_at_coord=snake_heads_at_coord,
-                food_coords=kwargs["food_coords"],
-            )
+            if coord in food_set:
+                kwargs["food_coords"] = resolve_food_consumption(
+                    coord=coord,
+                    snake_heads_at_coord=snake_heads_at_coord,
+                    food_coords=kwargs["food_coords"],
+                )
+        is_food_unchanged = kwargs["food_coords"] is food_coords
+        if not is_food_unchanged:
+            food_set = frozenset(kwargs["food_coords"])
+        kwargs["food_set"] = food_set
 
         if my_snake.elimination is not None or len(other_snakes) == 0:
             terminal_reason: str
@@ -403,19 +532,58 @@ class BoardState(BaseModel):
                 **kwargs,
             )
 
-        all_snake_bodies_array = get_all_snake_bodies_array(
-            board_array=board_array, snakes=(my_snake, *other_snakes)
-        )
+        if is_constrictor_ruleset(kwargs.get("ruleset_name", "standard")):
+            living_snakes = tuple(
+                snake
+                for snake in (my_snake, *other_snakes)
+                if snake.elimination is None
+            )
+            if (
+                prev_state is not None
+                and prev_state.occupancy_array is not None
+                and len(prev_state.all_snake_moves_array) == len(living_snakes)
+            ):
+                # No snake died, so no body was removed from the board
+                occupancy_array = get_next_occupancy_array(
+                    prev_occupancy_array=prev_state.occupancy_array,
+                    snakes=living_snakes,
+                )
+            else:
+                occupancy_array = get_occupancy_array(
+                    board_array=board_array, snakes=living_snakes
+                )
+            kwargs["occupancy_array"] = occupancy_array
+            all_snake_bodies_array = get_constrictor_snake_bodies_array(
+                board_array=board_array,
+                occupancy_array=occupancy_array,
+                snakes=living_snakes,
+            )
+        else:
+            all_snake_bodies_array = get_all_snake_bodies_array(
+                board_array=board_array, snakes=(my_snake, *other_snakes)
+            )
 
         # TODO: resolve head collision and food consumption here
 
         all_snake_moves_array = get_all_snake_moves_array(
             all_snake_bodies_array=all_snake_bodies_array,
+            neighbor_table=get_neighbor_table(
+                board_width=board_width,
+                board_height=board_height,
+                is_wrapped=is_wrapped_ruleset(kwargs.get("ruleset_name", "standard")),
+            ),
         )
 
-        food_array = get_food_array(
-            board_array=board_array, food_coords=kwargs["food_coords"]
-        )
+        if (
+            prev_state is not None
+            and is_food_unchanged
+            and food_coords is prev_state.food_coords
+        ):
+            food_array = prev_state.food_array
+        else:
+            food_array = get_food_array(
+                board_array=board_array, food_coords=kwargs["food_coords"]
+            )
 
         score = get_score(
             my_snake=my_snake,
@@ -433,6 +601,31 @@ class BoardState(BaseModel):
             **kwargs,
         )
 
+    @property
+    def is_wrapped(self) -> bool:
+        return is_wrapped_ruleset(self.ruleset_name)
+
+    @property
+    def is_constrictor(self) -> bool:
+        return is_constrictor_ruleset(self.ruleset_name)
+
+    def get_distance(self, a: Coord, b: Coord) -> int:
+        return get_distance(
+            a=a,
+            b=b,
+            board_width=self.board_width,
+            board_height=self.board_height,
+            is_wrapped=self.is_wrapped,
+        )
+
+    def get_straight_coord(self, snake: SnakeState) -> Coord:
+        return get_straight_coord(
+            body=snake.body,
+            board_width=self.board_width,
+            board_height=self.board_height,
+            is_wrapped=self.is_wrapped,
+        )
+
     def get_my_key(self) -> tuple[int, tuple[Coord]]:
         return self.turn, self.my_snake.body[0]
 
@@ -464,9 +657,13 @@ class BoardState(BaseModel):
     ) -> int:
         next_health = snake.health - 1
 
+        if self.is_constrictor:
+            # Constrictor keeps every snake at full health
+            return 100
+
         if food_consumed:
             next_health = 100
-        elif next_body[0] in self.hazard_coords:
+        elif self.hazard_schedule.is_hazard(coord=next_body[0], turn=self.turn):
             next_health -= self.hazard_damage_rate
 
         if next_health <= 0:
@@ -484,12 +681,12 @@ class BoardState(BaseModel):
     def get_next_body(self, current_body: list[Coord]) -> list[Coord]:
         if current_body[0] is DEATH_COORD:
             return [current_body[0]]
-        if current_body[0] in self.food_coords:
+        if current_body[0] in self.food_set or self.is_constrictor:
             current_body.append(current_body[-1])
         return current_body
 
     def is_food_consumed(self, next_body: list[Coord]) -> bool:
-        if next_body[0] in self.food_coords:
+        if next_body[0] in self.food_set:
             return True
         return False
 
@@ -543,64 +740,307 @@ class BoardState(BaseModel):
         if len(moves) == 0:
             moves.append(DEATH_COORD)
 
-        if (
-            len(moves) > 1
-            and not snake.is_self
-            and self.my_snake.head.get_manhattan_distance(snake.head) > 4
-        ):
-            if self.turn % 2 == 1 and snake.body[0] + snake.last_move in moves:
-                moves = [snake.body[0] + snake.last_move]
-            else:
-                moves = [
-                    move
-                    for move in moves
-                    if self.my_snake.head.get_manhattan_distance(move)
-                    < self.my_snake.head.get_manhattan_distance(snake.head)
-                ]
-
         return [
             self.get_next_snake_state_for_snake_move(snake=snake, move=move)
             for move in moves
         ]
 
-    def populate_next_boards(self) -> None:
+    def get_policy_snake_state(
+        self, snake: SnakeState, next_states: list[SnakeState]
+    ) -> SnakeState:
+        """
+        Picks a single representative move for an opponent that can't interact with my snake soon.
+        Its exact move barely changes my snake's score, so the choice only needs to be cheap and
+        plausible: the opponent model's most likely move. Ties go to straight ahead, and then
+        toward my snake.
+        """
+        straight = self.get_straight_coord(snake=snake)
+        weights = self.opponent_model.get_move_weights(
+            board=self, snake=snake, next_states=next_states
+        )
+        index = max(
+            range(len(next_states)),
+            key=lambda index: (
+                weights[index],
+                next_states[index].head == straight,
+                -self.get_distance(self.my_snake.head, next_states[index].head),
+            ),
+        )
+        return next_states[index]
+
+    def get_likely_snake_states(
+        self, snake: SnakeState, next_states: list[SnakeState]
+    ) -> list[SnakeState]:
+        """
+        Prunes the moves the opponent model considers unlikely. Moves that end near my snake's head
+        are always kept, so that a surprising opponent can't catch my snake in a head-to-head.
+        """
+        probabilities = self.opponent_model.get_move_probabilities(
+            board=self, snake=snake, next_states=next_states
+        )
+        likely_next_states = [
+            next_state
+            for probability, next_state in zip(probabilities, next_states)
+            if probability >= OPPONENT_PRUNE_PROBABILITY
+            or self.get_distance(self.my_snake.head, next_state.head)
+            <= OPPONENT_PRUNE_DISTANCE
+        ]
+        if len(likely_next_states) == 0:
+            return [self.get_policy_snake_state(snake=snake, next_states=next_states)]
+        return likely_next_states
+
+    @profiled("BoardState.get_other_snakes_next_states")
+    def get_other_snakes_next_states(
+        self, locality_radius: int = LOCALITY_MAX_RADIUS
+    ) -> list[list[SnakeState]]:
+        """
+        Returns the next states for each living opponent. Only opponents that could meet my snake
+        within `locality_radius` moves are fully branched. Every other opponent is advanced by a
+        single policy move. Opponents outside my snake's region are independent subproblems that
+        can't affect my snake's score at all, so they're always collapsed.
+        """
+        regions = get_snake_regions(all_snake_moves_array=self.all_snake_moves_array)
+        my_region = next((region for region in regions if 0 in region), (0,))
+        meeting_distances = get_meeting_distances(
+            all_snake_moves_array=self.all_snake_moves_array
+        )
+
+        other_snakes_next_states: list[list[SnakeState]] = []
+        # Array slices only exist for living snakes
+        index = 0
+        for snake in self.other_snakes:
+            if snake.elimination is not None:
+                continue
+            index += 1
+            next_states = self.get_next_snake_states_for_snake(snake=snake, index=index)
+            if len(next_states) == 0:
+                continue
+            if len(next_states) > 1 and (
+                index not in my_region or meeting_distances[index] > locality_radius
+            ):
+                next_states = [
+                    self.get_policy_snake_state(snake=snake, next_states=next_states)
+                ]
+            elif len(next_states) > 1:
+                next_states = self.get_likely_snake_states(
+                    snake=snake, next_states=next_states
+                )
+            other_snakes_next_states.append(next_states)
+
+        return other_snakes_next_states
+
+    def get_sampled_snake_states(
+        self,
+        my_snake_next_states: list[SnakeState],
+        other_snakes_next_states: list[list[SnakeState]],
+    ) -> list[tuple[tuple[SnakeState, ...], float]]:
+        """
+        Every move for my snake, each paired with JOINT_MOVE_SAMPLES opponent joint moves drawn from
+        the opponent model. Each draw is weighted by uniform probability over policy
+        probability, so the weighted mean of the sampled children estimates the same uniform mean
+        that the full product would have produced. Repeated draws are merged by summing weights.
+        """
+        rng = random.Random(JOINT_MOVE_SAMPLE_SEED + self.turn)
+        policies = [
+            self.opponent_model.get_move_probabilities(
+                board=self,
+                snake=next_states[0].prev_state,
+                next_states=next_states,
+            )
+            for next_states in other_snakes_next_states
+        ]
+
+        sampled_snake_states: list[tuple[tuple[SnakeState, ...], float]] = []
+        for my_snake_next_state in my_snake_next_states:
+            sample_weights: dict[tuple[int, ...], float] = defaultdict(float)
+            for _ in range(JOINT_MOVE_SAMPLES):
+                choices = tuple(
+                    rng.choices(range(len(policy)), weights=policy)[0]
+                    for policy in policies
+                )
+                sample_weights[choices] += math.prod(
+                    1 / (len(policy) * policy[choice])
+                    for policy, choice in zip(policies, choices)
+                )
+            for choices, sample_weight in sample_weights.items():
+                sampled_snake_states.append(
+                    (
+                        (
+                            my_snake_next_state,
+                            *(
+                                next_states[choice]
+                                for next_states, choice in zip(
+                                    other_snakes_next_states, choices
+                                )
+                            ),
+                        ),
+                        sample_weight,
+                    )
+                )
+        return sampled_snake_states
+
+    @profiled("BoardState.populate_next_boards")
+    def populate_next_boards(self, locality_radius: int = LOCALITY_MAX_RADIUS) -> None:
         if self.is_terminal:
             return
 
         my_snake_next_states = self.get_next_snake_states_for_snake(
             snake=self.my_snake, index=0
         )
-        other_snakes_next_states = [
-            other_snake_next_state
-            for other_snake_next_state in [
-                self.get_next_snake_states_for_snake(snake=snake, index=index + 1)
-                for index, snake in enumerate(self.other_snakes)
-            ]
-            if len(other_snake_next_state) > 0
-        ]
-        all_potential_snake_states: tuple[list[SnakeState]] = product(
-            my_snake_next_states, *other_snakes_next_states
+        other_snakes_next_states = self.get_other_snakes_next_states(
+            locality_radius=locality_radius
+        )
+        joint_move_count = len(my_snake_next_states) * math.prod(
+            len(next_states) for next_states in other_snakes_next_states
         )
+        if joint_move_count > JOINT_MOVE_SAMPLE_THRESHOLD:
+            all_potential_snake_states = self.get_sampled_snake_states(
+                my_snake_next_states=my_snake_next_states,
+                other_snakes_next_states=other_snakes_next_states,
+            )
+        else:
+            all_potential_snake_states = [
+                (potential_snake_states, 1)
+                for potential_snake_states in product(
+                    my_snake_next_states, *other_snakes_next_states
+                )
+            ]
 
-        for potential_snake_states in all_potential_snake_states:
-            # TODO: Predict hazard zones: https://github.com/BattlesnakeOfficial/rules/blob/main/standard.go#L130
+        for potential_snake_states, sample_weight in all_potential_snake_states:
             potential_board = BoardState.factory(
                 turn=self.turn + 1,
                 board_width=self.board_width,
                 board_height=self.board_height,
                 food_coords=self.food_coords,
-                hazard_coords=self.hazard_coords,
+                food_set=self.food_set,
+                hazard_coords=self.hazard_schedule.get_hazard_coords(
+                    turn=self.turn + 1
+                ),
+                hazard_schedule=self.hazard_schedule,
+                opponent_model=self.opponent_model,
                 my_snake=potential_snake_states[0].model_copy(),
                 other_snakes=[
                     snake.model_copy() for snake in potential_snake_states[1:]
                 ],
                 hazard_damage_rate=self.hazard_damage_rate,
+                ruleset_name=self.ruleset_name,
                 prev_state=self,
+                sample_weight=sample_weight,
             )
             self.next_boards.append(potential_board)
-        self.score = sum([board.score for board in self.next_boards]) / len(
-            self.next_boards
+        self.score = sum(
+            [board.score * board.sample_weight for board in self.next_boards]
+        ) / sum([board.sample_weight for board in self.next_boards])
+
+    def is_dead_end(self, coord: Coord) -> bool:
+        """
+        A coordinate my snake could move into next turn, but not out of the turn after. By then
+        every snake has moved twice, so the last two coordinates of each body are free. A tail
+        stacked from eating is no exception: it unstacks on the first move and moves away on the
+        second.
+        """
+        occupied = set()
+        for snake in (self.my_snake, *self.other_snakes):
+            if snake.elimination is not None:
+                continue
+            occupied.update(snake.body[:-2])
+        neighbor_table = get_coord_neighbor_table(
+            board_width=self.board_width,
+            board_height=self.board_height,
+            is_wrapped=self.is_wrapped,
         )
+        return all(adjacent in occupied for adjacent in neighbor_table[coord])
+
+    @profiled("BoardState.get_forced_move")
+    def get_forced_move(self) -> Coord | None:
+        """
+        Returns my snake's move if it only has one, or if every other move is certain death: out
+        of health, or into a dead end. Returns None if there's a choice to make, or if every move
+        is fatal.
+        """
+        if self.is_terminal:
+            return None
+        next_states = [
+            next_state
+            for next_state in self.get_next_snake_states_for_snake(
+                snake=self.my_snake, index=0
+            )
+            if next_state.head != DEATH_COORD
+        ]
+        if len(next_states) == 1:
+            return next_states[0].head
+        viable_next_states = [
+            next_state
+            for next_state in next_states
+            if next_state.elimination is None
+            and not self.is_dead_end(coord=next_state.head)
+        ]
+        if len(viable_next_states) == 1:
+            return viable_next_states[0].head
+        return None
+
+    def is_in_contact(self) -> bool:
+        return any(
+            self.get_distance(self.my_snake.head, snake.head) <= QUIESCENCE_DISTANCE
+            for snake in self.other_snakes
+            if snake.elimination is None
+        )
+
+    @profiled("BoardState.backup")
+    def backup(
+        self,
+        deadline: int,
+        quiescence_plies: int = QUIESCENCE_PLIES,
+        backed_up: dict[int, float] | None = None,
+        stop_event: threading.Event | None = None,
+    ) -> float:
+        """
+        Recomputes scores bottom-up, so that every board's score reflects the deepest boards
+        explored beneath it rather than only its children at the time it was populated.
+
+        Leaves taken in the middle of a head-to-head are extended first: only the snakes whose
+        heads are close enough to collide are branched, for up to `quiescence_plies` plies, so the
+        collision is resolved before the leaf is scored. That avoids the horizon effect without
+        paying for a full extra ply everywhere. Setting `stop_event` abandons the backup.
+        """
+        if stop_event is not None and stop_event.is_set():
+            return self.score
+        if backed_up is None:
+            backed_up = {}
+        # Duplicate boards share their next boards, so shared subtrees are only walked once. Every
+        # board that shares them gets the same backed up score
+        if id(self.next_boards) in backed_up:
+            self.score = backed_up[id(self.next_boards)]
+            return self.score
+
+        child_quiescence_plies = quiescence_plies
+        if len(self.next_boards) == 0:
+            if (
+                quiescence_plies == 0
+                or self.is_terminal
+                or not self.is_in_contact()
+                or time.time_ns() // 1_000_000 > deadline
+            ):
+                return self.score
+            self.populate_next_boards(locality_radius=QUIESCENCE_RADIUS)
+            child_quiescence_plies = quiescence_plies - 1
+
+        backed_up[id(self.next_boards)] = self.score
+        scores = [
+            board.backup(
+                deadline=deadline,
+                quiescence_plies=child_quiescence_plies,
+                backed_up=backed_up,
+                stop_event=stop_event,
+            )
+            for board in self.next_boards
+        ]
+        self.score = sum(
+            score * board.sample_weight
+            for score, board in zip(scores, self.next_boards)
+        ) / sum(board.sample_weight for board in self.next_boards)
+        backed_up[id(self.next_boards)] = self.score
+        return self.score
 
     def get_snake_state_payload(
         self,
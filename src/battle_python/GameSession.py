@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from aws_lambda_powertools.utilities.parser import BaseModel
+from aws_lambda_powertools import Logger
+from pydantic import Field
+
+from battle_python.MoveOrdering import MoveOrdering
+from battle_python.OpponentModel import LearnedOpponentModel, SnakeStatistics
+from battle_python.api_types import Coord
+from battle_python.constants import MAX_GAME_SESSIONS
+from battle_python.decoder import get_coords
+from battle_python.geometry import (
+    get_coord_neighbor_table,
+    get_food_distance,
+    get_neighbor_table,
+    get_straight_coord,
+    is_wrapped_ruleset,
+)
+
+logger = Logger()
+
+
+class GameSession(BaseModel):
+    """
+    State kept between move requests for the same game in a warm container. Each request's board is
+    compared with the previous request's to learn how every opponent moves.
+    """
+
+    game_id: str
+    turn: int | None = None
+    bodies: dict[str, tuple[Coord, ...]] = Field(default_factory=dict)
+    food: frozenset[Coord] = Field(default_factory=frozenset)
+    opponent_model: LearnedOpponentModel = Field(default_factory=LearnedOpponentModel)
+    move_ordering: MoveOrdering = Field(default_factory=MoveOrdering)
+
+    def observe(self, payload: dict) -> None:
+        turn = payload["turn"]
+        board_width = payload["board"]["width"]
+        board_height = payload["board"]["height"]
+        is_wrapped = is_wrapped_ruleset(payload["game"]["ruleset"]["name"])
+        is_next_turn = self.turn is not None and turn == self.turn + 1
+
+        def get_previous_food_distance(coord: Coord) -> int | None:
+            # Distance to the food that was on the board when the snake chose its move
+            return get_food_distance(
+                coord=coord,
+                food=self.food,
+                board_width=board_width,
+                board_height=board_height,
+                is_wrapped=is_wrapped,
+            )
+
+        bodies: dict[str, tuple[Coord, ...]] = {}
+        for snake in payload["board"]["snakes"]:
+            if snake["id"] == payload["you"]["id"]:
+                continue
+            body = get_coords(snake["body"])
+            bodies[snake["id"]] = body
+            self.opponent_model.snake_names[snake["id"]] = snake["name"]
+            prev_body = self.bodies.get(snake["id"])
+            if not is_next_turn or prev_body is None:
+                continue
+
+            statistics = self.opponent_model.snake_statistics.setdefault(
+                snake["name"], SnakeStatistics()
+            )
+            if prev_body[0] != prev_body[1]:
+                statistics.directed_moves += 1
+                if body[0] == get_straight_coord(
+                    body=prev_body,
+                    board_width=board_width,
+                    board_height=board_height,
+                    is_wrapped=is_wrapped,
+                ):
+                    statistics.straight_moves += 1
+
+            if len(self.food) > 0:
+                statistics.food_seeking_moves += 1
+                if get_previous_food_distance(body[0]) < get_previous_food_distance(
+                    prev_body[0]
+                ):
+                    statistics.food_moves += 1
+
+        self.turn = turn
+        self.bodies = bodies
+        self.food = frozenset(get_coords(payload["board"]["food"]))
+
+
+class SessionManager(BaseModel):
+    """
+    Game sessions keyed by game id, in least recently used order. /start allocates a game's session
+    and /end releases it. Games that never send /end, or containers that see many overlapping games,
+    are bounded by evicting the least recently used session.
+    """
+
+    max_sessions: int = MAX_GAME_SESSIONS
+    sessions: OrderedDict[str, GameSession] = Field(default_factory=OrderedDict)
+
+    def get_session(self, game_id: str) -> GameSession:
+        session = self.sessions.get(game_id)
+        if session is None:
+            session = GameSession(game_id=game_id)
+            self.sessions[game_id] = session
+            while len(self.sessions) > self.max_sessions:
+                evicted_id, _ = self.sessions.popitem(last=False)
+                logger.info("evicted game session", evicted_game_id=evicted_id)
+        self.sessions.move_to_end(game_id)
+        return session
+
+    def observe(self, payload: dict) -> GameSession:
+        # Learns from a /move payload, before the move is searched
+        session = self.get_session(game_id=payload["game"]["id"])
+        session.observe(payload=payload)
+        return session
+
+    def start_session(self, payload: dict) -> GameSession:
+        """
+        Allocates the game's session and builds the tables that the first move would otherwise pay
+        for.
+        """
+        session = self.get_session(game_id=payload["game"]["id"])
+        board_width = payload["board"]["width"]
+        board_height = payload["board"]["height"]
+        is_wrapped = is_wrapped_ruleset(payload["game"]["ruleset"]["name"])
+        get_neighbor_table(
+            board_width=board_width, board_height=board_height, is_wrapped=is_wrapped
+        )
+        get_coord_neighbor_table(
+            board_width=board_width, board_height=board_height, is_wrapped=is_wrapped
+        )
+        session.observe(payload=payload)
+        return session
+
+    def end_session(self, payload: dict) -> GameSession | None:
+        session = self.sessions.pop(payload["game"]["id"], None)
+        if session is None:
+            return None
+        logger.info(
+            "game statistics",
+            turns=payload["turn"],
+            is_alive=any(
+                snake["id"] == payload["you"]["id"]
+                for snake in payload["board"]["snakes"]
+            ),
+            snake_statistics={
+                name: statistics.model_dump()
+                for name, statistics in session.opponent_model.snake_statistics.items()
+            },
+        )
+        return session
+
+
+# Module-level so that a warm container keeps sessions between requests
+session_manager = SessionManager()
@@ -1,31 +1,60 @@
 from __future__ import annotations
 
+import contextvars
+import threading
 import time
 from collections import deque
 from itertools import groupby
 
-from aws_lambda_powertools.utilities.parser import BaseModel
 from pydantic import NonNegativeInt, Field
 from aws_lambda_powertools import Logger
-from aws_lambda_powertools.tracing import Tracer
 
 from battle_python.BoardState import BoardState
+from battle_python.GameSession import GameSession
+from battle_python.HazardSchedule import HazardSchedule
+from battle_python.MoveOrdering import MoveOrdering
 from battle_python.SnakeState import SnakeState
 from battle_python.api_types import (
     Coord,
+    Direction,
     Game,
     SnakeDef,
+    StoppableSearch,
 )
+from battle_python.constants import (
+    DUEL_MAX_DEPTH,
+    LOCALITY_MAX_RADIUS,
+    LOCALITY_MIN_RADIUS,
+    QUIESCENCE_BUDGET_MS,
+    SEARCH_BUDGET_MS,
+    WATCHDOG_MARGIN_MS,
+    WATCHDOG_STOP_MS,
+)
+from battle_python.decoder import (
+    get_coords,
+    get_snake_def,
+    get_snake_state,
+)
+from battle_python.duel import get_duel_move
+from battle_python.geometry import get_coord_neighbor_table, get_move_direction
+from battle_python.observability import MoveTelemetry, capture_method
+from battle_python.profiler import profiled
+from battle_python.solo import (
+    get_next_body,
+    get_open_neighbors,
+    get_reachable_area,
+    get_solo_move,
+)
+from battle_python.survival import get_survival_move
 
 logger = Logger()
-tracer = Tracer()
 
 
 class TimeoutException(Exception):
     pass
 
 
-class GameState(BaseModel):
+class GameState(StoppableSearch):
     game: Game
     board_height: NonNegativeInt
     board_width: NonNegativeInt
@@ -34,68 +63,77 @@ class GameState(BaseModel):
         default_factory=dict
     )
     terminal_counter: int = 0
+    duplicate_counter: int = 0
     counter: int = 0
     explored_states: dict[tuple, dict[tuple, BoardState]] = Field(default_factory=dict)
     frontier: deque[BoardState] = Field(default_factory=deque)
     snake_defs: dict[str, SnakeDef]
+    game_session: GameSession | None = Field(default=None, exclude=True)
+    telemetry: MoveTelemetry = Field(default_factory=MoveTelemetry, exclude=True)
+    # The search's own copy of the session's move ordering. It's only committed back to the session
+    # if the search finishes, so an abandoned search can't touch the session
+    move_ordering: MoveOrdering | None = Field(default=None, exclude=True)
+    # Deterministic mode. When either budget is set, the search is bounded by boards generated or
+    # frontier plies rather than by the clock, so the same payload always gets the same move
+    node_budget: int | None = None
+    depth_budget: int | None = None
 
     # noinspection PyNestedDecorators
     @classmethod
-    def from_payload(cls, payload: dict) -> GameState:
+    def from_payload(
+        cls,
+        payload: dict,
+        game_session: GameSession | None = None,
+        node_budget: int | None = None,
+        depth_budget: int | None = None,
+    ) -> GameState:
+        """
+        Pass the game's session to search with what it has learned about the opponents. Without
+        one, the search gets a fresh session. Building a game state never observes the payload;
+        that's up to the caller. Pass a node or depth budget to search deterministically
+        """
         game = Game(**payload["game"])
+        if game_session is None:
+            game_session = GameSession(game_id=game.id)
 
-        snake_defs = {
-            snake["id"]: SnakeDef(
-                id=snake["id"],
-                name=snake["name"],
-                customizations=snake["customizations"],
-                is_self=snake["id"] == payload["you"]["id"],
-            )
-            for snake in payload["board"]["snakes"]
-        }
+        my_id = payload["you"]["id"]
+        snake_defs: dict[str, SnakeDef] = {}
+        other_snakes: list[SnakeState] = []
+        my_snake: SnakeState | None = None
+        for snake in payload["board"]["snakes"]:
+            is_self = snake["id"] == my_id
+            snake_defs[snake["id"]] = get_snake_def(snake=snake, is_self=is_self)
+            if is_self:
+                my_snake = get_snake_state(snake=snake, is_self=True)
+            else:
+                other_snakes.append(get_snake_state(snake=snake, is_self=False))
+        if my_snake is None:
+            my_snake = get_snake_state(snake=payload["you"], is_self=True)
 
-        other_snakes: tuple[SnakeState, ...] = tuple(
-            (
-                SnakeState(
-                    id=snake["id"],
-                    health=snake["health"],
-                    body=tuple(
-                        Coord(x=coord["x"], y=coord["y"]) for coord in snake["body"]
-                    ),
-                    head=snake["head"],
-                    length=snake["length"],
-                    latency=snake["latency"],
-                    shout=snake["shout"],
-                    is_self=snake["id"] == payload["you"]["id"],
-                )
-                for snake in payload["board"]["snakes"]
-                if snake["id"] != payload["you"]["id"]
-            )
+        hazard_coords = get_coords(payload["board"]["hazards"])
+        royale = game.ruleset.settings.royale
+        hazard_schedule = HazardSchedule.factory(
+            turn=payload["turn"],
+            board_width=payload["board"]["width"],
+            board_height=payload["board"]["height"],
+            hazard_coords=hazard_coords,
+            shrink_every_n_turns=royale.shrinkEveryNTurns
+            if game.ruleset.name == "royale" and royale is not None
+            else None,
         )
 
         board = BoardState.factory(
             turn=payload["turn"],
             board_width=payload["board"]["width"],
             board_height=payload["board"]["height"],
-            food_coords=tuple(
-                Coord(x=coord["x"], y=coord["y"]) for coord in payload["board"]["food"]
-            ),
-            hazard_coords=payload["board"]["hazards"],
-            other_snakes=other_snakes,
-            my_snake=SnakeState(
-                id=payload["you"]["id"],
-                health=payload["you"]["health"],
-                body=tuple(
-                    Coord(x=coord["x"], y=coord["y"])
-                    for coord in payload["you"]["body"]
-                ),
-                head=payload["you"]["head"],
-                length=payload["you"]["length"],
-                latency=payload["you"]["latency"],
-                shout=payload["you"]["shout"],
-                is_self=True,
-            ),
+            food_coords=get_coords(payload["board"]["food"]),
+            hazard_coords=hazard_coords,
+            hazard_schedule=hazard_schedule,
+            opponent_model=game_session.opponent_model,
+            other_snakes=tuple(other_snakes),
+            my_snake=my_snake,
             hazard_damage_rate=game.ruleset.settings.hazardDamagePerTurn,
+            ruleset_name=game.ruleset.name,
         )
         return GameState(
             game=game,
@@ -103,14 +141,29 @@ class GameState(BaseModel):
             board_height=payload["board"]["height"],
             current_board=board,
             snake_defs=snake_defs,
+            game_session=game_session,
+            node_budget=node_budget,
+            depth_budget=depth_budget,
         )
 
-    # @tracer.capture_method
+    def get_move_direction(self, next_head: Coord) -> Direction:
+        return get_move_direction(
+            head=self.current_board.my_snake.head,
+            next_head=next_head,
+            board_width=self.board_width,
+            board_height=self.board_height,
+            is_wrapped=self.current_board.is_wrapped,
+        )
+
+    @profiled("GameState.model_post_init")
     def model_post_init(self, __context) -> None:
+        # Always an event, for the watchdog to set
+        if self.stop_event is None:
+            self.stop_event = threading.Event()
         self.frontier.append(self.current_board)
         self.best_my_snake_board[self.current_board.get_my_key()] = self.current_board
 
-    # @tracer.capture_method
+    @profiled("GameState.handle")
     def handle(self, board: BoardState) -> BoardState | None:
         self.counter += 1
         if board.is_terminal:
@@ -167,6 +220,7 @@ class GameState(BaseModel):
                 explored_board = self.explored_states[my_key][other_key]
                 board.next_boards = explored_board.next_boards
                 board.terminal_reason = "duplicate"
+                self.duplicate_counter += 1
                 return None
             else:
                 self.explored_states[my_key][other_key] = board
@@ -175,31 +229,284 @@ class GameState(BaseModel):
             self.explored_states[my_key] = {other_key: board}
             return board
 
-    # @tracer.capture_method
+    @property
+    def is_deterministic(self) -> bool:
+        return self.node_budget is not None or self.depth_budget is not None
+
+    def is_search_exhausted(self, request_time: float) -> bool:
+        if self.is_stopped:
+            return True
+        if self.is_deterministic:
+            return self.node_budget is not None and self.counter >= self.node_budget
+        return (time.time_ns() // 1_000_000) > self.get_search_deadline(
+            request_time=request_time
+        )
+
+    def get_backup_deadline(self, request_time: float) -> float:
+        # Quiescence extensions are bounded by plies, so deterministic mode needs no deadline
+        if self.is_deterministic:
+            return float("inf")
+        return request_time + SEARCH_BUDGET_MS
+
+    def get_search_deadline(self, request_time: float) -> float:
+        # Leaves time after the main search for the quiescence extensions
+        return request_time + SEARCH_BUDGET_MS - QUIESCENCE_BUDGET_MS
+
+    def get_locality_radius(self, request_time: float) -> int:
+        """
+        Shrinks the interaction radius linearly as the search budget runs out. Early plies can afford
+        to branch every nearby opponent; late, deep plies only branch the closest ones.
+        """
+        if self.is_deterministic:
+            # By the share of the node budget used instead, so that the radius doesn't depend on
+            # the machine
+            used = (
+                self.counter / self.node_budget if self.node_budget is not None else 0
+            )
+        else:
+            used = ((time.time_ns() // 1_000_000) - request_time) / SEARCH_BUDGET_MS
+        remaining = min(max(1 - used, 0), 1)
+        return LOCALITY_MIN_RADIUS + round(
+            (LOCALITY_MAX_RADIUS - LOCALITY_MIN_RADIUS) * remaining
+        )
+
+    @profiled("GameState.increment_frontier")
     def increment_frontier(self, request_time: float):
         next_boards: list[BoardState] = []
+        locality_radius = self.get_locality_radius(request_time=request_time)
         for board in self.frontier:
             if board is None:
                 continue
-            board.populate_next_boards()
+            board.populate_next_boards(locality_radius=locality_radius)
             next_boards.extend(
                 [self.handle(next_board) for next_board in board.next_boards]
             )
-            if (time.time_ns() // 1_000_000) > (request_time + 320):
+            if self.is_search_exhausted(request_time=request_time):
                 raise TimeoutException()
         self.frontier.clear()
         self.frontier.extend(next_boards)
 
-    @tracer.capture_method
-    def get_next_move(self, request_time: float):
+    @profiled("GameState.get_fallback_move")
+    def get_fallback_move(self) -> Direction:
+        """
+        The move into the most room, by flood fill from each of my snake's moves, avoiding
+        head-to-heads with snakes at least as long. Cheap enough to compute before every search, so
+        there's always a sensible move to return.
+        """
+        board = self.current_board
+        my_body = tuple(board.my_snake.body)
+        other_snakes = [
+            snake for snake in board.other_snakes if snake.elimination is None
+        ]
+        neighbor_table = get_coord_neighbor_table(
+            board_width=self.board_width,
+            board_height=self.board_height,
+            is_wrapped=board.is_wrapped,
+        )
+        other_bodies = frozenset(
+            coord for snake in other_snakes for coord in snake.body[:-1]
+        )
+        # From the neighbor table rather than the board's move arrays, which are empty when the
+        # board is terminal, as a solo game's always is
+        moves = get_open_neighbors(
+            coord=my_body[0],
+            obstacles=other_bodies | set(my_body[:-1]),
+            neighbor_table=neighbor_table,
+        )
+        if len(moves) == 0:
+            return "up"
+
+        # Coordinates a snake at least as long as mine could also move into
+        contested = {
+            adjacent
+            for snake in other_snakes
+            if len(snake.body) >= len(my_body)
+            for adjacent in neighbor_table[snake.head]
+        }
+        candidates = {}
+        for move in moves:
+            next_body = get_next_body(body=my_body, move=move, food=board.food_set)
+            candidates[move] = (
+                move not in contested,
+                get_reachable_area(
+                    body=next_body,
+                    neighbor_table=neighbor_table,
+                    obstacles=other_bodies,
+                ),
+            )
+        return self.get_move_direction(
+            next_head=max(moves, key=lambda move: candidates[move])
+        )
+
+    def get_hard_deadline(self, request_time: float) -> float:
+        # Leaves room for the response to travel back before the game's timeout
+        return request_time + self.game.timeout - WATCHDOG_MARGIN_MS
+
+    def update_search_telemetry(self) -> None:
+        self.telemetry.budget_ms = self.game.timeout
+        self.telemetry.nodes = self.counter
+        self.telemetry.terminal_nodes = self.terminal_counter
+        self.telemetry.transposition_hits = self.duplicate_counter
+
+    def commit_search(self) -> None:
+        if self.game_session is not None and self.move_ordering is not None:
+            self.game_session.move_ordering = self.move_ordering
+
+    @capture_method
+    def get_next_move(self, request_time: float) -> Direction:
+        """
+        Runs the search on a worker thread. If it hasn't returned by the hard deadline, a watchdog
+        signals it to stop and returns the fallback move instead of letting the game move us
+        straight ahead. Only a search that finished in time updates the game session, and the
+        search's statistics are only reported once it has stopped. In deterministic mode, the search
+        runs to its budget on this thread instead.
+        """
+        if self.is_deterministic:
+            start = time.time_ns() // 1_000_000
+            move = self.search_next_move(request_time=request_time)
+            self.telemetry.search_ms = (
+                (time.time_ns() // 1_000_000) - start - self.telemetry.backup_ms
+            )
+            self.update_search_telemetry()
+            self.commit_search()
+            return move
+
+        fallback_move = self.get_fallback_move()
+        # The search runs on a copy with its own counters and telemetry. They're only read back
+        # once the search has stopped, so nothing here races with it
+        searcher = self.model_copy(update={"telemetry": MoveTelemetry()})
+        result: dict[str, Direction] = {}
+
+        def search() -> None:
+            try:
+                result["move"] = searcher.search_next_move(request_time=request_time)
+            except TimeoutException:
+                pass
+            except Exception:
+                logger.exception("search failed")
+
+        start = time.time_ns() // 1_000_000
+        timeout = self.get_hard_deadline(request_time=request_time) - start
+        # In a copy of this context, so that the search records into this move's profiler
+        thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(search,), daemon=True
+        )
+        if timeout > 0:
+            thread.start()
+            thread.join(timeout=timeout / 1000)
+        is_timed_out = thread.is_alive()
+        if is_timed_out:
+            self.stop_event.set()
+            thread.join(timeout=WATCHDOG_STOP_MS / 1000)
+        is_search_running = thread.is_alive()
+
+        if not is_search_running:
+            self.counter = searcher.counter
+            self.terminal_counter = searcher.terminal_counter
+            self.duplicate_counter = searcher.duplicate_counter
+            self.move_ordering = searcher.move_ordering
+            self.telemetry.engine = searcher.telemetry.engine
+            self.telemetry.depth = searcher.telemetry.depth
+            self.telemetry.backup_ms = searcher.telemetry.backup_ms
+        self.telemetry.search_ms = (
+            (time.time_ns() // 1_000_000) - start - self.telemetry.backup_ms
+        )
+        self.update_search_telemetry()
+        if not is_timed_out and "move" in result:
+            self.commit_search()
+            return result["move"]
+
+        self.telemetry.is_fallback = True
+
+        logger.warning(
+            "get_next_move",
+            engine="fallback",
+            move=fallback_move,
+            is_search_running=is_search_running,
+        )
+        return fallback_move
+
+    @profiled("GameState.search_next_move")
+    def search_next_move(self, request_time: float) -> Direction:
+        forced_move = self.current_board.get_forced_move()
+        if forced_move is not None:
+            move = self.get_move_direction(next_head=forced_move)
+            self.telemetry.engine = "forced"
+            logger.info("get_next_move", engine="forced", move=move)
+            return move
+
+        if self.game.ruleset.name == "solo":
+            solo_move = get_solo_move(board=self.current_board)
+            if solo_move is not None:
+                move = self.get_move_direction(next_head=solo_move)
+                self.telemetry.engine = "solo"
+                logger.info("get_next_move", engine="solo", move=move)
+                return move
+
+        survival_move = get_survival_move(
+            board=self.current_board,
+            stop_event=self.stop_event,
+            # The shared memo would make the result depend on earlier searches
+            is_cached=not self.is_deterministic,
+        )
+        if survival_move is not None:
+            next_head, turns_survived = survival_move
+            move = self.get_move_direction(next_head=next_head)
+            self.telemetry.engine = "survival"
+            logger.info(
+                "get_next_move",
+                engine="survival",
+                move=move,
+                turns_survived=turns_survived,
+            )
+            return move
+
+        if self.game_session is not None:
+            self.move_ordering = self.game_session.move_ordering.model_copy(deep=True)
+        duel_move = get_duel_move(
+            board=self.current_board,
+            deadline=self.get_backup_deadline(request_time=request_time),
+            max_depth=self.depth_budget
+            if self.depth_budget is not None
+            else DUEL_MAX_DEPTH,
+            node_budget=self.node_budget,
+            move_ordering=self.move_ordering,
+            stop_event=self.stop_event,
+        )
+        if duel_move is not None:
+            next_head, score, depth, nodes = duel_move
+            move = self.get_move_direction(next_head=next_head)
+            self.counter += nodes
+            self.telemetry.engine = "duel"
+            self.telemetry.depth = depth
+            logger.info(
+                "get_next_move",
+                engine="duel",
+                move=move,
+                score=score,
+                depth=depth,
+            )
+            return move
+
         try:
-            while len(self.frontier) > 0:
-                if (time.time_ns() // 1_000_000) > (request_time + 320):
+            while len(self.frontier) > 0 and (
+                self.depth_budget is None or self.telemetry.depth < self.depth_budget
+            ):
+                if self.is_search_exhausted(request_time=request_time):
                     raise TimeoutException()
                 logger.debug("incrementing frontier")
                 self.increment_frontier(request_time=request_time)
+                self.telemetry.depth += 1
         except TimeoutException:
-            pass
+            if self.is_stopped:
+                raise
+
+        backup_start = time.time_ns() // 1_000_000
+        self.current_board.backup(
+            deadline=self.get_backup_deadline(request_time=request_time),
+            stop_event=self.stop_event,
+        )
+        self.telemetry.backup_ms = (time.time_ns() // 1_000_000) - backup_start
 
         min_score_per_head = {
             head_coord: min([board.score for board in boards])
@@ -217,21 +524,7 @@ class GameState(BaseModel):
             reverse=True,
         )[0][0]
 
-        direction = Coord(
-            x=self.current_board.my_snake.head.x - best_head_score.x,
-            y=self.current_board.my_snake.head.y - best_head_score.y,
-        )
-
-        if self.current_board.my_snake.head + Coord(x=-1, y=0) == best_head_score:
-            move = "left"
-        elif self.current_board.my_snake.head + Coord(x=1, y=0) == best_head_score:
-            move = "right"
-        elif self.current_board.my_snake.head + Coord(x=0, y=-1) == best_head_score:
-            move = "down"
-        elif self.current_board.my_snake.head + Coord(x=0, y=1) == best_head_score:
-            move = "up"
-        else:
-            raise Exception(f"Unhandled direction: {direction}")
+        move = self.get_move_direction(next_head=best_head_score)
 
         logger.info(
             "get_next_move",
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from aws_lambda_powertools.utilities.parser import BaseModel
+from aws_lambda_powertools import Logger
+from pydantic import NonNegativeInt
+
+from battle_python.api_types import Coord
+from battle_python.constants import HAZARD_SCHEDULE_DEPTH
+
+logger = Logger()
+
+
+def get_safe_zone(
+    board_width: int, board_height: int, hazard_coords: frozenset[Coord]
+) -> tuple[int, int, int, int] | None:
+    """
+    Returns the bounding box (min_x, max_x, min_y, max_y) of the coordinates that aren't hazards,
+    or None if the whole board is a hazard
+    """
+    safe_coords = [
+        Coord(x=x, y=y)
+        for x in range(board_width)
+        for y in range(board_height)
+        if Coord(x=x, y=y) not in hazard_coords
+    ]
+    if len(safe_coords) == 0:
+        return None
+    return (
+        min(coord.x for coord in safe_coords),
+        max(coord.x for coord in safe_coords),
+        min(coord.y for coord in safe_coords),
+        max(coord.y for coord in safe_coords),
+    )
+
+
+def get_shrunk_hazards(
+    board_width: int,
+    board_height: int,
+    safe_zone: tuple[int, int, int, int],
+    hazard_coords: frozenset[Coord],
+) -> frozenset[Coord]:
+    min_x, max_x, min_y, max_y = safe_zone
+    return hazard_coords | frozenset(
+        Coord(x=x, y=y)
+        for x in range(board_width)
+        for y in range(board_height)
+        if not (min_x <= x <= max_x and min_y <= y <= max_y)
+    )
+
+
+class HazardSchedule(BaseModel):
+    """
+    The hazards on every future turn, precomputed once per move request so that boards deep in the
+    search see the hazards of their own turn.
+
+    Royale shrinks the safe zone by one row or column on a random side every shrinkEveryNTurns turns.
+    The side can't be predicted, so each shrink conservatively covers the outer ring on all four
+    sides. Without a royale shrink, hazards are static.
+    """
+
+    turn: NonNegativeInt
+    hazard_coords_by_turn: tuple[tuple[Coord, ...], ...]
+    hazard_sets_by_turn: tuple[frozenset[Coord], ...]
+
+    @classmethod
+    def factory(
+        cls,
+        turn: int,
+        board_width: int,
+        board_height: int,
+        hazard_coords: tuple[Coord, ...],
+        shrink_every_n_turns: int | None = None,
+        depth: int = HAZARD_SCHEDULE_DEPTH,
+    ) -> HazardSchedule:
+        hazards = frozenset(hazard_coords)
+        hazard_sets_by_turn = [hazards]
+
+        if shrink_every_n_turns is not None and shrink_every_n_turns > 0:
+            safe_zone = get_safe_zone(
+                board_width=board_width,
+                board_height=board_height,
+                hazard_coords=hazards,
+            )
+            for future_turn in range(turn + 1, turn + depth + 1):
+                if safe_zone is not None and future_turn % shrink_every_n_turns == 0:
+                    min_x, max_x, min_y, max_y = safe_zone
+                    safe_zone = (min_x + 1, max_x - 1, min_y + 1, max_y - 1)
+                    hazards = get_shrunk_hazards(
+                        board_width=board_width,
+                        board_height=board_height,
+                        safe_zone=safe_zone,
+                        hazard_coords=hazards,
+                    )
+                    if min_x + 1 > max_x - 1 or min_y + 1 > max_y - 1:
+                        safe_zone = None
+                hazard_sets_by_turn.append(hazards)
+
+        return cls(
+            turn=turn,
+            hazard_coords_by_turn=tuple(
+                tuple(sorted(hazard_set)) for hazard_set in hazard_sets_by_turn
+            ),
+            hazard_sets_by_turn=tuple(hazard_sets_by_turn),
+        )
+
+    def get_index(self, turn: int) -> int:
+        # Turns past the end of the schedule keep the last known hazards
+        return min(max(turn - self.turn, 0), len(self.hazard_sets_by_turn) - 1)
+
+    def get_hazard_coords(self, turn: int) -> tuple[Coord, ...]:
+        return self.hazard_coords_by_turn[self.get_index(turn=turn)]
+
+    def is_hazard(self, coord: Coord, turn: int) -> bool:
+        return coord in self.hazard_sets_by_turn[self.get_index(turn=turn)]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from aws_lambda_powertools.utilities.parser import BaseModel
+from aws_lambda_powertools import Logger
+from pydantic import Field
+
+from battle_python.api_types import Coord
+from battle_python.constants import HISTORY_DECAY, KILLER_MOVES_PER_PLY
+
+logger = Logger()
+
+# The coordinate a head moves from, and the coordinate it moves to
+Move = tuple[Coord, Coord]
+
+
+class MoveOrdering(BaseModel):
+    """
+    Orders candidate moves so that alpha-beta searches the likely best move first.
+
+    Killer moves are the moves that caused a cutoff at the same ply elsewhere in the tree; they're
+    tried first. The rest are ordered by their history score, which every cutoff raises by the
+    square of the remaining depth, so cutoffs near the root count the most. History is kept in the
+    game session and decays between turns, since a good move last turn is often good this turn.
+    """
+
+    history: dict[Move, float] = Field(default_factory=dict)
+    killers: dict[int, list[Move]] = Field(default_factory=dict)
+
+    def start_search(self) -> None:
+        # Killers are specific to a ply of the previous search
+        self.killers.clear()
+        self.history = {
+            move: score * HISTORY_DECAY
+            for move, score in self.history.items()
+            if score * HISTORY_DECAY >= 1
+        }
+
+    def order_moves(self, head: Coord, moves: list[Coord], ply: int) -> list[Coord]:
+        killers = self.killers.get(ply, [])
+        return sorted(
+            moves,
+            key=lambda move: (
+                (head, move) not in killers,
+                -self.history.get((head, move), 0),
+            ),
+        )
+
+    def record_cutoff(self, head: Coord, move: Coord, ply: int, depth: int) -> None:
+        self.history[(head, move)] = self.history.get((head, move), 0) + depth * depth
+
+        killers = self.killers.setdefault(ply, [])
+        if (head, move) in killers:
+            return
+        killers.insert(0, (head, move))
+        del killers[KILLER_MOVES_PER_PLY:]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from aws_lambda_powertools.utilities.parser import BaseModel
+from aws_lambda_powertools import Logger
+from pydantic import Field
+
+from battle_python.SnakeState import SnakeState
+from battle_python.api_types import Coord
+from battle_python.constants import (
+    LEARNED_MIN_OBSERVATIONS,
+    OPPONENT_FOOD_WEIGHT,
+    OPPONENT_STRAIGHT_WEIGHT,
+    OPPONENT_UNSAFE_WEIGHT,
+)
+from battle_python.geometry import get_food_distance as get_board_food_distance
+
+if TYPE_CHECKING:
+    from battle_python.BoardState import BoardState
+
+logger = Logger()
+
+
+def get_food_distance(board: BoardState, coord: Coord) -> int | None:
+    return get_board_food_distance(
+        coord=coord,
+        food=board.food_set,
+        board_width=board.board_width,
+        board_height=board.board_height,
+        is_wrapped=board.is_wrapped,
+    )
+
+
+def is_toward_food(
+    board: BoardState, snake: SnakeState, next_state: SnakeState
+) -> bool:
+    food_distance = get_food_distance(board=board, coord=snake.head)
+    if food_distance is None:
+        return False
+    return get_food_distance(board=board, coord=next_state.head) < food_distance
+
+
+def is_unsafe(board: BoardState, next_state: SnakeState) -> bool:
+    # Eliminates the snake, or risks a losing head-to-head with my snake
+    if next_state.elimination is not None:
+        return True
+    return (
+        board.get_distance(next_state.head, board.my_snake.head) == 1
+        and next_state.prev_state is not None
+        and next_state.prev_state.length <= board.my_snake.length
+    )
+
+
+def is_straight(board: BoardState, snake: SnakeState, next_state: SnakeState) -> bool:
+    if len(snake.body) < 2 or snake.body[0] == snake.body[1]:
+        # No direction yet
+        return False
+    return next_state.head == board.get_straight_coord(snake=snake)
+
+
+class SnakeStatistics(BaseModel):
+    """
+    How an opponent has moved so far. Straight moves are only counted once the snake has a
+    direction, and food moves only while there's food on the board.
+    """
+
+    directed_moves: int = 0
+    straight_moves: int = 0
+    food_seeking_moves: int = 0
+    food_moves: int = 0
+
+    @property
+    def straight_probability(self) -> float:
+        # Laplace smoothing over straight, left and right
+        return (self.straight_moves + 1) / (self.directed_moves + 3)
+
+    @property
+    def food_probability(self) -> float:
+        return (self.food_moves + 1) / (self.food_seeking_moves + 2)
+
+
+class OpponentModel(BaseModel, ABC):
+    """
+    Assigns a relative weight to each of an opponent's next states. Every model discounts moves that
+    eliminate the snake or risk a losing head-to-head with my snake, and then applies its own
+    preferences on top.
+    """
+
+    @abstractmethod
+    def get_preference_weight(
+        self, board: BoardState, snake: SnakeState, next_state: SnakeState
+    ) -> float:
+        pass
+
+    def get_move_weights(
+        self, board: BoardState, snake: SnakeState, next_states: list[SnakeState]
+    ) -> list[float]:
+        return [
+            (
+                OPPONENT_UNSAFE_WEIGHT
+                if is_unsafe(board=board, next_state=next_state)
+                else 1.0
+            )
+            * self.get_preference_weight(
+                board=board, snake=snake, next_state=next_state
+            )
+            for next_state in next_states
+        ]
+
+    def get_move_probabilities(
+        self, board: BoardState, snake: SnakeState, next_states: list[SnakeState]
+    ) -> list[float]:
+        weights = self.get_move_weights(
+            board=board, snake=snake, next_states=next_states
+        )
+        total = sum(weights)
+        return [weight / total for weight in weights]
+
+
+class UniformOpponentModel(OpponentModel):
+    def get_preference_weight(
+        self, board: BoardState, snake: SnakeState, next_state: SnakeState
+    ) -> float:
+        return 1.0
+
+
+class GreedyFoodOpponentModel(OpponentModel):
+    def get_preference_weight(
+        self, board: BoardState, snake: SnakeState, next_state: SnakeState
+    ) -> float:
+        if is_toward_food(board=board, snake=snake, next_state=next_state):
+            return OPPONENT_FOOD_WEIGHT
+        return 1.0
+
+
+class StraightBiasOpponentModel(OpponentModel):
+    def get_preference_weight(
+        self, board: BoardState, snake: SnakeState, next_state: SnakeState
+    ) -> float:
+        if is_straight(board=board, snake=snake, next_state=next_state):
+            return OPPONENT_STRAIGHT_WEIGHT
+        return 1.0
+
+
+class LearnedOpponentModel(OpponentModel):
+    """
+    Weighs moves by how often each opponent has gone straight and toward food so far. Snakes with
+    too few observations fall back to the default model.
+    """
+
+    # Statistics are keyed by snake name, which is stable across games, unlike the id
+    snake_names: dict[str, str] = Field(default_factory=dict)
+    snake_statistics: dict[str, SnakeStatistics] = Field(default_factory=dict)
+    fallback: OpponentModel = Field(default_factory=lambda: GreedyFoodOpponentModel())
+
+    def get_statistics(self, snake: SnakeState) -> SnakeStatistics | None:
+        statistics = self.snake_statistics.get(self.snake_names.get(snake.id))
+        if statistics is None or statistics.directed_moves < LEARNED_MIN_OBSERVATIONS:
+            return None
+        return statistics
+
+    def get_preference_weight(
+        self, board: BoardState, snake: SnakeState, next_state: SnakeState
+    ) -> float:
+        statistics = self.get_statistics(snake=snake)
+        if statistics is None:
+            return self.fallback.get_preference_weight(
+                board=board, snake=snake, next_state=next_state
+            )
+
+        if is_straight(board=board, snake=snake, next_state=next_state):
+            weight = statistics.straight_probability
+        else:
+            weight = (1 - statistics.straight_probability) / 2
+
+        if get_food_distance(board=board, coord=snake.head) is not None:
+            if is_toward_food(board=board, snake=snake, next_state=next_state):
+                weight *= statistics.food_probability
+            else:
+                weight *= 1 - statistics.food_probability
+
+        return weight
+
+
+default_opponent_model = GreedyFoodOpponentModel()
@@ -1,90 +1,64 @@
-import os
-import time
 from typing import Literal
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.logging import correlation_paths
-from aws_lambda_powertools.utilities.parser import parse, ValidationError
+from aws_lambda_powertools.utilities.parser import ValidationError
 from aws_lambda_powertools import Logger
-from aws_lambda_powertools import Tracer
-from aws_lambda_powertools import Metrics
 
 logger = Logger()
-tracer = Tracer()
-metrics = Metrics(namespace="Powertools")
 
-from battle_python.GameState import GameState
-from battle_python.api_types import SnakeMetadataResponse, SnakeRequest
+from battle_python.decoder import decode_request
+from battle_python.handlers import end_game, get_move, get_snake_details, start_game
+from battle_python.observability import (
+    capture_lambda_handler,
+    capture_method,
+    log_metrics,
+)
+from battle_python.warmup import is_warmup_enabled, warmup
 
 RestMethod = Literal["GET", "POST"]
 api = APIGatewayRestResolver()
 
-# TODO: Anticipate hazard progression
+# Runs during the Lambda init phase, before the first request
+if is_warmup_enabled():
+    warmup()
 
 
 @api.get("/")
-@tracer.capture_method
+@capture_method
 def battlesnake_details() -> dict:
-    return SnakeMetadataResponse(
-        author=os.environ.get("BATTLESNAKE_AUTHOR"),
-        color=os.environ.get("BATTLESNAKE_COLOR"),
-        head=os.environ.get("BATTLESNAKE_HEAD"),
-        tail=os.environ.get("BATTLESNAKE_TAIL"),
-        version=os.environ.get("BATTLESNAKE_VERSION"),
-    ).model_dump()
+    return get_snake_details()
 
 
 @api.post("/start")
-@tracer.capture_method
+@capture_method
 def game_started() -> dict[str, int | str]:
-    body = api.current_event.json_body
-    logger.append_keys(game_id=body["game"]["id"])
-    logger.append_keys(turn=body["turn"])
     try:
-        parse(event=body, model=SnakeRequest)
+        body = decode_request(api.current_event.decoded_body)
     except ValidationError:
         return {"status_code": 400, "message": "Invalid order"}
-    return {"status_code": 200, "message": "Let's get to it!"}
+    return start_game(body=body)
 
 
 @api.post("/move")
-@tracer.capture_method
+@capture_method
 def move() -> dict[str, int | str]:
-    body = api.current_event.json_body
-
-    logger.append_keys(game_id=body["game"]["id"])
-    logger.append_keys(my_snake_id=body["you"]["id"])
-    logger.append_keys(turn=body["turn"])
-
     request_time = api.current_event.request_context.request_time_epoch
     try:
-        gs = GameState.from_payload(api.current_event.json_body)
-        move = gs.get_next_move(request_time)
-        ms_elapsed = (time.time_ns() // 1_000_000) - request_time
-        logger.debug(
-            "returning move",
-            ms_elapsed=ms_elapsed,
-            move=move,
-        )
-        return {"move": move}
+        body = decode_request(api.current_event.decoded_body)
     except ValidationError:
         return {"status_code": 400, "message": "Invalid"}
+    return get_move(body=body, request_time=request_time)
 
 
 @api.post("/end")
-@tracer.capture_method
+@capture_method
 def game_over() -> dict[str, int | str]:
-    body = api.current_event.json_body
-
-    logger.append_keys(game_id=body["game"]["id"])
-    logger.append_keys(turn=body["turn"])
-
     try:
-        parse(event=body, model=SnakeRequest)
+        body = decode_request(api.current_event.decoded_body)
     except ValidationError:
         return {"status_code": 400, "message": "Invalid order"}
-
-    return {"status_code": 200, "message": "Good game!"}
+    return end_game(body=body)
 
 
 # Enrich logging with contextual information from Lambda
@@ -93,11 +67,11 @@ def game_over() -> dict[str, int | str]:
     log_event=True,
     clear_state=True,
 )
-# Adding tracer
+# Adding tracer. The tracer and metrics are only created on the first invocation
 # See: https://awslabs.github.io/aws-lambda-powertools-python/latest/core/tracer/
-@tracer.capture_lambda_handler
+@capture_lambda_handler
 # ensures metrics are flushed upon request completion/failure and capturing ColdStart metric
-@metrics.log_metrics(capture_cold_start_metric=True)  # type: ignore
+@log_metrics
 def lambda_handler(event: dict, context: LambdaContext) -> dict:
     return api.resolve(event, context)
 
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Literal, NamedTuple
+from typing import Annotated, Any, Literal, NamedTuple
 from aws_lambda_powertools.utilities.parser import BaseModel
-from pydantic import NonNegativeInt, ConfigDict
+from pydantic import NonNegativeInt, ConfigDict, Field
 
 Direction = Literal[
     "up",
@@ -23,10 +23,28 @@ RulesetName = Literal[
 ]
 
 
+# A field holding a reference to an object shared with other models, such as a lookup table. Any,
+# so that pydantic keeps the reference instead of validating and copying the object, and excluded
+# from dumps, since it isn't part of the model's own state
+Shared = Annotated[Any, Field(exclude=True)]
+
+
 class FrozenBaseModel(BaseModel):
     model_config = ConfigDict(frozen=True)
 
 
+class StoppableSearch(BaseModel):
+    """
+    A search that gives up once its stop event is set, e.g. by the watchdog at the hard deadline
+    """
+
+    stop_event: Shared = None
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+
 class SnakeCustomizations(FrozenBaseModel):
     color: str = "#888888"
     head: str = "default"
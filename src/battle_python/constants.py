@@ -15,3 +15,78 @@ DEATH_COORD = Coord(x=1000, y=1000)
 FOOD_WEIGHT = 20
 AREA_MULTIPLIER = 1
 CENTER_CONTROL_WEIGHT = 2
+
+# Survival solver
+SURVIVAL_MAX_NODES = 5_000
+SURVIVAL_CACHE_SIZE = 8
+
+# Solo engine. Extra health kept in reserve before heading for food
+SOLO_HUNGER_MARGIN = 10
+
+# Hazard schedule. Turns of future hazards precomputed per move request
+HAZARD_SCHEDULE_DEPTH = 32
+
+# Duel engine. Iterative deepening stops at the deadline or at this many turns
+DUEL_MAX_DEPTH = 16
+DUEL_LENGTH_WEIGHT = 2
+# Wins and losses score at least DUEL_WIN_SCORE either way, well clear of any Voronoi evaluation on
+# the largest boards, so that a decided result can't be mistaken for a position
+DUEL_WIN_SCORE = 1_000_000
+
+# Search. Milliseconds after the request arrives that the search must finish by
+SEARCH_BUDGET_MS = 320
+
+# Opponents that could meet my snake within this many moves are fully branched. The radius shrinks
+# toward the minimum as the search budget runs out
+LOCALITY_MAX_RADIUS = 6
+LOCALITY_MIN_RADIUS = 2
+
+# Past this many joint moves per board, opponent joint moves are sampled instead of enumerated
+JOINT_MOVE_SAMPLE_THRESHOLD = 81
+JOINT_MOVE_SAMPLES = 8
+JOINT_MOVE_SAMPLE_SEED = 0
+
+# Opponent models. Relative likelihood of opponent moves
+OPPONENT_UNSAFE_WEIGHT = 0.1
+OPPONENT_FOOD_WEIGHT = 2
+OPPONENT_STRAIGHT_WEIGHT = 3
+# Moves a snake must be seen making before its learned statistics are trusted
+LEARNED_MIN_OBSERVATIONS = 10
+# Opponent moves less likely than this are pruned, unless they end this close to my snake's head
+OPPONENT_PRUNE_PROBABILITY = 0.1
+OPPONENT_PRUNE_DISTANCE = 2
+
+# Move ordering. History scores carry over between turns at this rate
+HISTORY_DECAY = 0.5
+KILLER_MOVES_PER_PLY = 2
+
+# Quiescence. Leaves where my snake's head is this close to an opponent's are extended by up to
+# QUIESCENCE_PLIES plies, branching only snakes that could meet within QUIESCENCE_RADIUS moves.
+# The main search stops QUIESCENCE_BUDGET_MS early to leave time for the extensions
+QUIESCENCE_DISTANCE = 2
+QUIESCENCE_PLIES = 2
+QUIESCENCE_RADIUS = 1
+QUIESCENCE_BUDGET_MS = 20
+
+# Watchdog. The fallback move is returned this long before the game's timeout if the search hasn't
+# finished, to leave room for network latency. A search that's told to stop gets WATCHDOG_STOP_MS
+# of that margin to do so before its statistics are abandoned
+WATCHDOG_MARGIN_MS = 120
+WATCHDOG_STOP_MS = 20
+
+# Standalone server. Idle keep-alive connections are closed after SERVER_KEEP_ALIVE_TIMEOUT_S. A
+# move that hasn't come back from its worker this long before the game's timeout is answered with
+# the fallback move. It's less than WATCHDOG_MARGIN_MS so the worker's own watchdog fires first
+SERVER_KEEP_ALIVE_TIMEOUT_S = 60
+SERVER_RESPONSE_MARGIN_MS = 60
+
+# Game sessions kept per container. The least recently used session is evicted past this
+MAX_GAME_SESSIONS = 64
+
+# Simulator. Games that outlast SIMULATOR_MAX_TURNS are scored as draws. The rest are the engine's
+# standard settings
+SIMULATOR_MAX_TURNS = 1000
+SIMULATOR_FOOD_SPAWN_CHANCE = 15
+SIMULATOR_MINIMUM_FOOD = 1
+SIMULATOR_HAZARD_DAMAGE = 14
+SIMULATOR_SHRINK_EVERY_N_TURNS = 25
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from battle_python.SnakeState import SnakeState
+from battle_python.api_types import RulesetName
+from battle_python.constants import SNAKE_BODY_VALUE, UNEXPLORED_VALUE
+
+CONSTRICTOR_RULESETS: tuple[RulesetName, ...] = ("constrictor", "wrapped_constrictor")
+
+
+def is_constrictor_ruleset(ruleset_name: RulesetName) -> bool:
+    return ruleset_name in CONSTRICTOR_RULESETS
+
+
+def get_occupancy_array(
+    board_array: npt.NDArray[np.int_], snakes: tuple[SnakeState, ...]
+) -> npt.NDArray[np.bool_]:
+    """
+    Returns a padded boolean array of every coordinate occupied by a living snake. In constrictor,
+    snakes grow every turn and their tails never move, so every segment is a permanent obstacle.
+    """
+    row_count, _ = board_array.shape
+    occupancy_array = np.zeros(board_array.shape, dtype=np.bool_)
+    for snake in snakes:
+        if snake.elimination is not None:
+            continue
+        rows = [(row_count - 2 - coord.y) for coord in snake.body]
+        columns = [coord.x + 1 for coord in snake.body]
+        occupancy_array[rows, columns] = True
+    return occupancy_array
+
+
+def get_next_occupancy_array(
+    prev_occupancy_array: npt.NDArray[np.bool_], snakes: tuple[SnakeState, ...]
+) -> npt.NDArray[np.bool_]:
+    """
+    Occupancy only ever accumulates while every snake survives, so the next turn's occupancy is the
+    previous turn's plus the new heads. That's O(snakes) instead of O(total body length).
+    """
+    row_count, _ = prev_occupancy_array.shape
+    occupancy_array = np.copy(prev_occupancy_array)
+    for snake in snakes:
+        occupancy_array[row_count - 2 - snake.head.y, snake.head.x + 1] = True
+    return occupancy_array
+
+
+def get_constrictor_snake_bodies_array(
+    board_array: npt.NDArray[np.int_],
+    occupancy_array: npt.NDArray[np.bool_],
+    snakes: tuple[SnakeState, ...],
+) -> npt.NDArray[np.int_]:
+    """
+    The constrictor equivalent of get_all_snake_bodies_array, built from the occupancy array rather
+    than from each snake's body
+    """
+    row_count, _ = board_array.shape
+    snake_body_array = np.array(board_array, copy=True)
+    snake_body_array[1:-1, 1:-1] = UNEXPLORED_VALUE
+    snake_body_array[occupancy_array] = SNAKE_BODY_VALUE
+
+    snakes = tuple(snake for snake in snakes if snake.elimination is None)
+    all_snake_bodies_array = np.repeat(snake_body_array[None], len(snakes), axis=0)
+
+    for i, snake in enumerate(snakes):
+        all_snake_bodies_array[i, row_count - 2 - snake.head.y, snake.head.x + 1] = 0
+
+    return all_snake_bodies_array
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import os
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.parser import parse
+
+from battle_python.SnakeState import SnakeState
+from battle_python.api_types import (
+    Coord,
+    SnakeCustomizations,
+    SnakeDef,
+    SnakeRequest,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+logger = Logger()
+
+
+def is_strict_decoding() -> bool:
+    return os.environ.get("BATTLESNAKE_STRICT_DECODING", "false").lower() == "true"
+
+
+def loads(body: str | bytes) -> dict:
+    # orjson is optional. It's several times faster than the standard library on large boards
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def decode_request(body: str | bytes) -> dict:
+    """
+    Parses a request body. The engine reads the payload directly, so the SnakeRequest model is only
+    validated in strict mode. Raises ValidationError in strict mode if the payload is invalid.
+    """
+    payload = loads(body)
+    if is_strict_decoding():
+        parse(event=payload, model=SnakeRequest)
+    return payload
+
+
+def get_coords(coords: list[dict]) -> tuple[Coord, ...]:
+    return tuple(Coord(x=coord["x"], y=coord["y"]) for coord in coords)
+
+
+def get_snake_def(snake: dict, is_self: bool) -> SnakeDef:
+    return SnakeDef.model_construct(
+        id=snake["id"],
+        name=snake["name"],
+        customizations=SnakeCustomizations.model_construct(**snake["customizations"]),
+        is_self=is_self,
+    )
+
+
+def get_snake_state(snake: dict, is_self: bool) -> SnakeState:
+    # Skips validation. The head is the first body coordinate, so it isn't decoded separately
+    body = get_coords(snake["body"])
+    return SnakeState.model_construct(
+        id=snake["id"],
+        health=snake["health"],
+        body=body,
+        head=body[0],
+        length=snake["length"],
+        latency=int(snake["latency"] or 0),
+        shout=snake.get("shout"),
+        is_self=is_self,
+    )
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+from aws_lambda_powertools import Logger
+from pydantic import Field
+
+from battle_python.BoardState import BoardState
+from battle_python.MoveOrdering import MoveOrdering
+from battle_python.api_types import Coord, Shared, StoppableSearch
+from battle_python.constants import (
+    DUEL_LENGTH_WEIGHT,
+    DUEL_MAX_DEPTH,
+    DUEL_WIN_SCORE,
+    QUIESCENCE_PLIES,
+)
+from battle_python.geometry import get_coord_neighbor_table
+
+logger = Logger()
+
+# my body, my health, opponent body, opponent health, food, turn
+DuelState = tuple[tuple[Coord, ...], int, tuple[Coord, ...], int, frozenset[Coord], int]
+
+# Both snakes eliminated on the same turn. Better than losing, worse than anything else, and not a
+# decided result: a deeper search may still find a win
+DRAW_SCORE = -DUEL_WIN_SCORE // 2
+
+
+def is_decided(score: float) -> bool:
+    return abs(score) >= DUEL_WIN_SCORE
+
+
+class DuelTimeout(Exception):
+    pass
+
+
+def get_duel_opponent(board: BoardState):
+    living_snakes = [snake for snake in board.other_snakes if snake.elimination is None]
+    if len(living_snakes) != 1:
+        return None
+    return living_snakes[0]
+
+
+class DuelSolver(StoppableSearch):
+    """
+    Two-player zero-sum search for 1v1 endgames. The game is simultaneous, so it's modelled
+    pessimistically: for each of my moves, the opponent picks the reply that's worst for me, as if
+    it had seen my move first. That turns the turn into a max over my moves of a min over the
+    opponent's, which alpha-beta prunes well. Leaves are scored by the Voronoi area difference:
+    the coordinates each snake reaches strictly first.
+    """
+
+    hazard_damage_rate: int
+    is_constrictor: bool = False
+    hazard_schedule: Shared
+    neighbor_table: Shared
+    move_ordering: MoveOrdering = Field(default_factory=MoveOrdering, exclude=True)
+    deadline: float
+    # Deterministic mode. Bounds the search by nodes rather than by the deadline
+    node_budget: int | None = None
+    nodes: int = 0
+
+    def get_moves(
+        self, body: tuple[Coord, ...], other_body: tuple[Coord, ...]
+    ) -> list[Coord]:
+        # Tails move out of the way unless they're stacked from eating
+        obstacles = {*body[:-1], *other_body[:-1]}
+        moves = [
+            coord for coord in self.neighbor_table[body[0]] if coord not in obstacles
+        ]
+        if len(moves) == 0:
+            # Every move is fatal. Pick one so that the elimination is resolved
+            return [self.neighbor_table[body[0]][0]]
+        return moves
+
+    def get_next_snake(
+        self,
+        body: tuple[Coord, ...],
+        health: int,
+        move: Coord,
+        food: frozenset[Coord],
+        turn: int,
+    ) -> tuple[tuple[Coord, ...], int]:
+        next_body = (move, *body[:-1])
+        if self.is_constrictor:
+            return (*next_body, next_body[-1]), 100
+        if move in food:
+            return (*next_body, next_body[-1]), 100
+        next_health = health - 1
+        if self.hazard_schedule.is_hazard(coord=move, turn=turn):
+            next_health -= self.hazard_damage_rate
+        return next_body, next_health
+
+    def get_next_state(
+        self, state: DuelState, my_move: Coord, other_move: Coord
+    ) -> tuple[float | None, DuelState]:
+        """
+        Resolves both moves at once. Returns the outcome score if the game ended, and the next state
+        """
+        my_body, my_health, other_body, other_health, food, turn = state
+        my_body, my_health = self.get_next_snake(
+            body=my_body, health=my_health, move=my_move, food=food, turn=turn
+        )
+        other_body, other_health = self.get_next_snake(
+            body=other_body, health=other_health, move=other_move, food=food, turn=turn
+        )
+        next_state = (
+            my_body,
+            my_health,
+            other_body,
+            other_health,
+            food - {my_move, other_move},
+            turn + 1,
+        )
+
+        is_me_eliminated = (
+            my_health <= 0 or my_move in my_body[1:] or my_move in other_body[1:]
+        )
+        is_other_eliminated = (
+            other_health <= 0
+            or other_move in other_body[1:]
+            or other_move in my_body[1:]
+        )
+        if my_move == other_move:
+            is_me_eliminated |= len(my_body) <= len(other_body)
+            is_other_eliminated |= len(other_body) <= len(my_body)
+
+        if is_me_eliminated and is_other_eliminated:
+            return DRAW_SCORE, next_state
+        if is_me_eliminated:
+            return -DUEL_WIN_SCORE, next_state
+        if is_other_eliminated:
+            return DUEL_WIN_SCORE, next_state
+        return None, next_state
+
+    def get_voronoi_areas(self, state: DuelState) -> tuple[int, int]:
+        """
+        Breadth-first search from both heads at once. Coordinates reached by both snakes on the same
+        move belong to neither.
+        """
+        my_body, _, other_body, _, _, _ = state
+        obstacles = {*my_body[:-1], *other_body[:-1]}
+        owners: dict[Coord, int] = {my_body[0]: 0, other_body[0]: 1}
+        distances: dict[Coord, int] = {my_body[0]: 0, other_body[0]: 0}
+        unexplored = deque([my_body[0], other_body[0]])
+        areas = [0, 0]
+        while len(unexplored) > 0:
+            coord = unexplored.popleft()
+            owner = owners[coord]
+            if owner == -1:
+                continue
+            for adjacent in self.neighbor_table[coord]:
+                if adjacent in obstacles:
+                    continue
+                if adjacent not in distances:
+                    distances[adjacent] = distances[coord] + 1
+                    owners[adjacent] = owner
+                    areas[owner] += 1
+                    unexplored.append(adjacent)
+                elif distances[adjacent] == distances[coord] + 1 and owners[
+                    adjacent
+                ] not in (owner, -1):
+                    # Contested
+                    areas[owners[adjacent]] -= 1
+                    owners[adjacent] = -1
+        return areas[0], areas[1]
+
+    def evaluate(self, state: DuelState) -> float:
+        my_body, _, other_body, _, _, _ = state
+        my_area, other_area = self.get_voronoi_areas(state=state)
+        return (my_area - other_area) + DUEL_LENGTH_WEIGHT * (
+            len(my_body) - len(other_body)
+        )
+
+    def get_ordered_moves(
+        self, body: tuple[Coord, ...], other_body: tuple[Coord, ...], ply: int
+    ) -> list[Coord]:
+        return self.move_ordering.order_moves(
+            head=body[0],
+            moves=self.get_moves(body=body, other_body=other_body),
+            ply=ply,
+        )
+
+    def is_in_contact(self, state: DuelState) -> bool:
+        # Heads within two moves of each other, the same QUIESCENCE_DISTANCE the generic search uses
+        my_body, _, other_body, _, _, _ = state
+        my_neighbors = self.neighbor_table[my_body[0]]
+        return other_body[0] in my_neighbors or any(
+            other_body[0] in self.neighbor_table[coord] for coord in my_neighbors
+        )
+
+    def search(
+        self,
+        state: DuelState,
+        depth: int,
+        alpha: float,
+        beta: float,
+        ply: int,
+        extension: int = QUIESCENCE_PLIES,
+    ) -> float:
+        if depth == 0:
+            if extension == 0 or not self.is_in_contact(state=state):
+                return self.evaluate(state=state)
+            # Quiescence: resolve the pending head-to-head before scoring
+            depth, extension = 1, extension - 1
+
+        self.nodes += 1
+        if (
+            time.time_ns() // 1_000_000 > self.deadline
+            or (self.node_budget is not None and self.nodes > self.node_budget)
+            or self.is_stopped
+        ):
+            raise DuelTimeout()
+
+        my_body, _, other_body, _, _, _ = state
+        other_moves = self.get_ordered_moves(
+            body=other_body, other_body=my_body, ply=ply
+        )
+        best = float("-inf")
+        for my_move in self.get_ordered_moves(
+            body=my_body, other_body=other_body, ply=ply
+        ):
+            worst = float("inf")
+            for other_move in other_moves:
+                outcome, next_state = self.get_next_state(
+                    state=state, my_move=my_move, other_move=other_move
+                )
+                if outcome is not None:
+                    # Prefer quicker wins and slower losses
+                    value = outcome + depth if outcome > 0 else outcome - depth
+                else:
+                    value = self.search(
+                        state=next_state,
+                        depth=depth - 1,
+                        alpha=alpha,
+                        beta=min(beta, worst),
+                        ply=ply + 1,
+                        extension=extension,
+                    )
+                worst = min(worst, value)
+                if worst <= alpha:
+                    # The opponent already has a reply that makes this move no better than another
+                    self.move_ordering.record_cutoff(
+                        head=other_body[0], move=other_move, ply=ply, depth=depth
+                    )
+                    break
+            best = max(best, worst)
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                self.move_ordering.record_cutoff(
+                    head=my_body[0], move=my_move, ply=ply, depth=depth
+                )
+                break
+        return best
+
+    def get_root_values(
+        self, state: DuelState, depth: int, moves: list[Coord]
+    ) -> dict[Coord, float]:
+        my_body, _, other_body, _, _, _ = state
+        other_moves = self.get_ordered_moves(body=other_body, other_body=my_body, ply=0)
+        values: dict[Coord, float] = {}
+        alpha = float("-inf")
+        for my_move in moves:
+            worst = float("inf")
+            for other_move in other_moves:
+                outcome, next_state = self.get_next_state(
+                    state=state, my_move=my_move, other_move=other_move
+                )
+                if outcome is not None:
+                    value = outcome + depth if outcome > 0 else outcome - depth
+                else:
+                    value = self.search(
+                        state=next_state,
+                        depth=depth - 1,
+                        alpha=alpha,
+                        beta=worst,
+                        ply=1,
+                    )
+                worst = min(worst, value)
+                if worst <= alpha:
+                    self.move_ordering.record_cutoff(
+                        head=other_body[0], move=other_move, ply=0, depth=depth
+                    )
+                    break
+            values[my_move] = worst
+            alpha = max(alpha, worst)
+        return values
+
+    def get_best_move(
+        self, state: DuelState, max_depth: int = DUEL_MAX_DEPTH
+    ) -> tuple[Coord, float, int] | None:
+        """
+        Iterative deepening. Each completed depth reorders the root moves so that the next depth
+        searches the previous best move first, which tightens alpha early.
+        """
+        my_body, _, other_body, _, _, _ = state
+        moves = self.get_moves(body=my_body, other_body=other_body)
+        best: tuple[Coord, float, int] | None = None
+        for depth in range(1, max_depth + 1):
+            if self.is_stopped:
+                break
+            try:
+                values = self.get_root_values(state=state, depth=depth, moves=moves)
+            except DuelTimeout:
+                break
+            moves.sort(key=lambda move: values[move], reverse=True)
+            best = (moves[0], values[moves[0]], depth)
+            if is_decided(values[moves[0]]):
+                # Forced result. Deeper searches can't change it
+                break
+        return best
+
+
+def get_duel_move(
+    board: BoardState,
+    deadline: float,
+    max_depth: int = DUEL_MAX_DEPTH,
+    move_ordering: MoveOrdering | None = None,
+    node_budget: int | None = None,
+    stop_event: threading.Event | None = None,
+) -> tuple[Coord, float, int, int] | None:
+    """
+    Returns my best move in a 1v1, with its score, the depth it was searched to and the number of
+    nodes searched. Returns None
+    unless exactly one opponent remains. Pass the game session's move ordering to carry the history
+    table over from previous turns, and a stop event to abandon the search early.
+    """
+    other_snake = get_duel_opponent(board=board)
+    if other_snake is None or board.is_terminal:
+        return None
+
+    if move_ordering is None:
+        move_ordering = MoveOrdering()
+    move_ordering.start_search()
+
+    solver = DuelSolver(
+        hazard_damage_rate=board.hazard_damage_rate,
+        is_constrictor=board.is_constrictor,
+        hazard_schedule=board.hazard_schedule,
+        neighbor_table=get_coord_neighbor_table(
+            board_width=board.board_width,
+            board_height=board.board_height,
+            is_wrapped=board.is_wrapped,
+        ),
+        move_ordering=move_ordering,
+        deadline=deadline,
+        stop_event=stop_event,
+        node_budget=node_budget,
+    )
+    result = solver.get_best_move(
+        state=(
+            tuple(board.my_snake.body),
+            board.my_snake.health,
+            tuple(other_snake.body),
+            other_snake.health,
+            board.food_set,
+            board.turn,
+        ),
+        max_depth=max_depth,
+    )
+    logger.debug("get_duel_move", nodes=solver.nodes, result=result)
+    if result is None:
+        return None
+    return *result, solver.nodes
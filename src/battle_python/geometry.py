@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+import numpy.typing as npt
+
+from battle_python.api_types import Coord, Direction, RulesetName
+
+WRAPPED_RULESETS: tuple[RulesetName, ...] = ("wrapped", "wrapped_constrictor")
+
+
+def is_wrapped_ruleset(ruleset_name: RulesetName) -> bool:
+    return ruleset_name in WRAPPED_RULESETS
+
+
+@lru_cache(maxsize=None)
+def get_neighbor_table(
+    board_width: int, board_height: int, is_wrapped: bool = False
+) -> npt.NDArray[np.int_]:
+    """
+    Returns the flat indices of the Von Neumann neighbors of every coordinate on the padded board
+    array, with shape (rows * columns, 4). Built once per board size and topology.
+
+    On a walled board, edge coordinates point at the padding, which holds BORDER_VALUE. On a wrapped
+    board, they point at the coordinate on the opposite edge. Padding coordinates point at
+    themselves; they're never explored.
+    """
+    rows, columns = board_height + 2, board_width + 2
+    row_indices, column_indices = np.divmod(np.arange(rows * columns), columns)
+    shifts = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+    if is_wrapped:
+        # Wrap within the unpadded board, then shift back into the padded array
+        neighbor_rows = np.stack(
+            [
+                (row_indices - 1 + row_shift) % board_height + 1
+                for row_shift, _ in shifts
+            ],
+            axis=1,
+        )
+        neighbor_columns = np.stack(
+            [
+                (column_indices - 1 + column_shift) % board_width + 1
+                for _, column_shift in shifts
+            ],
+            axis=1,
+        )
+    else:
+        neighbor_rows = np.stack(
+            [row_indices + row_shift for row_shift, _ in shifts], axis=1
+        )
+        neighbor_columns = np.stack(
+            [column_indices + column_shift for _, column_shift in shifts], axis=1
+        )
+
+    neighbor_table = neighbor_rows * columns + neighbor_columns
+
+    is_padding = (
+        (row_indices == 0)
+        | (row_indices == rows - 1)
+        | (column_indices == 0)
+        | (column_indices == columns - 1)
+    )
+    neighbor_table[is_padding] = np.arange(rows * columns)[is_padding, None]
+    neighbor_table.setflags(write=False)
+
+    return neighbor_table
+
+
+@lru_cache(maxsize=None)
+def get_coord_neighbor_table(
+    board_width: int, board_height: int, is_wrapped: bool = False
+) -> dict[Coord, tuple[Coord, ...]]:
+    """
+    The coordinate equivalent of get_neighbor_table for the pure-python searches. Off-board
+    neighbors are left out entirely.
+    """
+    coord_neighbor_table: dict[Coord, tuple[Coord, ...]] = {}
+    for x in range(board_width):
+        for y in range(board_height):
+            coord = Coord(x=x, y=y)
+            if is_wrapped:
+                neighbors = {
+                    get_wrapped_coord(
+                        coord=adjacent,
+                        board_width=board_width,
+                        board_height=board_height,
+                    )
+                    for adjacent in coord.get_adjacent()
+                }
+            else:
+                neighbors = {
+                    adjacent
+                    for adjacent in coord.get_adjacent()
+                    if 0 <= adjacent.x < board_width and 0 <= adjacent.y < board_height
+                }
+            coord_neighbor_table[coord] = tuple(sorted(neighbors))
+    return coord_neighbor_table
+
+
+def get_wrapped_coord(coord: Coord, board_width: int, board_height: int) -> Coord:
+    return Coord(x=coord.x % board_width, y=coord.y % board_height)
+
+
+def get_distance(
+    a: Coord,
+    b: Coord,
+    board_width: int,
+    board_height: int,
+    is_wrapped: bool = False,
+) -> int:
+    """
+    Manhattan distance, taking the shorter way around each axis on a wrapped board
+    """
+    if not is_wrapped:
+        return a.get_manhattan_distance(b)
+    x_distance = abs(a.x - b.x) % board_width
+    y_distance = abs(a.y - b.y) % board_height
+    return min(x_distance, board_width - x_distance) + min(
+        y_distance, board_height - y_distance
+    )
+
+
+def get_food_distance(
+    coord: Coord,
+    food: frozenset[Coord],
+    board_width: int,
+    board_height: int,
+    is_wrapped: bool = False,
+) -> int | None:
+    # None when there's no food on the board
+    if len(food) == 0:
+        return None
+    return min(
+        get_distance(
+            a=coord,
+            b=food_coord,
+            board_width=board_width,
+            board_height=board_height,
+            is_wrapped=is_wrapped,
+        )
+        for food_coord in food
+    )
+
+
+def get_unit_step(step: int, size: int) -> int:
+    # Maps a step that wrapped around the board, like size - 1, back onto -1, 0 or 1
+    return (step + 1) % size - 1
+
+
+def get_last_move(
+    body: tuple[Coord, ...],
+    board_width: int,
+    board_height: int,
+    is_wrapped: bool = False,
+) -> Coord:
+    last_move = Coord(x=body[0].x - body[1].x, y=body[0].y - body[1].y)
+    if not is_wrapped:
+        return last_move
+    return Coord(
+        x=get_unit_step(step=last_move.x, size=board_width),
+        y=get_unit_step(step=last_move.y, size=board_height),
+    )
+
+
+def get_straight_coord(
+    body: tuple[Coord, ...],
+    board_width: int,
+    board_height: int,
+    is_wrapped: bool = False,
+) -> Coord:
+    """
+    Returns the coordinate the snake moves into if it continues in the same direction
+    """
+    straight = body[0] + get_last_move(
+        body=body,
+        board_width=board_width,
+        board_height=board_height,
+        is_wrapped=is_wrapped,
+    )
+    if not is_wrapped:
+        return straight
+    return get_wrapped_coord(
+        coord=straight, board_width=board_width, board_height=board_height
+    )
+
+
+def get_move_direction(
+    head: Coord,
+    next_head: Coord,
+    board_width: int | None = None,
+    board_height: int | None = None,
+    is_wrapped: bool = False,
+) -> Direction:
+    step = Coord(x=next_head.x - head.x, y=next_head.y - head.y)
+    if is_wrapped and board_width is not None and board_height is not None:
+        step = Coord(
+            x=get_unit_step(step=step.x, size=board_width),
+            y=get_unit_step(step=step.y, size=board_height),
+        )
+
+    if step == Coord(x=-1, y=0):
+        return "left"
+    elif step == Coord(x=1, y=0):
+        return "right"
+    elif step == Coord(x=0, y=-1):
+        return "down"
+    elif step == Coord(x=0, y=1):
+        return "up"
+    direction = Coord(x=head.x - next_head.x, y=head.y - next_head.y)
+    raise Exception(f"Unhandled direction: {direction}")
@@ -0,0 +1,81 @@
+import os
+import time
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from battle_python.GameSession import session_manager
+from battle_python.GameState import GameState
+from battle_python.api_types import SnakeMetadataResponse
+from battle_python.observability import add_move_metrics
+from battle_python.profiler import sample_profile
+from battle_python.replay import record_move
+
+logger = Logger()
+
+# Handlers shared by the Lambda API and the standalone server. Each takes the decoded request body
+
+
+def get_snake_details() -> dict:
+    return SnakeMetadataResponse(
+        author=os.environ.get("BATTLESNAKE_AUTHOR"),
+        color=os.environ.get("BATTLESNAKE_COLOR"),
+        head=os.environ.get("BATTLESNAKE_HEAD"),
+        tail=os.environ.get("BATTLESNAKE_TAIL"),
+        version=os.environ.get("BATTLESNAKE_VERSION"),
+    ).model_dump()
+
+
+def start_game(body: dict) -> dict[str, int | str]:
+    logger.append_keys(game_id=body["game"]["id"])
+    logger.append_keys(turn=body["turn"])
+    session_manager.start_session(payload=body)
+    return {"status_code": 200, "message": "Let's get to it!"}
+
+
+def get_move(body: dict, request_time: int) -> dict[str, int | str]:
+    logger.append_keys(game_id=body["game"]["id"])
+    logger.append_keys(my_snake_id=body["you"]["id"])
+    logger.append_keys(turn=body["turn"])
+
+    try:
+        with sample_profile(name=f"{body['game']['id']}-{body['turn']}"):
+            decode_start = time.time_ns() // 1_000_000
+            game_session = session_manager.observe(payload=body)
+            # Live moves are always bounded by the clock, so that the watchdog can keep them
+            # within the game's timeout
+            gs = GameState.from_payload(body, game_session=game_session)
+            gs.telemetry.decode_ms = (time.time_ns() // 1_000_000) - decode_start
+            move = gs.get_next_move(request_time)
+        ms_elapsed = (time.time_ns() // 1_000_000) - request_time
+        gs.telemetry.total_ms = ms_elapsed
+        add_move_metrics(
+            telemetry=gs.telemetry,
+            ruleset=gs.game.ruleset.name,
+            snake_count=len(body["board"]["snakes"]),
+        )
+        try:
+            record_move(body=body, move=move, telemetry=gs.telemetry)
+        except Exception:
+            logger.exception("failed to record move")
+        logger.debug(
+            "returning move",
+            ms_elapsed=ms_elapsed,
+            move=move,
+        )
+        return {"move": move}
+    except ValidationError:
+        return {"status_code": 400, "message": "Invalid"}
+
+
+def end_game(body: dict) -> dict[str, int | str]:
+    logger.append_keys(game_id=body["game"]["id"])
+    logger.append_keys(turn=body["turn"])
+    session_manager.end_session(payload=body)
+    return {"status_code": 200, "message": "Good game!"}
+
+
+def get_fallback_move(body: dict) -> dict[str, str]:
+    # Uses a fresh session, since the game's session lives with the search
+    gs = GameState.from_payload(body)
+    return {"move": gs.get_fallback_move()}
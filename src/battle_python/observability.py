@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import functools
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable
+
+from aws_lambda_powertools.utilities.parser import BaseModel
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools import Metrics, Tracer
+
+
+@lru_cache(maxsize=None)
+def get_tracer() -> Tracer:
+    # Imported on first use: the X-Ray SDK is slow to import and isn't needed to answer a request
+    from aws_lambda_powertools import Tracer
+
+    return Tracer()
+
+
+@lru_cache(maxsize=None)
+def get_metrics() -> Metrics:
+    from aws_lambda_powertools import Metrics
+
+    return Metrics(namespace="Powertools")
+
+
+def get_lazy_decorator(
+    get_decorator: Callable[[], Callable[[Callable], Callable]]
+) -> Callable[[Callable], Callable]:
+    """
+    Returns a decorator that only builds the underlying decorator the first time the function is
+    called, so that decorating at import time doesn't import the tracer or metrics
+    """
+
+    def decorator(func: Callable) -> Callable:
+        decorated: Callable | None = None
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            nonlocal decorated
+            if decorated is None:
+                decorated = get_decorator()(func)
+            return decorated(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+capture_method = get_lazy_decorator(lambda: get_tracer().capture_method)
+capture_lambda_handler = get_lazy_decorator(lambda: get_tracer().capture_lambda_handler)
+# Flushes metrics upon request completion/failure and captures the ColdStart metric
+log_metrics = get_lazy_decorator(
+    lambda: functools.partial(get_metrics().log_metrics, capture_cold_start_metric=True)
+)
+
+
+class MoveTelemetry(BaseModel):
+    """
+    How a move's time was spent and how far its search got. Nodes and transposition hits are boards
+    generated by the frontier search, and depth is the number of frontier plies completed. For the
+    duel engine, nodes are the positions it searched and depth is its iterative deepening depth.
+    """
+
+    engine: str = "search"
+    is_fallback: bool = False
+    decode_ms: float = 0
+    search_ms: float = 0
+    backup_ms: float = 0
+    total_ms: float = 0
+    budget_ms: float = 0
+    nodes: int = 0
+    terminal_nodes: int = 0
+    transposition_hits: int = 0
+    depth: int = 0
+
+    @property
+    def nodes_per_second(self) -> float:
+        if self.search_ms == 0:
+            return 0
+        return self.nodes / (self.search_ms / 1000)
+
+    @property
+    def branching_factor(self) -> float:
+        # The b where b ** depth nodes would have been generated
+        if self.depth == 0 or self.nodes == 0:
+            return 0
+        return self.nodes ** (1 / self.depth)
+
+    @property
+    def transposition_hit_rate(self) -> float:
+        if self.nodes == 0:
+            return 0
+        return self.transposition_hits / self.nodes
+
+    @property
+    def budget_utilization(self) -> float:
+        if self.budget_ms == 0:
+            return 0
+        return 100 * self.total_ms / self.budget_ms
+
+
+def add_move_metrics(telemetry: MoveTelemetry, ruleset: str, snake_count: int) -> None:
+    """
+    Adds a move's telemetry to the shared Metrics object. The Lambda handler flushes it when the
+    request completes; anything else has to call flush_metrics.
+    """
+    from aws_lambda_powertools.metrics import MetricUnit
+
+    metrics = get_metrics()
+    metrics.add_dimension(name="ruleset", value=ruleset)
+    metrics.add_dimension(name="snake_count", value=str(snake_count))
+    metrics.add_metadata(key="engine", value=telemetry.engine)
+    for name, unit, value in (
+        ("Fallback", MetricUnit.Count, int(telemetry.is_fallback)),
+        ("DecodeTime", MetricUnit.Milliseconds, telemetry.decode_ms),
+        ("SearchTime", MetricUnit.Milliseconds, telemetry.search_ms),
+        ("BackupTime", MetricUnit.Milliseconds, telemetry.backup_ms),
+        ("MoveTime", MetricUnit.Milliseconds, telemetry.total_ms),
+        ("BudgetUtilization", MetricUnit.Percent, telemetry.budget_utilization),
+        ("NodesGenerated", MetricUnit.Count, telemetry.nodes),
+        ("TerminalNodes", MetricUnit.Count, telemetry.terminal_nodes),
+        ("NodesPerSecond", MetricUnit.CountPerSecond, telemetry.nodes_per_second),
+        ("DepthCompleted", MetricUnit.Count, telemetry.depth),
+        ("BranchingFactor", MetricUnit.Count, telemetry.branching_factor),
+        (
+            "TranspositionHitRate",
+            MetricUnit.Percent,
+            100 * telemetry.transposition_hit_rate,
+        ),
+    ):
+        metrics.add_metric(name=name, unit=unit, value=value)
+
+
+def flush_metrics() -> None:
+    get_metrics().flush_metrics(raise_on_empty_metrics=False)
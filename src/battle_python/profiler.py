@@ -0,0 +1,120 @@
+"""
+Sampling profiler for the search's hot paths. Functions decorated with profiled cost one context
+variable lookup per call unless the current move was sampled, in which case calls and monotonic-clock time
+are accumulated per function and per call stack.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.parser import BaseModel
+from pydantic import Field
+
+logger = Logger()
+
+
+class Profiler(BaseModel):
+    calls: dict[str, int] = Field(default_factory=dict)
+    total_ns: dict[str, int] = Field(default_factory=dict)
+    # Self time, keyed by the semicolon-separated call stack
+    stack_ns: dict[str, int] = Field(default_factory=dict)
+    stack: list[str] = Field(default_factory=list)
+    start_ns: list[int] = Field(default_factory=list)
+    child_ns: list[int] = Field(default_factory=list)
+
+    def enter(self, name: str) -> None:
+        self.stack.append(name)
+        self.child_ns.append(0)
+        self.start_ns.append(time.perf_counter_ns())
+
+    def exit(self, name: str) -> None:
+        elapsed = time.perf_counter_ns() - self.start_ns.pop()
+        key = ";".join(self.stack)
+        self.stack.pop()
+        self.stack_ns[key] = self.stack_ns.get(key, 0) + elapsed - self.child_ns.pop()
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if name not in self.stack:
+            # Recursive calls are already counted by the outermost call
+            self.total_ns[name] = self.total_ns.get(name, 0) + elapsed
+        if len(self.child_ns) > 0:
+            self.child_ns[-1] += elapsed
+
+    def get_summary(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                "calls": self.calls[name],
+                "total_ms": round(total_ns / 1_000_000, 3),
+            }
+            for name, total_ns in sorted(
+                self.total_ns.items(), key=lambda item: item[1], reverse=True
+            )
+        }
+
+    def get_collapsed_stacks(self) -> str:
+        # One "stack self-time" line per stack, in microseconds, as flamegraph.pl expects
+        return "\n".join(
+            f"{stack} {stack_ns // 1000}" for stack, stack_ns in self.stack_ns.items()
+        )
+
+
+# The profiler for the current move, if it was sampled. A context variable, so that concurrent
+# requests don't share a profiler. Threads start with an empty context, so the watchdog runs its
+# search thread in a copy of the request's context to record into the request's profiler
+active_profiler: ContextVar[Profiler | None] = ContextVar(
+    "active_profiler", default=None
+)
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = active_profiler.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            profiler.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(name)
+
+        return wrapper
+
+    return decorator
+
+
+def get_profile_sample_rate() -> float:
+    return float(os.environ.get("BATTLESNAKE_PROFILE_SAMPLE_RATE", 0))
+
+
+@contextmanager
+def sample_profile(name: str) -> Iterator[Profiler | None]:
+    """
+    Profiles the block for the sampled fraction of calls, then logs a summary and, if
+    BATTLESNAKE_PROFILE_DIR is set, writes the collapsed stacks to <name>.folded in it
+    """
+    if random.random() >= get_profile_sample_rate():
+        yield None
+        return
+
+    profiler = Profiler()
+    token = active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        active_profiler.reset(token)
+        logger.info("profile", profile=profiler.get_summary())
+        profile_dir = os.environ.get("BATTLESNAKE_PROFILE_DIR")
+        if profile_dir is not None:
+            path = Path(profile_dir) / f"{name}.folded"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(profiler.get_collapsed_stacks())
@@ -0,0 +1,208 @@
+"""
+Records /move payloads to a gzipped JSONL corpus and replays a corpus offline.
+
+    python -m battle_python.replay corpus/*.jsonl.gz --limit 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import queue
+import random
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.parser import BaseModel
+
+from battle_python.GameSession import SessionManager
+from battle_python.GameState import GameState
+from battle_python.api_types import Direction
+from battle_python.observability import MoveTelemetry
+
+logger = Logger()
+
+
+def get_record_dir() -> Path | None:
+    record_dir = os.environ.get("BATTLESNAKE_RECORD_DIR")
+    return Path(record_dir) if record_dir is not None else None
+
+
+def get_record_sample_rate() -> float:
+    return float(os.environ.get("BATTLESNAKE_RECORD_SAMPLE_RATE", 1))
+
+
+def write_record(record_dir: Path, record: dict) -> None:
+    record_dir.mkdir(parents=True, exist_ok=True)
+    # Appending adds a gzip member per write, which gzip reads back as one stream
+    with gzip.open(record_dir / f"moves-{os.getpid()}.jsonl.gz", "at") as file:
+        file.write(json.dumps(record) + "\n")
+
+
+def write_records(record_queue: queue.Queue) -> None:
+    while True:
+        record_dir, record = record_queue.get()
+        try:
+            write_record(record_dir=record_dir, record=record)
+        except Exception:
+            # A full or read-only disk loses the record, never the move
+            logger.exception("failed to record move")
+        finally:
+            record_queue.task_done()
+
+
+@lru_cache(maxsize=None)
+def get_record_queue() -> queue.Queue:
+    # One writer thread per process, started by the first recorded move
+    record_queue: queue.Queue = queue.Queue()
+    threading.Thread(
+        target=write_records, args=(record_queue,), name="record-writer", daemon=True
+    ).start()
+    return record_queue
+
+
+def flush_records() -> None:
+    # Blocks until every queued record has been written
+    get_record_queue().join()
+
+
+def record_move(body: dict, move: Direction, telemetry: MoveTelemetry) -> None:
+    """
+    Queues the move for the corpus in BATTLESNAKE_RECORD_DIR, for the sampled fraction of moves.
+    The writer thread does the disk work, so the move's response never waits on it. Each process
+    writes its own file, so server workers never interleave writes.
+    """
+    record_dir = get_record_dir()
+    if record_dir is None or random.random() >= get_record_sample_rate():
+        return
+    record = {
+        "payload": body,
+        "move": move,
+        "telemetry": telemetry.model_dump(),
+        "recorded_at": time.time_ns() // 1_000_000,
+    }
+    get_record_queue().put((record_dir, record))
+
+
+def read_corpus(paths: Iterable[Path]) -> Iterator[dict]:
+    for path in paths:
+        with gzip.open(path, "rt") as file:
+            for line in file:
+                if line.strip() != "":
+                    yield json.loads(line)
+
+
+class ReplayResult(BaseModel):
+    game_id: str
+    turn: int
+    recorded_move: Direction
+    move: Direction
+    telemetry: MoveTelemetry
+
+    @property
+    def is_agreement(self) -> bool:
+        return self.move == self.recorded_move
+
+
+def replay_record(
+    record: dict,
+    session_manager: SessionManager,
+    node_budget: int | None = None,
+    depth_budget: int | None = None,
+) -> ReplayResult:
+    """
+    Runs the recorded payload through the same path as /move. Sessions are replayed in corpus
+    order, so opponent statistics build up as they did in the recorded game. With a node or depth
+    budget, every replay of the corpus picks the same moves.
+    """
+    payload = record["payload"]
+    request_time = time.time_ns() // 1_000_000
+    gs = GameState.from_payload(
+        payload,
+        game_session=session_manager.observe(payload=payload),
+        node_budget=node_budget,
+        depth_budget=depth_budget,
+    )
+    gs.telemetry.decode_ms = (time.time_ns() // 1_000_000) - request_time
+    move = gs.get_next_move(request_time=request_time)
+    gs.telemetry.total_ms = (time.time_ns() // 1_000_000) - request_time
+    return ReplayResult(
+        game_id=payload["game"]["id"],
+        turn=payload["turn"],
+        recorded_move=record["move"],
+        move=move,
+        telemetry=gs.telemetry,
+    )
+
+
+def get_report(results: list[ReplayResult]) -> dict:
+    if len(results) == 0:
+        return {"moves": 0}
+    latencies = [result.telemetry.total_ms for result in results]
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    searched = [result for result in results if result.telemetry.nodes > 0]
+    return {
+        "moves": len(results),
+        "latency_ms": {
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "max": float(max(latencies)),
+        },
+        "nodes_per_second": float(
+            np.mean([result.telemetry.nodes_per_second for result in searched])
+        )
+        if len(searched) > 0
+        else 0.0,
+        "move_agreement": sum(result.is_agreement for result in results) / len(results),
+        "fallbacks": sum(result.telemetry.is_fallback for result in results),
+    }
+
+
+def replay(
+    paths: Iterable[Path],
+    limit: int | None = None,
+    node_budget: int | None = None,
+    depth_budget: int | None = None,
+) -> list[ReplayResult]:
+    session_manager = SessionManager()
+    results: list[ReplayResult] = []
+    for record in read_corpus(paths=paths):
+        if limit is not None and len(results) >= limit:
+            break
+        results.append(
+            replay_record(
+                record=record,
+                session_manager=session_manager,
+                node_budget=node_budget,
+                depth_budget=depth_budget,
+            )
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replays recorded /move payloads")
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--node-budget", type=int, default=None)
+    parser.add_argument("--depth-budget", type=int, default=None)
+    args = parser.parse_args()
+    results = replay(
+        paths=args.paths,
+        limit=args.limit,
+        node_budget=args.node_budget,
+        depth_budget=args.depth_budget,
+    )
+    print(json.dumps(get_report(results=results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
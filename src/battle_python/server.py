@@ -0,0 +1,287 @@
+"""
+Standalone HTTP server for self-hosted deployments. Serves the same handlers as the Lambda API
+without API Gateway in front of it.
+
+    python -m battle_python.server --port 8000 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import NamedTuple
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from battle_python.constants import (
+    SERVER_KEEP_ALIVE_TIMEOUT_S,
+    SERVER_RESPONSE_MARGIN_MS,
+)
+from battle_python.decoder import decode_request
+from battle_python.handlers import (
+    end_game,
+    get_fallback_move,
+    get_move,
+    get_snake_details,
+    start_game,
+)
+from battle_python.observability import flush_metrics
+from battle_python.warmup import warmup
+
+logger = Logger()
+
+
+class MalformedRequest(Exception):
+    pass
+
+
+class HttpRequest(NamedTuple):
+    method: str
+    path: str
+    version: str
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def is_keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+async def read_request(reader: asyncio.StreamReader) -> HttpRequest | None:
+    """
+    Reads one request off the connection. Returns None once the client closes the connection or
+    leaves it idle for longer than the keep-alive timeout. Raises MalformedRequest if the request
+    line or the Content-Length can't be parsed.
+    """
+    try:
+        head = await asyncio.wait_for(
+            reader.readuntil(b"\r\n\r\n"), timeout=SERVER_KEEP_ALIVE_TIMEOUT_S
+        )
+    except (
+        asyncio.IncompleteReadError,
+        asyncio.LimitOverrunError,
+        asyncio.TimeoutError,
+        ConnectionError,
+    ):
+        return None
+
+    request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    headers: dict[str, str] = {}
+    for header_line in header_lines:
+        name, _, value = header_line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        method, path, version = request_line.split(" ", 2)
+        content_length = int(headers.get("content-length", 0))
+    except ValueError as e:
+        raise MalformedRequest() from e
+    if content_length < 0:
+        raise MalformedRequest()
+
+    try:
+        body = await reader.readexactly(content_length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return HttpRequest(
+        method=method,
+        path=path.split("?", 1)[0],
+        version=version,
+        headers=headers,
+        body=body,
+    )
+
+
+def get_response(status: HTTPStatus, body: dict, is_keep_alive: bool) -> bytes:
+    content = json.dumps(body).encode()
+    head = "\r\n".join(
+        [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(content)}",
+            f"Connection: {'keep-alive' if is_keep_alive else 'close'}",
+            "",
+            "",
+        ]
+    )
+    return head.encode("latin-1") + content
+
+
+def get_worker_move(body: dict, request_time: int) -> dict:
+    # Runs in a worker, where there's no Lambda handler to flush the move's metrics
+    try:
+        return get_move(body=body, request_time=request_time)
+    finally:
+        flush_metrics()
+
+
+def get_worker_index(game_id: str, workers: int) -> int:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(game_id.encode()) % workers
+
+
+class BattlesnakeServer:
+    """
+    Each worker is a single-process pool, and every move in a game goes to the same worker. Game
+    sessions live in the worker's memory, so a game has to stay on one worker to keep learning
+    about its opponents between moves. Searches in different games run in parallel, except for
+    games that hash to the same worker: those queue behind each other, and a move that waits too
+    long is answered with the fallback move.
+    """
+
+    def __init__(self, host: str, port: int, workers: int) -> None:
+        self.host = host
+        self.port = port
+        # Spawned rather than forked, so that workers don't inherit the event loop
+        context = multiprocessing.get_context("spawn")
+        self.pools = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=warmup)
+            for _ in range(workers)
+        ]
+
+    def get_pool(self, game_id: str) -> ProcessPoolExecutor:
+        return self.pools[get_worker_index(game_id=game_id, workers=len(self.pools))]
+
+    async def get_move(self, body: dict, request_time: int) -> dict:
+        """
+        Runs the search in the game's worker. Answers with the fallback move if the worker is too
+        busy to respond in time or fails. The fallback runs on a thread, so that the flood fill
+        doesn't stall the event loop while the server is overloaded.
+        """
+        deadline = request_time + body["game"]["timeout"] - SERVER_RESPONSE_MARGIN_MS
+        timeout = max(deadline - time.time_ns() // 1_000_000, 0) / 1000
+        future = asyncio.get_running_loop().run_in_executor(
+            self.get_pool(game_id=body["game"]["id"]),
+            get_worker_move,
+            body,
+            request_time,
+        )
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("worker timed out", game_id=body["game"]["id"])
+        except Exception:
+            logger.exception("worker failed", game_id=body["game"]["id"])
+        return await asyncio.get_running_loop().run_in_executor(
+            None, get_fallback_move, body
+        )
+
+    async def handle_request(
+        self, request: HttpRequest, request_time: int
+    ) -> tuple[HTTPStatus, dict]:
+        if request.method == "GET" and request.path == "/":
+            return HTTPStatus.OK, get_snake_details()
+
+        if request.method != "POST" or request.path not in ("/start", "/move", "/end"):
+            return HTTPStatus.NOT_FOUND, {"message": "Not found"}
+
+        try:
+            body = decode_request(request.body)
+        except (ValidationError, ValueError):
+            return HTTPStatus.BAD_REQUEST, {"status_code": 400, "message": "Invalid"}
+
+        if request.path == "/move":
+            return HTTPStatus.OK, await self.get_move(
+                body=body, request_time=request_time
+            )
+        # The game's session lives in its worker
+        handler = start_game if request.path == "/start" else end_game
+        return HTTPStatus.OK, await asyncio.get_running_loop().run_in_executor(
+            self.get_pool(game_id=body["game"]["id"]), handler, body
+        )
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader=reader)
+                except MalformedRequest:
+                    # There's no telling where the next request starts, so close the connection
+                    writer.write(
+                        get_response(
+                            status=HTTPStatus.BAD_REQUEST,
+                            body={"status_code": 400, "message": "Invalid"},
+                            is_keep_alive=False,
+                        )
+                    )
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                request_time = time.time_ns() // 1_000_000
+                try:
+                    status, body = await self.handle_request(
+                        request=request, request_time=request_time
+                    )
+                except Exception:
+                    logger.exception("request failed", path=request.path)
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        "message": "Internal server error"
+                    }
+                writer.write(
+                    get_response(
+                        status=status, body=body, is_keep_alive=request.is_keep_alive
+                    )
+                )
+                await writer.drain()
+                if not request.is_keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> asyncio.Server:
+        # Starts every worker up front, so that the first move in a game doesn't wait for a spawn
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(pool, int) for pool in self.pools])
+        server = await asyncio.start_server(
+            self.handle_connection, host=self.host, port=self.port
+        )
+        logger.info(
+            "server started",
+            sockets=[str(socket.getsockname()) for socket in server.sockets],
+            workers=len(self.pools),
+        )
+        return server
+
+    def shutdown(self) -> None:
+        for pool in self.pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def serve(self) -> None:
+        server = await self.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs the Battlesnake API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    server = BattlesnakeServer(host=args.host, port=args.port, workers=args.workers)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,693 @@
+"""
+Headless self-play. Plays whole games under the engine's standard, royale, constrictor and wrapped
+rules, many at once across a process pool, with each snake searched in-process or asked over HTTP.
+
+    python -m battle_python.simulator --games 1000 --workers 8 --snake a --snake b=http://localhost:8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit
+
+import numpy as np
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.parser import BaseModel
+from pydantic import Field
+
+from battle_python.GameSession import SessionManager
+from battle_python.GameState import GameState
+from battle_python.HazardSchedule import get_safe_zone
+from battle_python.SnakeState import Elimination
+from battle_python.api_types import (
+    Coord,
+    Direction,
+    Game,
+    RoyaleSettings,
+    Ruleset,
+    RulesetName,
+    RulesetSettings,
+    Shared,
+    SnakeCustomizations,
+)
+from battle_python.constants import (
+    SIMULATOR_FOOD_SPAWN_CHANCE,
+    SIMULATOR_HAZARD_DAMAGE,
+    SIMULATOR_MAX_TURNS,
+    SIMULATOR_MINIMUM_FOOD,
+    SIMULATOR_SHRINK_EVERY_N_TURNS,
+)
+from battle_python.constrictor import is_constrictor_ruleset
+from battle_python.geometry import get_wrapped_coord, is_wrapped_ruleset
+
+logger = Logger()
+
+DIRECTION_STEPS: dict[Direction, Coord] = {
+    "up": Coord(x=0, y=1),
+    "down": Coord(x=0, y=-1),
+    "left": Coord(x=-1, y=0),
+    "right": Coord(x=1, y=0),
+}
+
+# The engine's move for a snake that hasn't answered in time on its first turn
+DEFAULT_MOVE: Direction = "up"
+
+
+class SimulatedSnake(BaseModel):
+    id: str
+    name: str
+    body: list[Coord]
+    health: int = 100
+    elimination: Elimination | None = None
+    eliminated_turn: int | None = None
+    last_move: Direction | None = None
+
+    @property
+    def head(self) -> Coord:
+        return self.body[0]
+
+    @property
+    def is_alive(self) -> bool:
+        return self.elimination is None
+
+    def get_payload(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "health": self.health,
+            "body": [coord.as_dict for coord in self.body],
+            "latency": "0",
+            "head": self.head.as_dict,
+            "length": len(self.body),
+            "shout": "",
+            "customizations": SnakeCustomizations().model_dump(),
+        }
+
+
+def get_spawn_coords(board_width: int, board_height: int) -> list[list[Coord]]:
+    # The standard map's spawn points: the corners first, then the middle of each edge
+    mn, md_x, md_y = 1, (board_width - 1) // 2, (board_height - 1) // 2
+    mx_x, mx_y = board_width - 2, board_height - 2
+    return [
+        [
+            Coord(x=mn, y=mn),
+            Coord(x=mn, y=mx_y),
+            Coord(x=mx_x, y=mn),
+            Coord(x=mx_x, y=mx_y),
+        ],
+        [
+            Coord(x=mn, y=md_y),
+            Coord(x=md_x, y=mn),
+            Coord(x=md_x, y=mx_y),
+            Coord(x=mx_x, y=md_y),
+        ],
+    ]
+
+
+class SimulatedGame(BaseModel):
+    """
+    One game's board, stepped forward with the engine's rules: move, starve, take hazard damage,
+    feed, spawn food, eliminate, then shrink the royale safe zone.
+    """
+
+    game: Game
+    turn: int = 0
+    board_width: int
+    board_height: int
+    food: list[Coord] = Field(default_factory=list)
+    hazards: list[Coord] = Field(default_factory=list)
+    snakes: list[SimulatedSnake]
+    rng: Shared
+
+    @classmethod
+    def factory(
+        cls,
+        game: Game,
+        board_width: int,
+        board_height: int,
+        snake_names: list[str],
+        seed: int,
+    ) -> SimulatedGame:
+        rng = random.Random(seed)
+        spawn_coords = []
+        for group in get_spawn_coords(
+            board_width=board_width, board_height=board_height
+        ):
+            rng.shuffle(group)
+            spawn_coords.extend(group)
+        if len(snake_names) > len(spawn_coords):
+            raise ValueError(f"At most {len(spawn_coords)} snakes can start a game")
+
+        simulated_game = cls(
+            game=game,
+            board_width=board_width,
+            board_height=board_height,
+            snakes=[
+                SimulatedSnake(id=f"snake-{i}", name=name, body=[coord] * 3)
+                for i, (name, coord) in enumerate(zip(snake_names, spawn_coords))
+            ],
+            rng=rng,
+        )
+        if not simulated_game.is_constrictor:
+            simulated_game.place_start_food()
+        return simulated_game
+
+    @property
+    def is_wrapped(self) -> bool:
+        return is_wrapped_ruleset(self.game.ruleset.name)
+
+    @property
+    def is_constrictor(self) -> bool:
+        return is_constrictor_ruleset(self.game.ruleset.name)
+
+    @property
+    def living_snakes(self) -> list[SimulatedSnake]:
+        return [snake for snake in self.snakes if snake.is_alive]
+
+    @property
+    def is_over(self) -> bool:
+        # A solo game runs until the snake dies. Otherwise the last snake standing wins
+        if len(self.snakes) == 1:
+            return len(self.living_snakes) == 0
+        return len(self.living_snakes) <= 1
+
+    def get_occupied(self) -> set[Coord]:
+        return {coord for snake in self.living_snakes for coord in snake.body} | set(
+            self.food
+        )
+
+    def place_start_food(self) -> None:
+        """
+        One food diagonal to each snake, on the side toward the center, and one in the center
+        """
+        center = Coord(x=(self.board_width - 1) // 2, y=(self.board_height - 1) // 2)
+        for snake in self.snakes:
+            head = snake.head
+            occupied = self.get_occupied()
+            candidates = [
+                coord
+                for coord in (
+                    Coord(x=head.x - 1, y=head.y - 1),
+                    Coord(x=head.x - 1, y=head.y + 1),
+                    Coord(x=head.x + 1, y=head.y - 1),
+                    Coord(x=head.x + 1, y=head.y + 1),
+                )
+                if coord != center
+                and coord not in occupied
+                and not (coord.x < head.x < center.x or coord.x > head.x > center.x)
+                and not (coord.y < head.y < center.y or coord.y > head.y > center.y)
+            ]
+            if len(candidates) > 0:
+                self.food.append(self.rng.choice(candidates))
+        if center not in self.get_occupied():
+            self.food.append(center)
+
+    def spawn_food(self, count: int) -> None:
+        occupied = self.get_occupied()
+        free = [
+            Coord(x=x, y=y)
+            for x in range(self.board_width)
+            for y in range(self.board_height)
+            if Coord(x=x, y=y) not in occupied
+        ]
+        self.food.extend(self.rng.sample(free, k=min(count, len(free))))
+
+    def shrink_safe_zone(self) -> None:
+        # Covers one row or column on a random side of what's left of the safe zone
+        safe_zone = get_safe_zone(
+            board_width=self.board_width,
+            board_height=self.board_height,
+            hazard_coords=frozenset(self.hazards),
+        )
+        if safe_zone is None:
+            return
+        min_x, max_x, min_y, max_y = safe_zone
+        side = self.rng.randrange(4)
+        if side == 0:
+            coords = [Coord(x=min_x, y=y) for y in range(min_y, max_y + 1)]
+        elif side == 1:
+            coords = [Coord(x=max_x, y=y) for y in range(min_y, max_y + 1)]
+        elif side == 2:
+            coords = [Coord(x=x, y=min_y) for x in range(min_x, max_x + 1)]
+        else:
+            coords = [Coord(x=x, y=max_y) for x in range(min_x, max_x + 1)]
+        self.hazards.extend(coords)
+
+    def is_on_board(self, coord: Coord) -> bool:
+        return 0 <= coord.x < self.board_width and 0 <= coord.y < self.board_height
+
+    def eliminate(self) -> None:
+        # Starved and off-board snakes go first, and aren't there for the others to collide with
+        for snake in self.living_snakes:
+            if snake.health <= 0:
+                snake.elimination = Elimination(cause="out-of-health")
+            elif not self.is_on_board(snake.head):
+                snake.elimination = Elimination(cause="wall-collision")
+
+        living_snakes = self.living_snakes
+        eliminations: dict[str, Elimination] = {}
+        for snake in living_snakes:
+            if snake.head in snake.body[1:]:
+                eliminations[snake.id] = Elimination(cause="snake-self-collision")
+                continue
+            for other in living_snakes:
+                if other.id != snake.id and snake.head in other.body[1:]:
+                    eliminations[snake.id] = Elimination(
+                        cause="snake-collision", by=other.id
+                    )
+                    break
+            if snake.id in eliminations:
+                continue
+            for other in living_snakes:
+                if (
+                    other.id != snake.id
+                    and snake.head == other.head
+                    and len(snake.body) <= len(other.body)
+                ):
+                    eliminations[snake.id] = Elimination(
+                        cause="head-collision", by=other.id
+                    )
+                    break
+        for snake in living_snakes:
+            snake.elimination = eliminations.get(snake.id)
+
+    def step(self, moves: dict[str, Direction]) -> None:
+        living_snakes = self.living_snakes
+        hazards = set(self.hazards)
+        food = set(self.food)
+        hazard_damage = self.game.ruleset.settings.hazardDamagePerTurn
+
+        for snake in living_snakes:
+            move = moves.get(snake.id, snake.last_move or DEFAULT_MOVE)
+            head = snake.head + DIRECTION_STEPS[move]
+            if self.is_wrapped:
+                head = get_wrapped_coord(
+                    coord=head,
+                    board_width=self.board_width,
+                    board_height=self.board_height,
+                )
+            snake.body = [head, *snake.body[:-1]]
+            snake.last_move = move
+            snake.health -= 1
+            if head in hazards and head not in food:
+                snake.health = max(snake.health - hazard_damage, 0)
+
+        eaten = set()
+        for snake in living_snakes:
+            if self.is_constrictor or snake.head in food:
+                # Constrictor snakes grow every turn and never starve
+                snake.health = 100
+                snake.body.append(snake.body[-1])
+                eaten.add(snake.head)
+        self.food = [coord for coord in self.food if coord not in eaten]
+
+        if not self.is_constrictor:
+            settings = self.game.ruleset.settings
+            if len(self.food) < settings.minimumFood:
+                self.spawn_food(count=settings.minimumFood - len(self.food))
+            elif self.rng.randrange(100) < settings.foodSpawnChance:
+                self.spawn_food(count=1)
+
+        self.eliminate()
+        self.turn += 1
+        for snake in living_snakes:
+            if not snake.is_alive:
+                snake.eliminated_turn = self.turn
+
+        royale = self.game.ruleset.settings.royale
+        if (
+            self.game.ruleset.name == "royale"
+            and royale is not None
+            and self.turn % royale.shrinkEveryNTurns == 0
+        ):
+            self.shrink_safe_zone()
+
+    def get_move_request(self, snake: SimulatedSnake) -> dict:
+        """
+        The /move payload for one snake. Each snake sees its own game id, so that snakes sharing a
+        server or a process don't share a game session.
+        """
+        return {
+            "game": {**self.game.model_dump(), "id": f"{self.game.id}-{snake.id}"},
+            "turn": self.turn,
+            "board": {
+                "height": self.board_height,
+                "width": self.board_width,
+                "food": [coord.as_dict for coord in self.food],
+                "hazards": [coord.as_dict for coord in self.hazards],
+                "snakes": [
+                    living_snake.get_payload() for living_snake in self.living_snakes
+                ],
+            },
+            "you": snake.get_payload(),
+        }
+
+
+class SnakeConfig(BaseModel):
+    """
+    A snake in the simulation. Snakes without a url are searched in the simulating process, and
+    need a node or depth budget: a search bounded by the clock would leave a stopping search
+    running on its watchdog thread while the next snake moves, skewing its latency.
+    """
+
+    name: str
+    url: str | None = None
+    node_budget: int | None = None
+    depth_budget: int | None = None
+
+    @property
+    def is_budgeted(self) -> bool:
+        return self.node_budget is not None or self.depth_budget is not None
+
+
+class InProcessDriver(BaseModel):
+    config: SnakeConfig
+    session_manager: SessionManager = Field(default_factory=SessionManager)
+
+    def start(self, payload: dict) -> None:
+        self.session_manager.start_session(payload=payload)
+
+    def get_move(self, payload: dict, request_time: int) -> Direction | None:
+        gs = GameState.from_payload(
+            payload,
+            game_session=self.session_manager.observe(payload=payload),
+            node_budget=self.config.node_budget,
+            depth_budget=self.config.depth_budget,
+        )
+        return gs.get_next_move(request_time=request_time)
+
+    def end(self, payload: dict) -> None:
+        self.session_manager.end_session(payload=payload)
+
+
+class HttpDriver(BaseModel):
+    """
+    Asks a snake server for its moves over one keep-alive connection per game. A move that doesn't
+    come back within the game's timeout is None, which the engine treats as a repeat of the last
+    move.
+    """
+
+    config: SnakeConfig
+    connection: Shared = None
+
+    def post(self, path: str, payload: dict) -> dict | None:
+        url = urlsplit(self.config.url)
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                url.hostname, url.port or 80, timeout=payload["game"]["timeout"] / 1000
+            )
+        try:
+            self.connection.request(
+                "POST",
+                url.path.rstrip("/") + path,
+                body=json.dumps(payload),
+                headers={"Content-Type": "application/json"},
+            )
+            response = self.connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            # A timed out connection may still deliver the late response, so start a new one
+            self.connection.close()
+            self.connection = None
+            return None
+        if response.status != 200:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def start(self, payload: dict) -> None:
+        self.post(path="/start", payload=payload)
+
+    def get_move(self, payload: dict, request_time: int) -> Direction | None:
+        response = self.post(path="/move", payload=payload)
+        move = response.get("move") if response is not None else None
+        return move if move in DIRECTION_STEPS else None
+
+    def end(self, payload: dict) -> None:
+        self.post(path="/end", payload=payload)
+        if self.connection is not None:
+            self.connection.close()
+
+
+def get_driver(config: SnakeConfig) -> InProcessDriver | HttpDriver:
+    if config.url is None:
+        if not config.is_budgeted:
+            raise ValueError(
+                f"In-process snake {config.name} needs a node or depth budget"
+            )
+        return InProcessDriver(config=config)
+    return HttpDriver(config=config)
+
+
+class GameConfig(BaseModel):
+    game_id: str
+    seed: int
+    ruleset_name: RulesetName = "standard"
+    board_width: int = 11
+    board_height: int = 11
+    timeout: int = 500
+    snakes: list[SnakeConfig]
+    max_turns: int = SIMULATOR_MAX_TURNS
+    food_spawn_chance: int = SIMULATOR_FOOD_SPAWN_CHANCE
+    minimum_food: int = SIMULATOR_MINIMUM_FOOD
+    hazard_damage: int = SIMULATOR_HAZARD_DAMAGE
+    shrink_every_n_turns: int = SIMULATOR_SHRINK_EVERY_N_TURNS
+
+    def get_game(self) -> Game:
+        return Game(
+            id=self.game_id,
+            ruleset=Ruleset(
+                name=self.ruleset_name,
+                version="v1.1.15",
+                settings=RulesetSettings(
+                    foodSpawnChance=self.food_spawn_chance,
+                    minimumFood=self.minimum_food,
+                    hazardDamagePerTurn=self.hazard_damage,
+                    royale=RoyaleSettings(shrinkEveryNTurns=self.shrink_every_n_turns)
+                    if self.ruleset_name == "royale"
+                    else None,
+                ),
+            ),
+            map="standard",
+            timeout=self.timeout,
+            source="custom",
+        )
+
+
+class SnakeResult(BaseModel):
+    name: str
+    turns: int
+    length: int
+    elimination: Elimination | None = None
+    latencies_ms: list[int] = Field(default_factory=list)
+    timeouts: int = 0
+
+
+class GameResult(BaseModel):
+    game_id: str
+    seed: int
+    ruleset_name: RulesetName
+    turns: int
+    winner: str | None = None
+    snakes: list[SnakeResult]
+
+
+def play_game(config: GameConfig) -> GameResult:
+    game = SimulatedGame.factory(
+        game=config.get_game(),
+        board_width=config.board_width,
+        board_height=config.board_height,
+        snake_names=[snake.name for snake in config.snakes],
+        seed=config.seed,
+    )
+    drivers = {
+        snake.id: get_driver(config=snake_config)
+        for snake, snake_config in zip(game.snakes, config.snakes)
+    }
+    results = {
+        snake.id: SnakeResult(name=snake.name, turns=0, length=len(snake.body))
+        for snake in game.snakes
+    }
+
+    for snake in game.snakes:
+        drivers[snake.id].start(payload=game.get_move_request(snake=snake))
+
+    while not game.is_over and game.turn < config.max_turns:
+        moves: dict[str, Direction] = {}
+        for snake in game.living_snakes:
+            request_time = time.time_ns() // 1_000_000
+            move = drivers[snake.id].get_move(
+                payload=game.get_move_request(snake=snake), request_time=request_time
+            )
+            latency_ms = (time.time_ns() // 1_000_000) - request_time
+            results[snake.id].latencies_ms.append(latency_ms)
+            # In-process moves are kept however long they took, so that games replay identically
+            # on slower machines
+            if move is None or latency_ms > config.timeout:
+                results[snake.id].timeouts += 1
+            if move is not None:
+                moves[snake.id] = move
+        game.step(moves=moves)
+
+    for snake in game.snakes:
+        drivers[snake.id].end(payload=game.get_move_request(snake=snake))
+        result = results[snake.id]
+        result.turns = (
+            snake.eliminated_turn if snake.eliminated_turn is not None else game.turn
+        )
+        result.length = len(snake.body)
+        result.elimination = snake.elimination
+
+    living_snakes = game.living_snakes
+    return GameResult(
+        game_id=config.game_id,
+        seed=config.seed,
+        ruleset_name=config.ruleset_name,
+        turns=game.turn,
+        winner=living_snakes[0].name
+        if len(living_snakes) == 1 and len(game.snakes) > 1
+        else None,
+        snakes=list(results.values()),
+    )
+
+
+def simulate(configs: Iterable[GameConfig], workers: int) -> Iterator[GameResult]:
+    """
+    Plays the games across a pool of worker processes, yielding results as games finish
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(play_game, config) for config in configs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def get_game_configs(
+    snakes: list[SnakeConfig], games: int, seed: int = 0, **kwargs
+) -> list[GameConfig]:
+    return [
+        GameConfig(
+            game_id=f"simulation-{seed + i}", seed=seed + i, snakes=snakes, **kwargs
+        )
+        for i in range(games)
+    ]
+
+
+def get_report(results: list[GameResult]) -> dict:
+    if len(results) == 0:
+        return {"games": 0}
+    names = sorted({snake.name for result in results for snake in result.snakes})
+    snakes = {}
+    for name in names:
+        snake_results = [
+            snake for result in results for snake in result.snakes if snake.name == name
+        ]
+        latencies = [
+            latency for snake in snake_results for latency in snake.latencies_ms
+        ]
+        p50, p90, p99 = (
+            np.percentile(latencies, [50, 90, 99]) if len(latencies) > 0 else (0, 0, 0)
+        )
+        wins = sum(result.winner == name for result in results)
+        snakes[name] = {
+            "wins": wins,
+            "win_rate": wins / len(results),
+            "mean_turns": float(np.mean([snake.turns for snake in snake_results])),
+            "latency_ms": {
+                "p50": float(p50),
+                "p90": float(p90),
+                "p99": float(p99),
+                "max": float(max(latencies, default=0)),
+            },
+            "timeouts": sum(snake.timeouts for snake in snake_results),
+        }
+    return {
+        "games": len(results),
+        "draws": sum(result.winner is None for result in results),
+        "mean_turns": float(np.mean([result.turns for result in results])),
+        "snakes": snakes,
+    }
+
+
+def get_snake_config(
+    spec: str, node_budget: int | None = None, depth_budget: int | None = None
+) -> SnakeConfig:
+    # NAME searches in-process, NAME=URL asks a snake server
+    name, _, url = spec.partition("=")
+    return SnakeConfig(
+        name=name,
+        url=url or None,
+        node_budget=node_budget,
+        depth_budget=depth_budget,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plays games between snakes")
+    parser.add_argument("--snake", action="append", required=True, dest="snakes")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--ruleset",
+        default="standard",
+        choices=["standard", "royale", "constrictor", "wrapped", "wrapped_constrictor"],
+    )
+    parser.add_argument("--board-size", type=int, default=11)
+    parser.add_argument("--timeout", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=SIMULATOR_MAX_TURNS)
+    parser.add_argument("--node-budget", type=int, default=None)
+    parser.add_argument("--depth-budget", type=int, default=None)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    snake_configs = [
+        get_snake_config(
+            spec=spec, node_budget=args.node_budget, depth_budget=args.depth_budget
+        )
+        for spec in args.snakes
+    ]
+    if any(config.url is None and not config.is_budgeted for config in snake_configs):
+        parser.error("in-process snakes need --node-budget or --depth-budget")
+
+    configs = get_game_configs(
+        snakes=snake_configs,
+        games=args.games,
+        seed=args.seed,
+        ruleset_name=args.ruleset,
+        board_width=args.board_size,
+        board_height=args.board_size,
+        timeout=args.timeout,
+        max_turns=args.max_turns,
+    )
+    start = time.perf_counter()
+    results = []
+    output = gzip.open(args.output, "at") if args.output is not None else None
+    try:
+        for result in simulate(configs=configs, workers=args.workers):
+            results.append(result)
+            if output is not None:
+                output.write(result.model_dump_json() + "\n")
+    finally:
+        if output is not None:
+            output.close()
+    hours = (time.perf_counter() - start) / 3600
+    report = get_report(results=results)
+    report["games_per_hour"] = len(results) / hours if hours > 0 else 0.0
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
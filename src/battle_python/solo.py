@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import heapq
+from collections import deque
+
+from aws_lambda_powertools import Logger
+
+from battle_python.BoardState import BoardState
+from battle_python.api_types import Coord
+from battle_python.constants import SOLO_HUNGER_MARGIN
+from battle_python.geometry import get_coord_neighbor_table
+
+logger = Logger()
+
+
+def get_open_neighbors(
+    coord: Coord,
+    obstacles: set[Coord] | frozenset[Coord],
+    neighbor_table: dict[Coord, tuple[Coord, ...]],
+) -> list[Coord]:
+    return [adjacent for adjacent in neighbor_table[coord] if adjacent not in obstacles]
+
+
+def get_reachable_area(
+    body: tuple[Coord, ...],
+    neighbor_table: dict[Coord, tuple[Coord, ...]],
+    obstacles: frozenset[Coord] = frozenset(),
+) -> int:
+    """
+    Flood fills from the head, treating everything but the tail as an obstacle, along with any
+    other obstacles, such as other snakes' bodies
+    """
+    obstacles = obstacles | set(body[:-1])
+    visited = {body[0]}
+    unexplored = deque([body[0]])
+    while len(unexplored) > 0:
+        coord = unexplored.popleft()
+        for adjacent in get_open_neighbors(
+            coord=coord,
+            obstacles=obstacles,
+            neighbor_table=neighbor_table,
+        ):
+            if adjacent not in visited:
+                visited.add(adjacent)
+                unexplored.append(adjacent)
+    return len(visited) - 1
+
+
+def is_tail_reachable(
+    body: tuple[Coord, ...], neighbor_table: dict[Coord, tuple[Coord, ...]]
+) -> bool:
+    """
+    A snake that can reach its own tail can follow it forever. A tail stacked from eating doesn't
+    move out of the way next turn, so it only counts when reached by a longer path.
+    """
+    tail = body[-1]
+    is_tail_stacked = tail == body[-2]
+    obstacles = set(body[1:]) - {tail}
+    distances = {body[0]: 0}
+    unexplored = deque([body[0]])
+    while len(unexplored) > 0:
+        coord = unexplored.popleft()
+        for adjacent in get_open_neighbors(
+            coord=coord,
+            obstacles=obstacles,
+            neighbor_table=neighbor_table,
+        ):
+            if adjacent == tail:
+                if not is_tail_stacked or distances[coord] > 0:
+                    return True
+                continue
+            if adjacent not in distances:
+                distances[adjacent] = distances[coord] + 1
+                unexplored.append(adjacent)
+    return False
+
+
+def get_next_body(
+    body: tuple[Coord, ...], move: Coord, food: frozenset[Coord]
+) -> tuple[Coord, ...]:
+    next_body = (move, *body[:-1])
+    if move in food:
+        next_body = (*next_body, next_body[-1])
+    return next_body
+
+
+def get_path_to_food(
+    board: BoardState,
+    food: frozenset[Coord],
+    neighbor_table: dict[Coord, tuple[Coord, ...]],
+) -> list[Coord] | None:
+    """
+    A* from my snake's head to the cheapest food. Stepping into a hazard costs the hazard damage on
+    top of the usual one health per move. Body segments are treated as permanent obstacles, which
+    is conservative since the tail moves out of the way as the snake travels.
+    """
+    if len(food) == 0:
+        return None
+
+    body = board.my_snake.body
+    head = body[0]
+    obstacles = set(body[:-1])
+    hazards = frozenset(board.hazard_coords)
+
+    def heuristic(coord: Coord) -> int:
+        return min(board.get_distance(coord, food_coord) for food_coord in food)
+
+    costs: dict[Coord, int] = {head: 0}
+    previous: dict[Coord, Coord] = {}
+    unexplored: list[tuple[int, Coord]] = [(heuristic(head), head)]
+    while len(unexplored) > 0:
+        _, coord = heapq.heappop(unexplored)
+        if coord in food:
+            path = [coord]
+            while path[-1] in previous and previous[path[-1]] != head:
+                path.append(previous[path[-1]])
+            path.reverse()
+            return path
+        for adjacent in get_open_neighbors(
+            coord=coord,
+            obstacles=obstacles,
+            neighbor_table=neighbor_table,
+        ):
+            cost = costs[coord] + 1
+            if adjacent in hazards:
+                cost += board.hazard_damage_rate
+            if adjacent not in costs or cost < costs[adjacent]:
+                costs[adjacent] = cost
+                previous[adjacent] = coord
+                heapq.heappush(unexplored, (cost + heuristic(adjacent), adjacent))
+
+    return None
+
+
+def get_solo_move(board: BoardState) -> Coord | None:
+    """
+    Single-agent move selection for the solo ruleset. Eats only when health is running out, and
+    only along paths that leave the tail reachable afterward. Otherwise, it picks the move that
+    keeps the tail reachable with the most room to spare.
+    """
+    my_snake = board.my_snake
+    body = tuple(my_snake.body)
+    food = frozenset(board.food_coords)
+    neighbor_table = get_coord_neighbor_table(
+        board_width=board.board_width,
+        board_height=board.board_height,
+        is_wrapped=board.is_wrapped,
+    )
+
+    path = get_path_to_food(board=board, food=food, neighbor_table=neighbor_table)
+    if path is not None and my_snake.health <= len(path) + SOLO_HUNGER_MARGIN:
+        simulated_body = body
+        for coord in path:
+            simulated_body = get_next_body(body=simulated_body, move=coord, food=food)
+        if is_tail_reachable(
+            body=simulated_body,
+            neighbor_table=neighbor_table,
+        ):
+            logger.debug("get_solo_move", strategy="food", path_length=len(path))
+            return path[0]
+
+    candidates: list[tuple[bool, bool, int, int, Coord]] = []
+    for move in get_open_neighbors(
+        coord=body[0],
+        obstacles=set(body[:-1]),
+        neighbor_table=neighbor_table,
+    ):
+        next_body = get_next_body(body=body, move=move, food=food)
+        candidates.append(
+            (
+                is_tail_reachable(
+                    body=next_body,
+                    neighbor_table=neighbor_table,
+                ),
+                # Growing makes the snake harder to keep alive, so don't eat until hungry
+                move not in food,
+                get_reachable_area(
+                    body=next_body,
+                    neighbor_table=neighbor_table,
+                ),
+                # Stay away from the tail to leave slack for when the snake eats
+                board.get_distance(move, body[-1]),
+                move,
+            )
+        )
+
+    if len(candidates) == 0:
+        return None
+
+    tail_reachable, _, area, _, move = max(candidates)
+    logger.debug(
+        "get_solo_move",
+        strategy="tail" if tail_reachable else "area",
+        area=area,
+    )
+    return move
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import numpy.typing as npt
+from aws_lambda_powertools import Logger
+
+from battle_python.BoardState import BoardState, get_snake_regions
+from battle_python.api_types import Coord, Shared, StoppableSearch
+from battle_python.geometry import get_coord_neighbor_table
+from battle_python.constants import (
+    SURVIVAL_CACHE_SIZE,
+    SURVIVAL_MAX_NODES,
+    UNEXPLORED_VALUE,
+)
+
+logger = Logger()
+
+# body, health, food
+SurvivalState = tuple[tuple[Coord, ...], int, frozenset[Coord]]
+
+# Turns survived and the horizon they were computed with, keyed by state, per region signature.
+# Module-level so that a warm container reuses the previous turn's results
+survival_caches: dict[tuple, dict[SurvivalState, tuple[int, int]]] = {}
+
+
+class NodeBudgetExceeded(Exception):
+    pass
+
+
+def get_region_coords(
+    all_snake_moves_array: npt.NDArray[np.int_], index: int = 0
+) -> frozenset[Coord]:
+    """
+    Returns the coordinates the snake at `index` can reach. Mirrors the coordinate math used to
+    build the array: rows are indexed top to bottom, and the board is padded by one on each side.
+    """
+    rows, _ = all_snake_moves_array[index].shape
+    snake_moves = all_snake_moves_array[index]
+    reachable = np.argwhere(
+        np.logical_and(snake_moves > 0, snake_moves < UNEXPLORED_VALUE)
+    )
+    return frozenset(
+        Coord(x=int(np_ind[1]) - 1, y=rows - 2 - int(np_ind[0])) for np_ind in reachable
+    )
+
+
+def is_isolated(board: BoardState) -> bool:
+    """
+    My snake is isolated when no opponent can reach any coordinate my snake can reach. In that case
+    my snake's area of control is its full reachability, and the opponents are irrelevant.
+    """
+    if board.is_terminal or board.all_snake_moves_array.size == 0:
+        return False
+    regions = get_snake_regions(all_snake_moves_array=board.all_snake_moves_array)
+    return (0,) in regions
+
+
+def get_survival_cache(
+    region_signature: tuple,
+) -> dict[SurvivalState, tuple[int, int]]:
+    if region_signature not in survival_caches:
+        if len(survival_caches) >= SURVIVAL_CACHE_SIZE:
+            # Evict the oldest region. Dicts preserve insertion order
+            survival_caches.pop(next(iter(survival_caches)))
+        survival_caches[region_signature] = {}
+    return survival_caches[region_signature]
+
+
+class SurvivalSolver(StoppableSearch):
+    """
+    Single-agent depth-first search for the longest survival within a sealed region. Results are
+    memoized on the snake's body (which captures both the occupied coordinates and the tail), its
+    health and the remaining food. The search is bounded by the size of the region: a snake that
+    survives that many turns can keep chasing its tail indefinitely.
+    """
+
+    free_coords: frozenset[Coord]
+    hazard_coords: frozenset[Coord]
+    hazard_damage_rate: int
+    # Constrictor snakes grow every turn at full health
+    always_grows: bool = False
+    neighbor_table: Shared
+    cache: Shared
+    max_nodes: int = SURVIVAL_MAX_NODES
+    nodes: int = 0
+
+    def get_moves(self, body: tuple[Coord, ...]) -> list[Coord]:
+        # The tail moves out of the way unless it's stacked from eating
+        obstacles = body[:-1]
+        moves = [
+            coord
+            for coord in self.neighbor_table[body[0]]
+            if coord in self.free_coords and coord not in obstacles
+        ]
+        # Try the moves with the most room first. Good ordering finds a full-horizon
+        # line quickly, which ends the search early
+        moves.sort(
+            key=lambda coord: (
+                -sum(
+                    adjacent in self.free_coords and adjacent not in obstacles
+                    for adjacent in self.neighbor_table[coord]
+                ),
+                coord,
+            )
+        )
+        return moves
+
+    def get_next_state(self, state: SurvivalState, move: Coord) -> SurvivalState | None:
+        body, health, food = state
+        next_body = (move, *body[:-1])
+        next_health = health - 1
+        if self.always_grows:
+            return (*next_body, next_body[-1]), 100, food
+        if move in food:
+            next_body = (*next_body, next_body[-1])
+            next_health = 100
+            food = food - {move}
+        elif move in self.hazard_coords:
+            next_health -= self.hazard_damage_rate
+
+        if next_health <= 0:
+            return None
+        return next_body, next_health, food
+
+    def get_turns_survived(self, state: SurvivalState, horizon: int) -> int:
+        if horizon == 0:
+            return 0
+
+        cached = self.cache.get(state)
+        if cached is not None:
+            turns, cached_horizon = cached
+            # A snake that died before the cached horizon is an exact result
+            if turns < cached_horizon or horizon <= cached_horizon:
+                return min(turns, horizon)
+
+        self.nodes += 1
+        if self.nodes > self.max_nodes or self.is_stopped:
+            raise NodeBudgetExceeded()
+
+        best = 0
+        for move in self.get_moves(body=state[0]):
+            next_state = self.get_next_state(state=state, move=move)
+            if next_state is None:
+                turns = 1
+            else:
+                turns = 1 + self.get_turns_survived(
+                    state=next_state, horizon=horizon - 1
+                )
+            if turns > best:
+                best = turns
+            if best >= horizon:
+                break
+
+        self.cache[state] = (best, horizon)
+        return best
+
+    def get_best_move(
+        self, state: SurvivalState, horizon: int
+    ) -> tuple[Coord, int] | None:
+        best: tuple[Coord, int] | None = None
+        for move in self.get_moves(body=state[0]):
+            next_state = self.get_next_state(state=state, move=move)
+            if next_state is None:
+                turns = 1
+            else:
+                try:
+                    turns = 1 + self.get_turns_survived(
+                        state=next_state, horizon=horizon - 1
+                    )
+                except NodeBudgetExceeded:
+                    # Some root moves have no value, so leave the move to the multi-agent search
+                    logger.debug("survival node budget exceeded", nodes=self.nodes)
+                    return None
+            if best is None or turns > best[1]:
+                best = (move, turns)
+            if turns >= horizon:
+                break
+        return best
+
+
+def get_survival_move(
+    board: BoardState,
+    max_nodes: int = SURVIVAL_MAX_NODES,
+    stop_event: threading.Event | None = None,
+    is_cached: bool = True,
+) -> tuple[Coord, int] | None:
+    """
+    Returns the move that keeps my snake alive the longest, and the number of turns it survives,
+    when my snake is sealed into its own region. Returns None if an opponent can interact with my
+    snake, or if the region is too big to search within max_nodes or stop_event is set first, in
+    which case the multi-agent search is needed.
+
+    Results are memoized across searches in the process, so whether the region fits within
+    max_nodes depends on what was searched before. Pass is_cached=False to search with a fresh memo
+    instead, so that the same board always gets the same result.
+    """
+    if not is_isolated(board=board):
+        return None
+
+    my_snake = board.my_snake
+    region_coords = get_region_coords(all_snake_moves_array=board.all_snake_moves_array)
+    if len(region_coords) == 0:
+        return None
+
+    free_coords = region_coords | frozenset(my_snake.body)
+    hazard_coords = frozenset(board.hazard_coords) & free_coords
+    food = frozenset(board.food_coords) & free_coords
+    region_signature = (
+        free_coords,
+        hazard_coords,
+        board.hazard_damage_rate,
+        board.is_wrapped,
+        board.is_constrictor,
+    )
+
+    solver = SurvivalSolver(
+        free_coords=free_coords,
+        hazard_coords=hazard_coords,
+        hazard_damage_rate=board.hazard_damage_rate,
+        always_grows=board.is_constrictor,
+        neighbor_table=get_coord_neighbor_table(
+            board_width=board.board_width,
+            board_height=board.board_height,
+            is_wrapped=board.is_wrapped,
+        ),
+        cache=get_survival_cache(region_signature=region_signature)
+        if is_cached
+        else {},
+        max_nodes=max_nodes,
+        stop_event=stop_event,
+    )
+    result = solver.get_best_move(
+        state=(tuple(my_snake.body), my_snake.health, food),
+        horizon=len(free_coords),
+    )
+    logger.debug(
+        "get_survival_move",
+        region_size=len(free_coords),
+        nodes=solver.nodes,
+        result=result,
+    )
+    return result
@@ -0,0 +1,94 @@
+import os
+import time
+
+from aws_lambda_powertools import Logger
+
+from battle_python.GameSession import GameSession
+from battle_python.GameState import GameState, TimeoutException
+
+logger = Logger()
+
+WARMUP_GAME_ID = "warmup"
+
+# A canned 11x11 standard game with four snakes, so that the warmup takes the multi-snake search
+# path rather than one of the specialised engines
+WARMUP_PAYLOAD: dict = {
+    "game": {
+        "id": WARMUP_GAME_ID,
+        "ruleset": {
+            "name": "standard",
+            "version": "v1.1.15",
+            "settings": {
+                "foodSpawnChance": 15,
+                "minimumFood": 1,
+                "hazardDamagePerTurn": 14,
+            },
+        },
+        "map": "standard",
+        "source": "custom",
+        "timeout": 500,
+    },
+    "turn": 3,
+    "board": {
+        "height": 11,
+        "width": 11,
+        "food": [
+            {"x": 0, "y": 2},
+            {"x": 5, "y": 5},
+            {"x": 10, "y": 8},
+        ],
+        "hazards": [],
+        "snakes": [
+            {
+                "id": snake_id,
+                "name": snake_id,
+                "health": 97,
+                "body": [{"x": x, "y": y}, {"x": x, "y": y - 1}, {"x": x, "y": y - 2}],
+                "latency": "0",
+                "head": {"x": x, "y": y},
+                "length": 3,
+                "shout": "",
+                "customizations": {
+                    "color": "#888888",
+                    "head": "default",
+                    "tail": "default",
+                },
+            }
+            for snake_id, x, y in (
+                ("A", 1, 4),
+                ("B", 9, 4),
+                ("C", 9, 9),
+                ("D", 1, 9),
+            )
+        ],
+    },
+}
+WARMUP_PAYLOAD["you"] = WARMUP_PAYLOAD["board"]["snakes"][1]
+
+
+def is_warmup_enabled() -> bool:
+    return os.environ.get("BATTLESNAKE_WARMUP", "false").lower() == "true"
+
+
+def warmup() -> None:
+    """
+    Runs the move pipeline once on a canned board during the Lambda init phase, which isn't billed
+    against a move's time budget. Builds pydantic validators and exercises the numpy code paths so
+    that the first real move in a container doesn't pay for them.
+    """
+    start = time.time_ns() // 1_000_000
+    # The warmup game isn't a real game, so it gets its own session
+    gs = GameState.from_payload(
+        payload=WARMUP_PAYLOAD, game_session=GameSession(game_id=WARMUP_GAME_ID)
+    )
+    gs.get_fallback_move()
+    try:
+        gs.increment_frontier(request_time=start)
+    except TimeoutException:
+        pass
+    gs.current_board.backup(deadline=start + gs.game.timeout)
+    logger.debug(
+        "warmup",
+        ms_elapsed=(time.time_ns() // 1_000_000) - start,
+        boards_explored=gs.counter,
+    )
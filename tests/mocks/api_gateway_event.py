@@ -1,3 +1,4 @@
+import base64
 import time
 
 from battle_python.api import RestMethod
@@ -91,12 +92,20 @@ def get_mock_request_context(method: RestMethod, path: str):
     }
 
 
-def get_mock_api_gateway_event(method: RestMethod, path: str, body: dict | None = None):
+def get_mock_api_gateway_event(
+    method: RestMethod,
+    path: str,
+    body: dict | None = None,
+    is_base64_encoded: bool = False,
+):
+    content = json.dumps(body)
+    if is_base64_encoded:
+        content = base64.b64encode(content.encode()).decode()
     return {
-        "body": json.dumps(body),
+        "body": content,
         "headers": get_mock_api_gateway_headers(),
         "httpMethod": method,
-        "isBase64Encoded": False,
+        "isBase64Encoded": is_base64_encoded,
         "multiValueHeaders": get_mock_multi_value_headers(),
         "multiValueQueryStringParameters": "",
         "path": path,
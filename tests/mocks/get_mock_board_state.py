@@ -1,6 +1,8 @@
 from battle_python.BoardState import BoardState
+from battle_python.HazardSchedule import HazardSchedule
+from battle_python.OpponentModel import OpponentModel, default_opponent_model
 from battle_python.SnakeState import SnakeState
-from battle_python.api_types import Coord
+from battle_python.api_types import Coord, RulesetName
 
 
 def get_mock_board_state(
@@ -12,6 +14,9 @@ def get_mock_board_state(
     food_coords: tuple[Coord, ...] = tuple(),
     hazard_coords: tuple[Coord, ...] = tuple(),
     other_snakes: tuple[SnakeState, ...] = tuple(),
+    ruleset_name: RulesetName = "standard",
+    hazard_schedule: HazardSchedule | None = None,
+    opponent_model: OpponentModel = default_opponent_model,
 ) -> BoardState:
     return BoardState.factory(
         turn=turn,
@@ -22,4 +27,7 @@ def get_mock_board_state(
         my_snake=my_snake,
         other_snakes=other_snakes,
         hazard_damage_rate=hazard_damage_rate,
+        ruleset_name=ruleset_name,
+        hazard_schedule=hazard_schedule,
+        opponent_model=opponent_model,
     )
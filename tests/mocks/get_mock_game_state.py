@@ -3,7 +3,14 @@ import uuid
 from battle_python.BoardState import BoardState
 from battle_python.GameState import GameState
 from battle_python.SnakeState import SnakeState
-from battle_python.api_types import Coord, SnakeCustomizations, SnakeDef, Game, Ruleset
+from battle_python.api_types import (
+    Coord,
+    SnakeCustomizations,
+    SnakeDef,
+    Game,
+    Ruleset,
+    RulesetName,
+)
 from .get_mock_board_state import get_mock_board_state
 
 
@@ -28,11 +35,12 @@ def get_mock_standard_game(
     minimum_food: int = 20,
     hazard_damage_per_turn: int = 30,
     timeout: int = 500,
+    ruleset_name: RulesetName = "standard",
 ) -> Game:
     return Game(
         id=str(uuid.uuid4()),
         ruleset=Ruleset(
-            name="standard",
+            name=ruleset_name,
             version="v1.1.15",
             settings={
                 "foodSpawnChance": food_spawn_chance,
@@ -54,6 +62,7 @@ def get_mock_game_state(
     minimum_food: int = 1,
     hazard_damage_per_turn: int = 14,
     timeout: int = 500,
+    ruleset_name: RulesetName = "standard",
     # get_mock_enriched_board args
     board_height: int = 11,
     board_width: int = 11,
@@ -75,6 +84,7 @@ def get_mock_game_state(
         minimum_food=minimum_food,
         hazard_damage_per_turn=hazard_damage_per_turn,
         timeout=timeout,
+        ruleset_name=ruleset_name,
     )
 
     if not current_board:
@@ -88,6 +98,7 @@ def get_mock_game_state(
             ),
             my_snake=my_snake,
             hazard_damage_rate=hazard_damage_per_turn,
+            ruleset_name=ruleset_name,
         )
 
     return GameState(
@@ -121,6 +121,18 @@ def test_move(lambda_context, game_state: GameState):
     assert response["statusCode"] == 200
 
 
+def test_move_base64_encoded(lambda_context, game_state: GameState):
+    body = game_state.current_board.get_move_request(
+        snake_defs=game_state.snake_defs, game=game_state.game
+    )
+    apigw_event = get_mock_api_gateway_event(
+        method="POST", path="/move", body=body, is_base64_encoded=True
+    )
+    response = api.lambda_handler(event=apigw_event, context=lambda_context)  # type: ignore
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["move"] in ("up", "down", "left", "right")
+
+
 def test_end(lambda_context, game_state: GameState):
     body = game_state.current_board.get_move_request(
         snake_defs=game_state.snake_defs, game=game_state.game
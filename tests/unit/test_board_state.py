@@ -1,9 +1,11 @@
+import time
 import numpy as np
 import numpy.typing as npt
 import numpy.testing as nptest
 import pytest
 
 from battle_python.BoardState import (
+    get_meeting_distances,
     BoardState,
     DEATH_COORD,
     get_board_array,
@@ -16,6 +18,7 @@ from battle_python.BoardState import (
     get_all_snake_moves_array,
     get_my_snake_area_of_control,
     get_score,
+    get_snake_regions,
 )
 from battle_python.SnakeState import SnakeState, Elimination
 from battle_python.api_types import Coord
@@ -1963,3 +1966,324 @@ def test_board_state_populate_next_boards(
             raise Exception()
 
         assert next_board == expected_board
+
+
+def get_pocketed_snake(snake_id: str = "Pocketed") -> SnakeState:
+    # Seals its head into the top-left corner of a 7x7 board
+    return get_mock_snake_state(
+        snake_id=snake_id,
+        body_coords=(
+            Coord(x=0, y=5),
+            Coord(x=0, y=4),
+            Coord(x=1, y=4),
+            Coord(x=2, y=4),
+            Coord(x=2, y=5),
+            Coord(x=2, y=6),
+            Coord(x=3, y=6),
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "other_snakes, expected",
+    [
+        (
+            (get_pocketed_snake(),),
+            [(0,), (1,)],
+        ),
+        (
+            (
+                get_pocketed_snake(),
+                get_mock_snake_state(
+                    snake_id="Neighbor",
+                    body_coords=(Coord(x=5, y=3), Coord(x=5, y=4), Coord(x=5, y=5)),
+                ),
+            ),
+            [(0, 2), (1,)],
+        ),
+        (
+            (
+                get_mock_snake_state(
+                    snake_id="Neighbor",
+                    body_coords=(Coord(x=5, y=3), Coord(x=5, y=4), Coord(x=5, y=5)),
+                ),
+            ),
+            [(0, 1)],
+        ),
+    ],
+)
+def test_get_snake_regions(
+    other_snakes: tuple[SnakeState, ...], expected: list[tuple[int, ...]]
+):
+    board = get_mock_board_state(
+        board_height=7,
+        board_width=7,
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=5), Coord(x=3, y=4), Coord(x=3, y=3)),
+        ),
+        other_snakes=other_snakes,
+    )
+    result = get_snake_regions(all_snake_moves_array=board.all_snake_moves_array)
+    assert result == expected
+
+
+def test_board_state_populate_next_boards_isolated_region():
+    board = get_mock_board_state(
+        board_height=7,
+        board_width=7,
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=5), Coord(x=3, y=4), Coord(x=3, y=3)),
+        ),
+        other_snakes=(get_pocketed_snake(),),
+    )
+    board.populate_next_boards()
+
+    # The pocketed snake has two moves, but it can't interact with my snake
+    assert len(board.next_boards) == 2
+    assert {next_board.my_snake.head for next_board in board.next_boards} == {
+        Coord(x=3, y=6),
+        Coord(x=4, y=5),
+    }
+
+
+def test_board_state_populate_next_boards_shares_food():
+    board = get_mock_board_state(
+        board_height=7,
+        board_width=7,
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=5), Coord(x=3, y=4), Coord(x=3, y=3)),
+        ),
+        food_coords=(Coord(x=3, y=6), Coord(x=0, y=0)),
+        other_snakes=(get_pocketed_snake(),),
+    )
+    board.populate_next_boards()
+
+    for next_board in board.next_boards:
+        if next_board.my_snake.head == Coord(x=3, y=6):
+            assert next_board.food_set == frozenset({Coord(x=0, y=0)})
+            assert next_board.food_coords == (Coord(x=0, y=0),)
+        else:
+            # Copy-on-write: boards where nothing was eaten share their parent's food
+            assert next_board.food_set is board.food_set
+            assert next_board.food_array is board.food_array
+
+
+def test_get_meeting_distances():
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=2, y=5), Coord(x=2, y=4), Coord(x=2, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Near",
+                body_coords=(Coord(x=4, y=5), Coord(x=4, y=4), Coord(x=4, y=3)),
+            ),
+            get_mock_snake_state(
+                snake_id="Far",
+                body_coords=(Coord(x=10, y=10), Coord(x=10, y=9), Coord(x=10, y=8)),
+            ),
+        ),
+    )
+    result = get_meeting_distances(all_snake_moves_array=board.all_snake_moves_array)
+    assert result[1] == 1
+    assert result[2] == 7
+
+
+@pytest.mark.parametrize(
+    "locality_radius, expected_board_count",
+    [
+        # Three moves for my snake, three for the far snake
+        (6, 9),
+        # The far snake is advanced by a single policy move
+        (5, 3),
+    ],
+    ids=str,
+)
+def test_board_state_populate_next_boards_locality(
+    locality_radius: int, expected_board_count: int
+):
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=2, y=5), Coord(x=2, y=4), Coord(x=2, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Far",
+                body_coords=(Coord(x=9, y=9), Coord(x=9, y=8), Coord(x=9, y=7)),
+            ),
+        ),
+    )
+    board.populate_next_boards(locality_radius=locality_radius)
+    assert len(board.next_boards) == expected_board_count
+
+
+def get_crowded_board() -> BoardState:
+    return get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=tuple(
+            get_mock_snake_state(
+                snake_id=f"Crowd {i}",
+                body_coords=(
+                    Coord(x=x, y=8),
+                    Coord(x=x, y=9),
+                    Coord(x=x, y=10),
+                ),
+            )
+            for i, x in enumerate((1, 3, 7, 9))
+        ),
+    )
+
+
+def test_board_state_populate_next_boards_sampled():
+    board = get_crowded_board()
+    board.populate_next_boards()
+
+    # 3 * 3^4 joint moves are sampled down to at most 8 per move of my snake
+    assert 3 < len(board.next_boards) <= 3 * 8
+    assert {next_board.my_snake.head for next_board in board.next_boards} == {
+        Coord(x=4, y=5),
+        Coord(x=6, y=5),
+        Coord(x=5, y=6),
+    }
+    weighted_score = sum(
+        next_board.score * next_board.sample_weight for next_board in board.next_boards
+    ) / sum(next_board.sample_weight for next_board in board.next_boards)
+    assert board.score == pytest.approx(weighted_score)
+
+    # Sampling is seeded, so the expansion is reproducible
+    other_board = get_crowded_board()
+    other_board.populate_next_boards()
+    assert [next_board.get_other_key() for next_board in board.next_boards] == [
+        next_board.get_other_key() for next_board in other_board.next_boards
+    ]
+
+
+@pytest.mark.parametrize(
+    "other_head, expected_extended",
+    [
+        (Coord(x=7, y=5), True),
+        (Coord(x=9, y=5), False),
+    ],
+    ids=str,
+)
+def test_board_state_backup_quiescence(other_head: Coord, expected_extended: bool):
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Contact",
+                body_coords=(
+                    other_head,
+                    Coord(x=other_head.x, y=4),
+                    Coord(x=other_head.x, y=3),
+                ),
+            ),
+        ),
+    )
+    score = board.score
+    board.backup(deadline=time.time_ns() // 1_000_000 + 1_000)
+    assert (len(board.next_boards) > 0) == expected_extended
+    if expected_extended:
+        # Both snakes are branched, so the pending collision is resolved before scoring
+        assert len(board.next_boards) == 9
+        assert board.score != score
+    else:
+        assert board.score == score
+
+
+def test_board_state_backup():
+    board = get_crowded_board()
+    board.populate_next_boards()
+    child = board.next_boards[0]
+    child.populate_next_boards()
+    child.next_boards[0].score = -1_000_000_000
+    board.backup(deadline=0)
+    # The deeper result propagated up
+    assert board.score < 0
+
+
+def test_board_state_backup_shared_next_boards():
+    board = get_crowded_board()
+    board.populate_next_boards()
+    original, duplicate = board.next_boards[:2]
+    original.populate_next_boards()
+    # As GameState.handle does for a transposition
+    duplicate.next_boards = original.next_boards
+    original.next_boards[0].score = -1_000_000_000
+    board.backup(deadline=0)
+    assert duplicate.score == original.score < 0
+
+
+OTHER_BODY = (Coord(x=9, y=1), Coord(x=9, y=2), Coord(x=9, y=3))
+
+
+@pytest.mark.parametrize(
+    "body_coords, other_body_coords, expected",
+    [
+        # Walls on two sides and the neck behind: a single move
+        (
+            (Coord(x=0, y=10), Coord(x=1, y=10), Coord(x=2, y=10)),
+            OTHER_BODY,
+            Coord(x=0, y=9),
+        ),
+        # Up leads into a dead end between the wall and the body
+        (
+            (
+                Coord(x=0, y=9),
+                Coord(x=1, y=9),
+                Coord(x=1, y=10),
+                Coord(x=2, y=10),
+                Coord(x=2, y=9),
+            ),
+            OTHER_BODY,
+            Coord(x=0, y=8),
+        ),
+        # Open space
+        ((Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)), OTHER_BODY, None),
+        # Chasing my own tail into the corner is safe, since both snakes' tails move away
+        (
+            (Coord(x=1, y=1), Coord(x=1, y=0), Coord(x=0, y=0), Coord(x=0, y=1)),
+            (Coord(x=2, y=2), Coord(x=1, y=2), Coord(x=0, y=2), Coord(x=0, y=3)),
+            None,
+        ),
+        # A stacked tail is gone after two moves too, so the corner isn't a dead end
+        (
+            (Coord(x=1, y=0), Coord(x=1, y=1), Coord(x=0, y=1), Coord(x=0, y=1)),
+            OTHER_BODY,
+            None,
+        ),
+    ],
+    ids=str,
+)
+def test_board_state_get_forced_move(
+    body_coords: tuple[Coord, ...],
+    other_body_coords: tuple[Coord, ...],
+    expected: Coord | None,
+):
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True, snake_id="Me", body_coords=body_coords
+        ),
+        other_snakes=(
+            get_mock_snake_state(snake_id="Other", body_coords=other_body_coords),
+        ),
+    )
+    assert board.get_forced_move() == expected
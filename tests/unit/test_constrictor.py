@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from battle_python.BoardState import get_board_array
+from battle_python.api_types import Coord, RulesetName
+from battle_python.constrictor import get_occupancy_array
+from battle_python.survival import get_survival_move, survival_caches
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+def get_constrictor_board():
+    return get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=2, y=2), Coord(x=2, y=1), Coord(x=2, y=1)),
+            health=100,
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Other",
+                body_coords=(Coord(x=8, y=8), Coord(x=8, y=9), Coord(x=8, y=9)),
+                health=100,
+            ),
+        ),
+        ruleset_name="constrictor",
+    )
+
+
+def test_board_state_constrictor_next_snake_state():
+    board = get_constrictor_board()
+    next_state = board.get_next_snake_state_for_snake_move(
+        snake=board.my_snake, move=Coord(x=2, y=3)
+    )
+    assert next_state.body == (
+        Coord(x=2, y=3),
+        Coord(x=2, y=2),
+        Coord(x=2, y=1),
+        Coord(x=2, y=1),
+    )
+    assert next_state.health == 100
+
+
+def test_board_state_constrictor_occupancy_is_incremental():
+    board = get_constrictor_board()
+    board.populate_next_boards()
+    assert len(board.next_boards) > 0
+    board_array = get_board_array(board_width=11, board_height=11)
+    for next_board in board.next_boards:
+        expected = get_occupancy_array(
+            board_array=board_array,
+            snakes=(next_board.my_snake, *next_board.other_snakes),
+        )
+        assert np.array_equal(next_board.occupancy_array, expected)
+        # The tail never moves, so it stays an obstacle
+        assert next_board.all_snake_moves_array[0, 11 - 1, 2 + 1] == 90
+
+
+@pytest.mark.parametrize(
+    "ruleset_name, expected",
+    [
+        # A tail-chasing snake reaches the full horizon
+        ("standard", 10),
+        # A constrictor snake can only fill the nine free coordinates
+        ("constrictor", 9),
+    ],
+)
+def test_get_survival_move_constrictor(ruleset_name: RulesetName, expected: int):
+    survival_caches.clear()
+    # A 5x5 board, split in half by the other snake
+    board = get_mock_board_state(
+        board_width=5,
+        board_height=5,
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=0, y=0), Coord(x=0, y=0), Coord(x=0, y=0)),
+            health=100,
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Wall",
+                body_coords=(
+                    Coord(x=0, y=3),
+                    *[Coord(x=x, y=2) for x in range(5)],
+                    Coord(x=4, y=2),
+                ),
+                health=100,
+            ),
+        ),
+        ruleset_name=ruleset_name,
+    )
+    result = get_survival_move(board=board)
+    assert result is not None
+    _, turns_survived = result
+    assert turns_survived == expected
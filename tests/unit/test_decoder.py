@@ -0,0 +1,50 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from battle_python.SnakeState import SnakeState
+from battle_python.api_types import Coord
+from battle_python.decoder import decode_request, get_snake_state
+
+MOVE_JSON = Path(__file__).parents[1] / "assets" / "move.json"
+
+
+def test_decode_request():
+    payload = decode_request(MOVE_JSON.read_bytes())
+    assert payload == json.loads(MOVE_JSON.read_text())
+
+
+@pytest.mark.parametrize(
+    "is_strict, raises",
+    [
+        ("true", True),
+        ("false", False),
+    ],
+)
+def test_decode_request_validates_in_strict_mode(is_strict: str, raises: bool):
+    payload = json.loads(MOVE_JSON.read_text())
+    payload["turn"] = -1
+    with mock.patch.dict(os.environ, {"BATTLESNAKE_STRICT_DECODING": is_strict}):
+        if raises:
+            with pytest.raises(ValidationError):
+                decode_request(json.dumps(payload))
+        else:
+            assert decode_request(json.dumps(payload))["turn"] == -1
+
+
+def test_get_snake_state_matches_validated_snake_state():
+    snake = json.loads(MOVE_JSON.read_text())["board"]["snakes"][1]
+    expected = SnakeState(
+        id=snake["id"],
+        health=snake["health"],
+        body=tuple(Coord(x=coord["x"], y=coord["y"]) for coord in snake["body"]),
+        head=snake["head"],
+        length=snake["length"],
+        latency=snake["latency"],
+        shout=snake["shout"],
+    )
+    assert get_snake_state(snake=snake, is_self=False) == expected
@@ -0,0 +1,150 @@
+import threading
+import time
+
+from battle_python.api_types import Coord
+from battle_python.constants import DUEL_MAX_DEPTH
+from battle_python.duel import DRAW_SCORE, DuelSolver, get_duel_move, is_decided
+from battle_python.geometry import get_coord_neighbor_table
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+def get_deadline(ms: int = 200) -> int:
+    return time.time_ns() // 1_000_000 + ms
+
+
+def test_get_duel_move_requires_one_opponent():
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="B",
+                body_coords=(Coord(x=1, y=1), Coord(x=1, y=2), Coord(x=1, y=3)),
+            ),
+            get_mock_snake_state(
+                snake_id="C",
+                body_coords=(Coord(x=9, y=9), Coord(x=9, y=8), Coord(x=9, y=7)),
+            ),
+        ),
+    )
+    assert get_duel_move(board=board, deadline=get_deadline()) is None
+
+
+def test_get_duel_move_avoids_head_to_head():
+    # Up and right both risk a head-to-head with a longer snake
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Longer",
+                body_coords=(
+                    Coord(x=6, y=6),
+                    Coord(x=7, y=6),
+                    Coord(x=8, y=6),
+                    Coord(x=9, y=6),
+                    Coord(x=10, y=6),
+                ),
+            ),
+        ),
+    )
+    result = get_duel_move(board=board, deadline=get_deadline(), max_depth=3)
+    assert result is not None
+    move, score, depth, nodes = result
+    assert move == Coord(x=4, y=5)
+    assert not is_decided(score)
+    assert depth == 3
+    assert nodes > 0
+
+
+def test_get_duel_move_keeps_deepening_after_a_draw():
+    # My only move risks a head-to-head with a snake of the same length
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=0, y=0), Coord(x=0, y=1), Coord(x=0, y=2)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Same",
+                body_coords=(Coord(x=2, y=0), Coord(x=3, y=0), Coord(x=4, y=0)),
+            ),
+        ),
+    )
+    result = get_duel_move(board=board, deadline=get_deadline(), max_depth=3)
+    assert result is not None
+    move, score, depth, _ = result
+    assert move == Coord(x=1, y=0)
+    assert score <= DRAW_SCORE
+    assert not is_decided(score)
+    assert depth == 3
+
+
+def test_get_duel_move_with_node_budget():
+    # The deadline never arrives, so the node budget alone bounds the search
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="B",
+                body_coords=(Coord(x=1, y=1), Coord(x=1, y=2), Coord(x=1, y=3)),
+            ),
+        ),
+    )
+    results = [
+        get_duel_move(board=board, deadline=float("inf"), node_budget=300)
+        for _ in range(2)
+    ]
+    assert results[0] is not None
+    assert results[0] == results[1]
+    assert results[0][2] < DUEL_MAX_DEPTH
+
+
+def test_get_duel_move_stopped():
+    # Nothing bounds the search but the stop event, which is already set
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="B",
+                body_coords=(Coord(x=1, y=1), Coord(x=1, y=2), Coord(x=1, y=3)),
+            ),
+        ),
+    )
+    stop_event = threading.Event()
+    stop_event.set()
+    assert (
+        get_duel_move(board=board, deadline=float("inf"), stop_event=stop_event) is None
+    )
+
+
+def test_duel_solver_get_voronoi_areas():
+    solver = DuelSolver(
+        hazard_damage_rate=14,
+        hazard_schedule=None,
+        neighbor_table=get_coord_neighbor_table(board_width=5, board_height=5),
+        deadline=get_deadline(),
+    )
+    # Mirror images across the middle column, which is contested
+    my_area, other_area = solver.get_voronoi_areas(
+        state=(
+            (Coord(x=0, y=2), Coord(x=0, y=1)),
+            100,
+            (Coord(x=4, y=2), Coord(x=4, y=1)),
+            100,
+            frozenset(),
+            0,
+        )
+    )
+    assert my_area == other_area == 9
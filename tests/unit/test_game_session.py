@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from battle_python.GameSession import SessionManager
+from battle_python.GameState import GameState
+
+MOVE_JSON = Path(__file__).parents[1] / "assets" / "move.json"
+
+
+def test_session_manager_evicts_least_recently_used():
+    session_manager = SessionManager(max_sessions=2)
+    first = session_manager.get_session(game_id="first")
+    session_manager.get_session(game_id="second")
+    assert session_manager.get_session(game_id="first") is first
+
+    session_manager.get_session(game_id="third")
+    assert list(session_manager.sessions.keys()) == ["first", "third"]
+
+
+def test_session_manager_start_and_end_session():
+    payload = json.loads(MOVE_JSON.read_text())
+    session_manager = SessionManager()
+
+    session = session_manager.start_session(payload=payload)
+    assert session_manager.get_session(game_id=payload["game"]["id"]) is session
+    assert session.turn == payload["turn"]
+    assert session.opponent_model.snake_names == {
+        "snake-b67f4906-94ae-11ea-bb37": "Another Snake"
+    }
+
+    assert session_manager.end_session(payload=payload) is session
+    assert payload["game"]["id"] not in session_manager.sessions
+    assert session_manager.end_session(payload=payload) is None
+
+
+def test_from_payload_does_not_observe():
+    payload = json.loads(MOVE_JSON.read_text())
+    session_manager = SessionManager()
+    game_session = session_manager.get_session(game_id=payload["game"]["id"])
+    GameState.from_payload(payload, game_session=game_session)
+    assert game_session.turn is None
+
+    assert session_manager.observe(payload=payload) is game_session
+    assert game_session.turn == payload["turn"]
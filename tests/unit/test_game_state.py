@@ -1,14 +1,21 @@
 import json
+import os
 import time
 from pathlib import Path
+from unittest import mock
 
-from battle_python.GameState import GameState
+import pytest
+
+from battle_python.GameSession import GameSession
+from battle_python.GameState import GameState, TimeoutException
 from battle_python.SnakeState import SnakeState
 from battle_python.api_types import (
     Coord,
     SnakeDef,
     SnakeCustomizations,
 )
+from battle_python.constants import WATCHDOG_MARGIN_MS
+from battle_python.profiler import sample_profile
 from ..mocks.get_mock_game_state import get_mock_game_state
 from ..mocks.get_mock_snake_state import get_mock_snake_state
 
@@ -204,8 +211,9 @@ def test_game_state_spam():
     # TODO: That's an interesting concept. Maybe come up with a function that would compare key attributes of the board
 
 
-def test_game_state_get_next_move():
-    mock_gs = get_mock_game_state(
+def get_four_snake_game_state(timeout: int = 500) -> GameState:
+    return get_mock_game_state(
+        timeout=timeout,
         board_height=11,
         board_width=11,
         food_coords=(
@@ -261,8 +269,183 @@ def test_game_state_get_next_move():
             ),
         },
     )
+
+
+def test_game_state_get_next_move():
+    mock_gs = get_four_snake_game_state()
     payload = mock_gs.current_board.get_move_request(
         snake_defs=mock_gs.snake_defs, game=mock_gs.game
     )
     gs = GameState.from_payload(payload=payload)
     gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+    assert gs.telemetry.engine == "search"
+    assert gs.telemetry.depth > 0
+    assert gs.telemetry.nodes == gs.counter > 0
+
+
+def get_cornered_game_state(timeout: int = 500) -> GameState:
+    # Up leads into a two-coordinate pocket walled off by the opponent, right into open board
+    return get_mock_game_state(
+        timeout=timeout,
+        board_height=11,
+        board_width=11,
+        snakes={
+            SnakeDef(
+                id="A",
+                name="A",
+                customizations=SnakeCustomizations(),
+            ): get_mock_snake_state(
+                snake_id="A",
+                is_self=True,
+                body_coords=(Coord(x=0, y=8), Coord(x=0, y=7), Coord(x=0, y=6)),
+            ),
+            SnakeDef(
+                id="B",
+                name="B",
+                customizations=SnakeCustomizations(),
+            ): get_mock_snake_state(
+                snake_id="B",
+                body_coords=(
+                    Coord(x=1, y=9),
+                    Coord(x=1, y=10),
+                    Coord(x=2, y=10),
+                    Coord(x=3, y=10),
+                    Coord(x=4, y=10),
+                ),
+            ),
+        },
+    )
+
+
+def test_game_state_get_fallback_move():
+    gs = get_cornered_game_state()
+    assert gs.get_fallback_move() == "right"
+
+
+def get_session_game_state(mock_gs: GameState) -> GameState:
+    payload = mock_gs.current_board.get_move_request(
+        snake_defs=mock_gs.snake_defs, game=mock_gs.game
+    )
+    return GameState.from_payload(
+        payload=payload, game_session=GameSession(game_id=payload["game"]["id"])
+    )
+
+
+def test_game_state_get_next_move_returns_fallback_after_hard_deadline():
+    # The hard deadline has already passed, so the watchdog can't wait for the search
+    gs = get_session_game_state(mock_gs=get_cornered_game_state(timeout=0))
+    move_ordering = gs.game_session.move_ordering
+    move = gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+    assert move == "right"
+    assert gs.telemetry.is_fallback
+    assert gs.game_session.move_ordering is move_ordering
+
+
+def test_game_state_get_next_move_fallback_telemetry():
+    # The search can't finish in the 50ms before the hard deadline
+    gs = get_four_snake_game_state(timeout=WATCHDOG_MARGIN_MS + 50)
+    fallback_move = gs.get_fallback_move()
+    move = gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+    assert move == fallback_move
+    assert gs.telemetry.is_fallback
+    # Timed on this thread, so it's reported along with the fallback
+    assert gs.telemetry.search_ms > 0
+    assert gs.telemetry.nodes == gs.counter
+
+
+def test_game_state_get_next_move_profiles_the_search_thread():
+    gs = get_session_game_state(mock_gs=get_cornered_game_state())
+    with mock.patch.dict(os.environ, {"BATTLESNAKE_PROFILE_SAMPLE_RATE": "1"}):
+        with sample_profile(name="game-1") as sampled_profiler:
+            gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+    assert sampled_profiler.calls["GameState.search_next_move"] == 1
+
+
+def test_game_state_search_next_move_stopped():
+    # A search the watchdog has stopped gives up without touching the game session
+    gs = get_session_game_state(mock_gs=get_cornered_game_state())
+    move_ordering = gs.game_session.move_ordering
+    gs.stop_event.set()
+    with pytest.raises(TimeoutException):
+        gs.search_next_move(request_time=(time.time_ns() // 1_000_000))
+    assert gs.counter == 0
+    assert gs.game_session.move_ordering is move_ordering
+    assert move_ordering.history == {}
+
+    # Whereas a search that finishes commits its move ordering
+    gs = get_session_game_state(mock_gs=get_cornered_game_state())
+    gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+    assert gs.telemetry.engine == "duel"
+    assert gs.telemetry.nodes == gs.counter > 0
+    assert gs.game_session.move_ordering is gs.move_ordering
+
+
+def test_game_state_get_next_move_with_node_budget():
+    mock_gs = get_four_snake_game_state()
+    payload = mock_gs.current_board.get_move_request(
+        snake_defs=mock_gs.snake_defs, game=mock_gs.game
+    )
+    results = []
+    for _ in range(2):
+        # Fresh sessions, so that neither search inherits the other's move ordering
+        gs = GameState.from_payload(
+            payload=payload,
+            game_session=GameSession(game_id=payload["game"]["id"]),
+            node_budget=200,
+        )
+        move = gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+        assert gs.telemetry.engine == "search"
+        assert gs.telemetry.nodes == gs.counter >= 200
+        results.append((move, gs.counter, gs.telemetry.depth))
+    assert results[0] == results[1]
+
+
+def test_game_state_get_next_move_with_node_budget_is_repeatable():
+    # Sealed into the bottom five rows, with too big a region for the survival solver to search
+    # from scratch. Earlier searches in the process mustn't change the result
+    mock_gs = get_mock_game_state(
+        board_height=11,
+        board_width=11,
+        snakes={
+            SnakeDef(
+                id="A", name="A", customizations=SnakeCustomizations()
+            ): get_mock_snake_state(
+                snake_id="A",
+                is_self=True,
+                body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+                health=40,
+            ),
+            SnakeDef(
+                id="B", name="B", customizations=SnakeCustomizations()
+            ): get_mock_snake_state(
+                snake_id="B",
+                body_coords=(
+                    Coord(x=10, y=6),
+                    *[Coord(x=x, y=5) for x in range(10, -1, -1)],
+                    Coord(x=0, y=6),
+                ),
+            ),
+        },
+    )
+    payload = mock_gs.current_board.get_move_request(
+        snake_defs=mock_gs.snake_defs, game=mock_gs.game
+    )
+    results = []
+    for _ in range(3):
+        gs = GameState.from_payload(
+            payload=payload,
+            game_session=GameSession(game_id=payload["game"]["id"]),
+            node_budget=200,
+        )
+        move = gs.get_next_move(request_time=(time.time_ns() // 1_000_000))
+        results.append((move, gs.telemetry.engine, gs.counter))
+    assert results[0] == results[1] == results[2]
+
+
+def test_game_state_is_search_exhausted_with_node_budget():
+    gs = get_cornered_game_state()
+    gs.node_budget = 10
+    # The time budget is long gone, but only the node budget counts
+    assert not gs.is_search_exhausted(request_time=0)
+    gs.counter = 10
+    assert gs.is_search_exhausted(request_time=0)
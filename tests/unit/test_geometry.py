@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from battle_python.BoardState import get_board_array, get_all_snake_bodies_array
+from battle_python.BoardState import get_all_snake_moves_array
+from battle_python.api_types import Coord
+from battle_python.geometry import (
+    get_coord_neighbor_table,
+    get_distance,
+    get_move_direction,
+    get_neighbor_table,
+    get_straight_coord,
+)
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+@pytest.mark.parametrize(
+    "is_wrapped, coord, expected",
+    [
+        # Padded (row, column) of <Coord 0, 0> on an 11x11 board is (11, 1)
+        (False, (11, 1), {(10, 1), (12, 1), (11, 0), (11, 2)}),
+        (True, (11, 1), {(10, 1), (1, 1), (11, 11), (11, 2)}),
+        (True, (1, 11), {(11, 11), (2, 11), (1, 10), (1, 1)}),
+    ],
+    ids=str,
+)
+def test_get_neighbor_table(
+    is_wrapped: bool, coord: tuple[int, int], expected: set[tuple[int, int]]
+):
+    neighbor_table = get_neighbor_table(
+        board_width=11, board_height=11, is_wrapped=is_wrapped
+    )
+    row, column = coord
+    result = {divmod(int(ind), 13) for ind in neighbor_table[row * 13 + column]}
+    assert result == expected
+
+
+def test_get_neighbor_table_is_cached():
+    assert get_neighbor_table(board_width=7, board_height=7) is get_neighbor_table(
+        board_width=7, board_height=7
+    )
+
+
+@pytest.mark.parametrize(
+    "is_wrapped, expected",
+    [
+        (False, (Coord(x=0, y=1), Coord(x=1, y=0))),
+        (True, (Coord(x=0, y=1), Coord(x=0, y=10), Coord(x=1, y=0), Coord(x=10, y=0))),
+    ],
+    ids=str,
+)
+def test_get_coord_neighbor_table(is_wrapped: bool, expected: tuple[Coord, ...]):
+    coord_neighbor_table = get_coord_neighbor_table(
+        board_width=11, board_height=11, is_wrapped=is_wrapped
+    )
+    assert set(coord_neighbor_table[Coord(x=0, y=0)]) == set(expected)
+
+
+def test_get_all_snake_moves_array_wrapped():
+    snake = get_mock_snake_state(
+        snake_id="Edge",
+        body_coords=(Coord(x=0, y=5), Coord(x=1, y=5), Coord(x=2, y=5)),
+    )
+    all_snake_bodies_array = get_all_snake_bodies_array(
+        board_array=get_board_array(board_width=11, board_height=11),
+        snakes=(snake,),
+    )
+    result = get_all_snake_moves_array(
+        all_snake_bodies_array=all_snake_bodies_array,
+        neighbor_table=get_neighbor_table(
+            board_width=11, board_height=11, is_wrapped=True
+        ),
+    )
+    # <Coord 10, 5> is one move away, across the left edge
+    assert result[0, 11 - 5, 10 + 1] == 1
+    # The far corner is at most 5 + 5 moves away on an 11x11 torus
+    board_moves = result[0, 1:-1, 1:-1]
+    assert board_moves[board_moves < 88].max() == 10
+    # The padding is never explored
+    assert np.all(result[0, 0, :] == 99)
+
+
+def test_board_state_get_next_snake_states_for_snake_wrapped():
+    snake = get_mock_snake_state(
+        is_self=True,
+        snake_id="Edge",
+        body_coords=(Coord(x=0, y=5), Coord(x=1, y=5), Coord(x=2, y=5)),
+    )
+    board = get_mock_board_state(
+        my_snake=snake,
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Other",
+                body_coords=(Coord(x=5, y=9), Coord(x=5, y=8), Coord(x=5, y=7)),
+            ),
+        ),
+        ruleset_name="wrapped",
+    )
+    next_states = board.get_next_snake_states_for_snake(snake=snake, index=0)
+    assert {next_state.head for next_state in next_states} == {
+        Coord(x=10, y=5),
+        Coord(x=0, y=6),
+        Coord(x=0, y=4),
+    }
+
+
+@pytest.mark.parametrize(
+    "a, b, is_wrapped, expected",
+    [
+        (Coord(x=0, y=0), Coord(x=10, y=10), False, 20),
+        (Coord(x=0, y=0), Coord(x=10, y=10), True, 2),
+        (Coord(x=2, y=5), Coord(x=7, y=5), True, 5),
+    ],
+    ids=str,
+)
+def test_get_distance(a: Coord, b: Coord, is_wrapped: bool, expected: int):
+    result = get_distance(
+        a=a, b=b, board_width=11, board_height=11, is_wrapped=is_wrapped
+    )
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "head, next_head, is_wrapped, expected",
+    [
+        (Coord(x=5, y=5), Coord(x=5, y=6), False, "up"),
+        (Coord(x=5, y=5), Coord(x=4, y=5), False, "left"),
+        (Coord(x=0, y=5), Coord(x=10, y=5), True, "left"),
+        (Coord(x=5, y=10), Coord(x=5, y=0), True, "up"),
+    ],
+    ids=str,
+)
+def test_get_move_direction(
+    head: Coord, next_head: Coord, is_wrapped: bool, expected: str
+):
+    result = get_move_direction(
+        head=head,
+        next_head=next_head,
+        board_width=11,
+        board_height=11,
+        is_wrapped=is_wrapped,
+    )
+    assert result == expected
+
+
+def test_get_straight_coord_wrapped():
+    result = get_straight_coord(
+        body=(Coord(x=0, y=5), Coord(x=1, y=5)),
+        board_width=11,
+        board_height=11,
+        is_wrapped=True,
+    )
+    assert result == Coord(x=10, y=5)
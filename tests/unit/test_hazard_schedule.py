@@ -0,0 +1,70 @@
+import pytest
+
+from battle_python.HazardSchedule import HazardSchedule
+from battle_python.api_types import Coord
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+def test_hazard_schedule_static():
+    hazard_coords = (Coord(x=0, y=0), Coord(x=1, y=0))
+    schedule = HazardSchedule.factory(
+        turn=10, board_width=11, board_height=11, hazard_coords=hazard_coords
+    )
+    assert len(schedule.hazard_sets_by_turn) == 1
+    assert schedule.get_hazard_coords(turn=50) == hazard_coords
+    assert schedule.is_hazard(coord=Coord(x=1, y=0), turn=12)
+    assert not schedule.is_hazard(coord=Coord(x=2, y=0), turn=12)
+
+
+@pytest.mark.parametrize(
+    "turn, coord, expected",
+    [
+        (24, Coord(x=0, y=5), False),
+        # Shrinks on turn 25. The side is random, so every side is covered
+        (25, Coord(x=0, y=5), True),
+        (25, Coord(x=10, y=5), True),
+        (25, Coord(x=5, y=10), True),
+        (25, Coord(x=1, y=5), False),
+        (50, Coord(x=1, y=5), True),
+        (50, Coord(x=2, y=5), False),
+    ],
+    ids=str,
+)
+def test_hazard_schedule_royale(turn: int, coord: Coord, expected: bool):
+    schedule = HazardSchedule.factory(
+        turn=20,
+        board_width=11,
+        board_height=11,
+        hazard_coords=tuple(),
+        shrink_every_n_turns=25,
+    )
+    assert schedule.is_hazard(coord=coord, turn=turn) == expected
+
+
+def test_board_state_populate_next_boards_hazard_schedule():
+    schedule = HazardSchedule.factory(
+        turn=24,
+        board_width=11,
+        board_height=11,
+        hazard_coords=tuple(),
+        shrink_every_n_turns=25,
+    )
+    board = get_mock_board_state(
+        turn=24,
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Other",
+                body_coords=(Coord(x=8, y=8), Coord(x=8, y=9), Coord(x=8, y=10)),
+            ),
+        ),
+        hazard_schedule=schedule,
+    )
+    board.populate_next_boards()
+    for next_board in board.next_boards:
+        assert Coord(x=0, y=0) in next_board.hazard_coords
+        assert next_board.hazard_schedule is schedule
@@ -0,0 +1,63 @@
+import time
+
+from battle_python.MoveOrdering import MoveOrdering
+from battle_python.api_types import Coord
+from battle_python.duel import get_duel_move
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+HEAD = Coord(x=5, y=5)
+MOVES = [Coord(x=4, y=5), Coord(x=6, y=5), Coord(x=5, y=6)]
+
+
+def test_move_ordering_killers_before_history():
+    move_ordering = MoveOrdering()
+    move_ordering.record_cutoff(head=HEAD, move=Coord(x=6, y=5), ply=3, depth=4)
+    move_ordering.record_cutoff(head=HEAD, move=Coord(x=5, y=6), ply=1, depth=2)
+
+    # At ply 1, the killer comes first even though the other move has more history
+    assert move_ordering.order_moves(head=HEAD, moves=MOVES, ply=1) == [
+        Coord(x=5, y=6),
+        Coord(x=6, y=5),
+        Coord(x=4, y=5),
+    ]
+    assert move_ordering.order_moves(head=HEAD, moves=MOVES, ply=2) == [
+        Coord(x=6, y=5),
+        Coord(x=5, y=6),
+        Coord(x=4, y=5),
+    ]
+
+
+def test_move_ordering_start_search():
+    move_ordering = MoveOrdering()
+    move_ordering.record_cutoff(head=HEAD, move=Coord(x=6, y=5), ply=1, depth=4)
+    move_ordering.record_cutoff(head=HEAD, move=Coord(x=5, y=6), ply=1, depth=1)
+    move_ordering.start_search()
+
+    assert move_ordering.killers == {}
+    # Decayed, and dropped once it's no longer worth keeping
+    assert move_ordering.history == {(HEAD, Coord(x=6, y=5)): 8}
+
+
+def test_get_duel_move_records_history():
+    move_ordering = MoveOrdering()
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=2, y=5), Coord(x=2, y=4), Coord(x=2, y=3)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="B",
+                body_coords=(Coord(x=4, y=5), Coord(x=4, y=6), Coord(x=4, y=7)),
+            ),
+        ),
+    )
+    result = get_duel_move(
+        board=board,
+        deadline=time.time_ns() // 1_000_000 + 200,
+        max_depth=3,
+        move_ordering=move_ordering,
+    )
+    assert result is not None
+    assert len(move_ordering.history) > 0
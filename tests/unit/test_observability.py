@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from battle_python.observability import (
+    MoveTelemetry,
+    add_move_metrics,
+    flush_metrics,
+    get_metrics,
+)
+
+
+@pytest.mark.parametrize(
+    "telemetry, nodes_per_second, branching_factor, hit_rate",
+    [
+        (MoveTelemetry(), 0, 0, 0),
+        (
+            MoveTelemetry(search_ms=250, nodes=1000, depth=3, transposition_hits=100),
+            4000,
+            10,
+            0.1,
+        ),
+    ],
+)
+def test_move_telemetry(
+    telemetry: MoveTelemetry,
+    nodes_per_second: float,
+    branching_factor: float,
+    hit_rate: float,
+):
+    assert telemetry.nodes_per_second == pytest.approx(nodes_per_second)
+    assert telemetry.branching_factor == pytest.approx(branching_factor)
+    assert telemetry.transposition_hit_rate == pytest.approx(hit_rate)
+
+
+def test_add_move_metrics(capsys):
+    add_move_metrics(
+        telemetry=MoveTelemetry(engine="duel", total_ms=200, budget_ms=500, depth=4),
+        ruleset="standard",
+        snake_count=2,
+    )
+    assert get_metrics().serialize_metric_set()["BudgetUtilization"] == [40.0]
+    flush_metrics()
+
+    emf = json.loads(capsys.readouterr().out)
+    assert emf["ruleset"] == "standard"
+    assert emf["snake_count"] == "2"
+    assert emf["engine"] == "duel"
+    assert emf["DepthCompleted"] == [4.0]
@@ -0,0 +1,139 @@
+import pytest
+
+from battle_python.GameSession import GameSession
+from battle_python.OpponentModel import (
+    GreedyFoodOpponentModel,
+    LearnedOpponentModel,
+    OpponentModel,
+    SnakeStatistics,
+    StraightBiasOpponentModel,
+    UniformOpponentModel,
+)
+from battle_python.api_types import Coord
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+def get_opponent_board(opponent_model: OpponentModel):
+    return get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=1, y=1), Coord(x=1, y=0), Coord(x=0, y=0)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Them",
+                body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+            ),
+        ),
+        food_coords=(Coord(x=9, y=5),),
+        opponent_model=opponent_model,
+    )
+
+
+def test_opponent_model_is_abstract():
+    with pytest.raises(TypeError):
+        OpponentModel()
+
+
+@pytest.mark.parametrize(
+    "opponent_model, expected",
+    [
+        (
+            UniformOpponentModel(),
+            {Coord(x=4, y=5): 1, Coord(x=6, y=5): 1, Coord(x=5, y=6): 1},
+        ),
+        (
+            GreedyFoodOpponentModel(),
+            {Coord(x=4, y=5): 1, Coord(x=6, y=5): 2, Coord(x=5, y=6): 1},
+        ),
+        (
+            StraightBiasOpponentModel(),
+            {Coord(x=4, y=5): 1, Coord(x=6, y=5): 1, Coord(x=5, y=6): 3},
+        ),
+    ],
+    ids=str,
+)
+def test_opponent_model_get_move_weights(
+    opponent_model: OpponentModel, expected: dict[Coord, float]
+):
+    board = get_opponent_board(opponent_model=opponent_model)
+    snake = board.other_snakes[0]
+    next_states = board.get_next_snake_states_for_snake(snake=snake, index=1)
+    weights = opponent_model.get_move_weights(
+        board=board, snake=snake, next_states=next_states
+    )
+    assert {
+        next_state.head: weight for next_state, weight in zip(next_states, weights)
+    } == expected
+
+
+def test_learned_opponent_model_prunes_unlikely_moves():
+    opponent_model = LearnedOpponentModel(
+        snake_names={"Them": "Straight Shooter"},
+        snake_statistics={
+            "Straight Shooter": SnakeStatistics(
+                directed_moves=40,
+                straight_moves=38,
+                food_seeking_moves=40,
+                food_moves=20,
+            )
+        },
+    )
+    board = get_opponent_board(opponent_model=opponent_model)
+    snake = board.other_snakes[0]
+    next_states = board.get_next_snake_states_for_snake(snake=snake, index=1)
+    likely_next_states = board.get_likely_snake_states(
+        snake=snake, next_states=next_states
+    )
+    assert [next_state.head for next_state in likely_next_states] == [Coord(x=5, y=6)]
+
+
+def get_session_payload(turn: int, body: list[Coord]) -> dict:
+    return {
+        "game": {"ruleset": {"name": "standard"}},
+        "turn": turn,
+        "board": {
+            "width": 11,
+            "height": 11,
+            "food": [{"x": 10, "y": 10}],
+            "snakes": [
+                {
+                    "id": "me",
+                    "name": "Me",
+                    "body": [{"x": 0, "y": 0}, {"x": 0, "y": 0}],
+                },
+                {
+                    "id": "them",
+                    "name": "Them",
+                    "body": [{"x": coord.x, "y": coord.y} for coord in body],
+                },
+            ],
+        },
+        "you": {"id": "me"},
+    }
+
+
+def test_game_session_observe():
+    session = GameSession(game_id="game")
+    bodies = [
+        [Coord(x=2, y=2), Coord(x=2, y=1), Coord(x=2, y=0)],
+        [Coord(x=2, y=3), Coord(x=2, y=2), Coord(x=2, y=1)],
+        [Coord(x=3, y=3), Coord(x=2, y=3), Coord(x=2, y=2)],
+    ]
+    for turn, body in enumerate(bodies):
+        session.observe(payload=get_session_payload(turn=turn, body=body))
+
+    statistics = session.opponent_model.snake_statistics["Them"]
+    assert statistics == SnakeStatistics(
+        directed_moves=2, straight_moves=1, food_seeking_moves=2, food_moves=2
+    )
+
+    # A skipped turn isn't observed
+    session.observe(
+        payload=get_session_payload(
+            turn=5, body=[Coord(x=4, y=3), Coord(x=3, y=3), Coord(x=2, y=3)]
+        )
+    )
+    assert session.opponent_model.snake_statistics["Them"] == statistics
@@ -0,0 +1,69 @@
+import os
+import threading
+from pathlib import Path
+from unittest import mock
+
+from battle_python import profiler
+from battle_python.profiler import Profiler, profiled, sample_profile
+
+
+@profiled("outer")
+def outer() -> int:
+    return inner() + inner()
+
+
+@profiled("inner")
+def inner() -> int:
+    return 1
+
+
+def test_profiled_is_a_no_op_without_a_profile():
+    assert profiler.active_profiler.get() is None
+    assert outer() == 2
+
+
+def test_profiler_collapsed_stacks():
+    test_profiler = Profiler()
+    token = profiler.active_profiler.set(test_profiler)
+    try:
+        outer()
+    finally:
+        profiler.active_profiler.reset(token)
+
+    assert test_profiler.calls == {"inner": 2, "outer": 1}
+    assert set(test_profiler.stack_ns.keys()) == {"outer", "outer;inner"}
+    assert test_profiler.total_ns["outer"] >= test_profiler.total_ns["inner"]
+    assert list(test_profiler.get_summary().keys()) == ["outer", "inner"]
+    assert (
+        test_profiler.get_collapsed_stacks().splitlines()[0].startswith("outer;inner ")
+    )
+
+
+def test_sample_profile_writes_collapsed_stacks(tmp_path: Path):
+    env_vars = {
+        "BATTLESNAKE_PROFILE_SAMPLE_RATE": "1",
+        "BATTLESNAKE_PROFILE_DIR": str(tmp_path),
+    }
+    with mock.patch.dict(os.environ, env_vars):
+        with sample_profile(name="game-1") as sampled_profiler:
+            outer()
+    assert sampled_profiler is not None
+    assert profiler.active_profiler.get() is None
+    assert "outer;inner" in (tmp_path / "game-1.folded").read_text()
+
+
+def test_sample_profile_skips_unsampled_moves():
+    with mock.patch.dict(os.environ, {"BATTLESNAKE_PROFILE_SAMPLE_RATE": "0"}):
+        with sample_profile(name="game-1") as sampled_profiler:
+            outer()
+    assert sampled_profiler is None
+
+
+def test_sample_profile_is_not_shared_between_threads():
+    with mock.patch.dict(os.environ, {"BATTLESNAKE_PROFILE_SAMPLE_RATE": "1"}):
+        with sample_profile(name="game-1") as sampled_profiler:
+            # Another request's thread starts with its own context
+            thread = threading.Thread(target=outer)
+            thread.start()
+            thread.join()
+    assert sampled_profiler.calls == {}
@@ -0,0 +1,61 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+from battle_python.observability import MoveTelemetry
+from battle_python.replay import (
+    flush_records,
+    get_report,
+    read_corpus,
+    record_move,
+    replay,
+)
+
+MOVE_JSON = Path(__file__).parents[1] / "assets" / "move.json"
+
+
+def test_record_move_and_replay(tmp_path: Path):
+    payload = json.loads(MOVE_JSON.read_text())
+    env_vars = {
+        "BATTLESNAKE_RECORD_DIR": str(tmp_path),
+        "BATTLESNAKE_RECORD_SAMPLE_RATE": "1",
+    }
+    with mock.patch.dict(os.environ, env_vars):
+        for turn in (14, 15):
+            record_move(
+                body={**payload, "turn": turn},
+                move="up",
+                telemetry=MoveTelemetry(total_ms=100),
+            )
+    flush_records()
+
+    paths = list(tmp_path.glob("*.jsonl.gz"))
+    records = list(read_corpus(paths=paths))
+    assert [record["payload"]["turn"] for record in records] == [14, 15]
+    assert records[0]["telemetry"]["total_ms"] == 100
+
+    results = replay(paths=paths, limit=1)
+    assert len(results) == 1
+    assert results[0].recorded_move == "up"
+
+    report = get_report(results=results)
+    assert report["moves"] == 1
+    assert report["move_agreement"] == int(results[0].move == "up")
+    assert report["latency_ms"]["p50"] == results[0].telemetry.total_ms
+
+
+def test_record_move_is_disabled_without_a_record_dir(tmp_path: Path):
+    with mock.patch.dict(os.environ, {}, clear=True):
+        record_move(body={}, move="up", telemetry=MoveTelemetry())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_record_move_survives_a_failed_write(tmp_path: Path):
+    # The record directory is a file, so the writer can't create it
+    record_dir = tmp_path / "corpus"
+    record_dir.write_text("")
+    with mock.patch.dict(os.environ, {"BATTLESNAKE_RECORD_DIR": str(record_dir)}):
+        record_move(body={}, move="up", telemetry=MoveTelemetry())
+    flush_records()
+    assert record_dir.read_text() == ""
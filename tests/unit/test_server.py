@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+from http import HTTPStatus
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from battle_python.server import (
+    BattlesnakeServer,
+    HttpRequest,
+    get_response,
+    get_worker_index,
+)
+
+MOVE_JSON = Path(__file__).parents[1] / "assets" / "move.json"
+
+
+@pytest.mark.parametrize(
+    "version, connection, expected",
+    [
+        ("HTTP/1.1", None, True),
+        ("HTTP/1.1", "close", False),
+        ("HTTP/1.0", None, False),
+        ("HTTP/1.0", "keep-alive", True),
+    ],
+)
+def test_http_request_is_keep_alive(version: str, connection: str | None, expected):
+    headers = {} if connection is None else {"connection": connection}
+    request = HttpRequest(
+        method="GET", path="/", version=version, headers=headers, body=b""
+    )
+    assert request.is_keep_alive == expected
+
+
+def test_get_response():
+    response = get_response(
+        status=HTTPStatus.OK, body={"move": "up"}, is_keep_alive=True
+    )
+    head, body = response.split(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"Connection: keep-alive" in head
+    assert json.loads(body) == {"move": "up"}
+
+
+def test_get_worker_index_is_sticky():
+    assert get_worker_index(game_id="game", workers=4) == get_worker_index(
+        game_id="game", workers=4
+    )
+    assert 0 <= get_worker_index(game_id="game", workers=4) < 4
+
+
+async def send(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    method: str,
+    path: str,
+    body: bytes = b"",
+) -> tuple[bytes, dict]:
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    content_length = next(
+        int(line.split(b":")[1])
+        for line in head.split(b"\r\n")
+        if line.lower().startswith(b"content-length")
+    )
+    return head, json.loads(await reader.readexactly(content_length))
+
+
+@pytest.mark.parametrize(
+    "request_head",
+    [
+        b"GARBAGE\r\n\r\n",
+        b"POST /move HTTP/1.1\r\nContent-Length: many\r\n\r\n",
+        b"POST /move HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+    ],
+)
+def test_battlesnake_server_malformed_request(request_head: bytes):
+    async def run() -> None:
+        # Malformed requests never reach a worker
+        battlesnake_server = BattlesnakeServer(host="127.0.0.1", port=0, workers=0)
+        server = await asyncio.start_server(
+            battlesnake_server.handle_connection, host="127.0.0.1", port=0
+        )
+        try:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request_head)
+            await writer.drain()
+            response = await reader.read()
+            assert response.startswith(b"HTTP/1.1 400")
+            assert b"Connection: close" in response
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_battlesnake_server():
+    async def run() -> None:
+        battlesnake_server = BattlesnakeServer(host="127.0.0.1", port=0, workers=1)
+        server = await battlesnake_server.start()
+        try:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            # Every request goes over the same keep-alive connection
+            head, details = await send(reader, writer, "GET", "/")
+            assert head.startswith(b"HTTP/1.1 200")
+            assert details["apiversion"] == "1"
+
+            head, move = await send(
+                reader, writer, "POST", "/move", MOVE_JSON.read_bytes()
+            )
+            assert head.startswith(b"HTTP/1.1 200")
+            assert move["move"] in ("up", "down", "left", "right")
+
+            head, _ = await send(reader, writer, "POST", "/unknown")
+            assert head.startswith(b"HTTP/1.1 404")
+
+            head, _ = await send(reader, writer, "POST", "/move", b"not json")
+            assert head.startswith(b"HTTP/1.1 400")
+
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+            battlesnake_server.shutdown()
+
+    env_vars = {
+        "BATTLESNAKE_AUTHOR": "testauthor",
+        "BATTLESNAKE_COLOR": "#888888",
+        "BATTLESNAKE_HEAD": "all-seeing",
+        "BATTLESNAKE_TAIL": "curled",
+        "BATTLESNAKE_VERSION": "testversion",
+    }
+    with mock.patch.dict(os.environ, env_vars):
+        asyncio.run(run())
@@ -0,0 +1,225 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from battle_python.api_types import Coord, RulesetName
+from battle_python.simulator import (
+    GameConfig,
+    HttpDriver,
+    SimulatedGame,
+    SimulatedSnake,
+    SnakeConfig,
+    get_driver,
+    get_game_configs,
+    get_report,
+    get_snake_config,
+    play_game,
+    simulate,
+)
+
+
+def get_simulated_game(
+    ruleset_name: RulesetName = "standard",
+    bodies: tuple[tuple[Coord, ...], ...] = (),
+    food: tuple[Coord, ...] = (),
+    board_size: int = 7,
+) -> SimulatedGame:
+    game = GameConfig(
+        game_id="test",
+        seed=0,
+        ruleset_name=ruleset_name,
+        snakes=[],
+        food_spawn_chance=0,
+        minimum_food=0,
+        shrink_every_n_turns=1,
+    ).get_game()
+    simulated_game = SimulatedGame.factory(
+        game=game,
+        board_width=board_size,
+        board_height=board_size,
+        snake_names=[],
+        seed=0,
+    )
+    simulated_game.snakes = [
+        SimulatedSnake(id=f"snake-{i}", name=f"snake-{i}", body=list(body))
+        for i, body in enumerate(bodies)
+    ]
+    simulated_game.food = list(food)
+    return simulated_game
+
+
+def test_simulated_game_factory():
+    game = GameConfig(game_id="test", seed=0, snakes=[]).get_game()
+    simulated_game = SimulatedGame.factory(
+        game=game, board_width=11, board_height=11, snake_names=["a", "b"], seed=0
+    )
+    assert [snake.name for snake in simulated_game.snakes] == ["a", "b"]
+    assert all(len(set(snake.body)) == 1 for snake in simulated_game.snakes)
+    # One food by each snake and one in the center
+    assert len(simulated_game.food) == 3
+    assert Coord(x=5, y=5) in simulated_game.food
+
+
+@pytest.mark.parametrize(
+    "other_body, moves, causes",
+    [
+        # Head-to-head with a longer snake
+        (
+            (
+                Coord(x=4, y=3),
+                Coord(x=4, y=4),
+                Coord(x=3, y=4),
+                Coord(x=2, y=4),
+                Coord(x=1, y=4),
+            ),
+            {"snake-0": "right", "snake-1": "left"},
+            [("head-collision", "snake-1"), None],
+        ),
+        # Into the other snake's body
+        (
+            (Coord(x=1, y=4), Coord(x=2, y=4), Coord(x=3, y=4), Coord(x=4, y=4)),
+            {"snake-0": "up", "snake-1": "down"},
+            [("snake-collision", "snake-1"), None],
+        ),
+    ],
+)
+def test_simulated_game_step_eliminates(other_body, moves, causes):
+    simulated_game = get_simulated_game(
+        bodies=((Coord(x=2, y=3), Coord(x=2, y=2), Coord(x=2, y=1)), other_body)
+    )
+    simulated_game.step(moves=moves)
+    assert [
+        (snake.elimination.cause, snake.elimination.by)
+        if snake.elimination is not None
+        else None
+        for snake in simulated_game.snakes
+    ] == causes
+    assert simulated_game.is_over
+
+
+def test_simulated_game_step_wall_collision_and_wrapped():
+    body = (Coord(x=0, y=3), Coord(x=1, y=3), Coord(x=2, y=3))
+    standard = get_simulated_game(bodies=(body,))
+    standard.step(moves={"snake-0": "left"})
+    assert standard.snakes[0].elimination.cause == "wall-collision"
+
+    wrapped = get_simulated_game(ruleset_name="wrapped", bodies=(body,))
+    wrapped.step(moves={"snake-0": "left"})
+    assert wrapped.snakes[0].is_alive
+    assert wrapped.snakes[0].head == Coord(x=6, y=3)
+
+
+def test_simulated_game_step_feeds_and_constricts():
+    body = (Coord(x=3, y=3), Coord(x=3, y=2), Coord(x=3, y=1))
+    standard = get_simulated_game(bodies=(body,), food=(Coord(x=3, y=4),))
+    standard.snakes[0].health = 50
+    standard.step(moves={"snake-0": "up"})
+    assert standard.snakes[0].health == 100
+    assert len(standard.snakes[0].body) == 4
+    assert standard.food == []
+
+    constrictor = get_simulated_game(ruleset_name="constrictor", bodies=(body,))
+    constrictor.snakes[0].health = 50
+    constrictor.step(moves={"snake-0": "up"})
+    constrictor.step(moves={"snake-0": "up"})
+    assert constrictor.snakes[0].health == 100
+    assert len(constrictor.snakes[0].body) == 5
+
+
+def test_simulated_game_step_shrinks_royale():
+    body = (Coord(x=3, y=3), Coord(x=3, y=2), Coord(x=3, y=1))
+    royale = get_simulated_game(ruleset_name="royale", bodies=(body,))
+    royale.step(moves={"snake-0": "up"})
+    royale.step(moves={"snake-0": "up"})
+    # One edge row or column per turn
+    assert len(set(royale.hazards)) in (13, 14)
+    assert royale.snakes[0].health == 98
+
+
+def test_play_game_is_deterministic_with_a_node_budget():
+    config = get_game_configs(
+        snakes=[
+            SnakeConfig(name="a", node_budget=50),
+            SnakeConfig(name="b", node_budget=50),
+        ],
+        games=1,
+        seed=1,
+        ruleset_name="constrictor",
+        board_width=7,
+        board_height=7,
+    )[0]
+    result = play_game(config=config)
+    assert result.turns > 0
+    assert [len(snake.latencies_ms) for snake in result.snakes] == [
+        snake.turns for snake in result.snakes
+    ]
+    assert play_game(config=config).model_dump(
+        exclude={"snakes": {"__all__": {"latencies_ms", "timeouts"}}}
+    ) == result.model_dump(
+        exclude={"snakes": {"__all__": {"latencies_ms", "timeouts"}}}
+    )
+
+    report = get_report(results=[result])
+    assert report["games"] == 1
+    assert set(report["snakes"]) == {"a", "b"}
+
+
+def test_get_driver_requires_a_budget_in_process():
+    with pytest.raises(ValueError):
+        get_driver(config=get_snake_config(spec="a"))
+    assert get_driver(config=get_snake_config(spec="a", node_budget=50)) is not None
+
+
+def test_simulate():
+    configs = get_game_configs(
+        snakes=[
+            SnakeConfig(name="a", depth_budget=1),
+            SnakeConfig(name="b", depth_budget=1),
+        ],
+        games=2,
+        ruleset_name="constrictor",
+        board_width=7,
+        board_height=7,
+    )
+    results = list(simulate(configs=configs, workers=2))
+    assert sorted(result.game_id for result in results) == [
+        "simulation-0",
+        "simulation-1",
+    ]
+
+
+class LeftHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        content = json.dumps({"move": "left"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_driver():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LeftHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        config = get_snake_config(spec=f"a=http://127.0.0.1:{server.server_port}")
+        driver = HttpDriver(config=config)
+        game = get_simulated_game(
+            bodies=((Coord(x=3, y=3), Coord(x=3, y=2), Coord(x=3, y=1)),)
+        )
+        payload = game.get_move_request(snake=game.snakes[0])
+        assert driver.get_move(payload=payload, request_time=0) == "left"
+        driver.end(payload=payload)
+    finally:
+        server.shutdown()
+
+    # Nothing is listening any more, so there's no move
+    driver = HttpDriver(config=config)
+    assert driver.get_move(payload=payload, request_time=0) is None
@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from battle_python.GameState import GameState
+from battle_python.api_types import Coord, SnakeDef, SnakeCustomizations
+from battle_python.geometry import get_coord_neighbor_table
+from battle_python.solo import (
+    get_path_to_food,
+    get_reachable_area,
+    get_solo_move,
+    is_tail_reachable,
+)
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_game_state import get_mock_game_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ((Coord(x=5, y=5), Coord(x=5, y=5), Coord(x=5, y=5)), True),
+        ((Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)), True),
+        # Coiled into the bottom-left corner with the tail behind the neck
+        (
+            (
+                Coord(x=0, y=0),
+                Coord(x=1, y=0),
+                Coord(x=1, y=1),
+                Coord(x=0, y=1),
+                Coord(x=0, y=2),
+            ),
+            False,
+        ),
+    ],
+    ids=str,
+)
+def test_is_tail_reachable(body: tuple[Coord, ...], expected: bool):
+    neighbor_table = get_coord_neighbor_table(board_width=11, board_height=11)
+    assert is_tail_reachable(body=body, neighbor_table=neighbor_table) == expected
+
+
+def test_get_reachable_area_with_obstacles():
+    neighbor_table = get_coord_neighbor_table(board_width=3, board_height=3)
+    body = (Coord(x=0, y=0), Coord(x=0, y=1), Coord(x=0, y=2))
+    assert get_reachable_area(body=body, neighbor_table=neighbor_table) == 7
+    # With a wall across the middle column, the body seals the head into its corner
+    wall = frozenset({Coord(x=1, y=0), Coord(x=1, y=1), Coord(x=1, y=2)})
+    assert (
+        get_reachable_area(body=body, neighbor_table=neighbor_table, obstacles=wall)
+        == 0
+    )
+
+
+def test_get_path_to_food_avoids_hazards():
+    board = get_mock_board_state(
+        hazard_damage_rate=15,
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=0, y=5), Coord(x=0, y=4), Coord(x=0, y=3)),
+        ),
+        food_coords=(Coord(x=2, y=5),),
+        hazard_coords=(Coord(x=1, y=5),),
+    )
+    path = get_path_to_food(
+        board=board,
+        food=frozenset(board.food_coords),
+        neighbor_table=get_coord_neighbor_table(board_width=11, board_height=11),
+    )
+    assert path is not None
+    assert path[-1] == Coord(x=2, y=5)
+    assert Coord(x=1, y=5) not in path
+    assert len(path) == 4
+
+
+@pytest.mark.parametrize(
+    "health, expected_to_eat",
+    [
+        (5, True),
+        (100, False),
+    ],
+    ids=str,
+)
+def test_get_solo_move(health: int, expected_to_eat: bool):
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            body_coords=(Coord(x=5, y=5), Coord(x=5, y=4), Coord(x=5, y=3)),
+            health=health,
+        ),
+        food_coords=(Coord(x=5, y=6),),
+    )
+    move = get_solo_move(board=board)
+    assert (move == Coord(x=5, y=6)) == expected_to_eat
+
+
+def test_game_state_get_next_move_solo():
+    mock_gs = get_mock_game_state(
+        ruleset_name="solo",
+        snakes={
+            SnakeDef(
+                id="A",
+                name="A",
+                customizations=SnakeCustomizations(head="all-seeing"),
+                is_self=True,
+            ): get_mock_snake_state(
+                snake_id="A",
+                is_self=True,
+                body_coords=(Coord(x=0, y=1), Coord(x=0, y=0), Coord(x=1, y=0)),
+                health=100,
+            ),
+        },
+    )
+    payload = mock_gs.current_board.get_move_request(
+        snake_defs=mock_gs.snake_defs, game=mock_gs.game
+    )
+    gs = GameState.from_payload(payload=payload)
+    assert gs.get_next_move(request_time=(time.time_ns() // 1_000_000)) in (
+        "up",
+        "right",
+    )
+
+
+def test_game_state_get_fallback_move_solo():
+    # A solo game's board is always terminal, but the fallback still avoids the wall
+    gs = get_mock_game_state(
+        ruleset_name="solo",
+        snakes={
+            SnakeDef(
+                id="A",
+                name="A",
+                customizations=SnakeCustomizations(),
+                is_self=True,
+            ): get_mock_snake_state(
+                snake_id="A",
+                is_self=True,
+                body_coords=(Coord(x=5, y=10), Coord(x=4, y=10), Coord(x=3, y=10)),
+            ),
+        },
+    )
+    assert gs.current_board.is_terminal
+    assert gs.get_fallback_move() in ("right", "down")
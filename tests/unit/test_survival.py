@@ -0,0 +1,175 @@
+import threading
+
+import pytest
+
+from battle_python.SnakeState import SnakeState
+from battle_python.api_types import Coord
+from battle_python.survival import get_survival_move, is_isolated, survival_caches
+from ..mocks.get_mock_board_state import get_mock_board_state
+from ..mocks.get_mock_snake_state import get_mock_snake_state
+
+
+@pytest.fixture(autouse=True)
+def clear_survival_caches():
+    survival_caches.clear()
+
+
+def get_wall_snake() -> SnakeState:
+    # Seals off the bottom five rows of an 11x11 board
+    return get_mock_snake_state(
+        snake_id="Wall",
+        body_coords=(
+            Coord(x=10, y=6),
+            *[Coord(x=x, y=5) for x in range(10, -1, -1)],
+            Coord(x=0, y=6),
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "other_snakes, expected",
+    [
+        ((get_wall_snake(),), True),
+        (
+            (
+                get_mock_snake_state(
+                    snake_id="Roamer",
+                    body_coords=(Coord(x=8, y=8), Coord(x=8, y=7), Coord(x=8, y=6)),
+                ),
+            ),
+            False,
+        ),
+    ],
+)
+def test_is_isolated(other_snakes: tuple[SnakeState, ...], expected: bool):
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+        ),
+        other_snakes=other_snakes,
+    )
+    assert is_isolated(board=board) == expected
+
+
+def test_get_survival_move_not_isolated():
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+        ),
+        other_snakes=(
+            get_mock_snake_state(
+                snake_id="Roamer",
+                body_coords=(Coord(x=8, y=8), Coord(x=8, y=7), Coord(x=8, y=6)),
+            ),
+        ),
+    )
+    assert get_survival_move(board=board) is None
+
+
+def test_get_survival_move_avoids_dead_end():
+    # Moving left enters a one-coordinate pocket. Moving right leads to the rest of the region
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(
+                Coord(x=1, y=4),
+                Coord(x=1, y=3),
+                Coord(x=0, y=3),
+                Coord(x=0, y=2),
+                Coord(x=0, y=1),
+            ),
+            health=100,
+        ),
+        other_snakes=(get_wall_snake(),),
+    )
+    result = get_survival_move(board=board)
+    assert result is not None
+    move, turns_survived = result
+    assert move == Coord(x=2, y=4)
+    assert turns_survived == 55
+
+
+def test_get_survival_move_limited_by_health():
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+            health=5,
+        ),
+        other_snakes=(get_wall_snake(),),
+    )
+    result = get_survival_move(board=board)
+    assert result is not None
+    _, turns_survived = result
+    assert turns_survived == 5
+
+
+def test_get_survival_move_eats_to_survive():
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+            health=2,
+        ),
+        food_coords=(Coord(x=5, y=2),),
+        other_snakes=(get_wall_snake(),),
+    )
+    result = get_survival_move(board=board)
+    assert result is not None
+    move, turns_survived = result
+    assert move == Coord(x=4, y=2)
+    assert turns_survived == 55
+
+
+def test_get_survival_move_node_budget_exceeded():
+    # Too few nodes to value every root move
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+        ),
+        other_snakes=(get_wall_snake(),),
+    )
+    assert get_survival_move(board=board, max_nodes=5) is None
+
+
+def test_get_survival_move_stopped():
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+        ),
+        other_snakes=(get_wall_snake(),),
+    )
+    stop_event = threading.Event()
+    stop_event.set()
+    assert get_survival_move(board=board, stop_event=stop_event) is None
+
+
+def test_get_survival_move_is_cached():
+    # Too big a region to search within the node budget from scratch
+    board = get_mock_board_state(
+        my_snake=get_mock_snake_state(
+            is_self=True,
+            snake_id="Me",
+            body_coords=(Coord(x=3, y=2), Coord(x=3, y=1), Coord(x=3, y=0)),
+            health=40,
+        ),
+        other_snakes=(get_wall_snake(),),
+    )
+    assert [get_survival_move(board=board, is_cached=False) for _ in range(2)] == [
+        None,
+        None,
+    ]
+    # But the shared memo builds up across searches until it fits
+    assert get_survival_move(board=board) is None
+    assert get_survival_move(board=board) is not None
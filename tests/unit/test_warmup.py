@@ -0,0 +1,40 @@
+import os
+from unittest import mock
+
+import pytest
+
+from battle_python.GameSession import session_manager
+from battle_python.observability import capture_method, get_tracer
+from battle_python.warmup import WARMUP_GAME_ID, is_warmup_enabled, warmup
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("true", True),
+        ("True", True),
+        ("false", False),
+        (None, False),
+    ],
+)
+def test_is_warmup_enabled(value: str | None, expected: bool):
+    env_vars = {} if value is None else {"BATTLESNAKE_WARMUP": value}
+    with mock.patch.dict(os.environ, env_vars, clear=True):
+        assert is_warmup_enabled() == expected
+
+
+def test_warmup():
+    warmup()
+    assert WARMUP_GAME_ID not in session_manager.sessions
+
+
+def test_capture_method_creates_tracer_on_first_call():
+    get_tracer.cache_clear()
+
+    @capture_method
+    def get_answer() -> int:
+        return 42
+
+    assert get_tracer.cache_info().currsize == 0
+    assert get_answer() == 42
+    assert get_tracer.cache_info().currsize == 1